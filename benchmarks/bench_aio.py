@@ -0,0 +1,107 @@
+"""
+event loop lag and line latency of inline aws_to_dt vs parse_stream under concurrent load
+
+    python -m benchmarks.bench_aio [clients] [lines_per_second_per_client]
+"""
+import asyncio
+import statistics
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Deque, Dict, List, Optional
+
+from libs.aio import parse_stream
+from libs.dateutils import aws_to_dt
+
+CLIENTS: int = 50
+RATE: int = 2000
+SECONDS: float = 3.0
+WORKERS: int = 2
+# イベントループの遅延を測る間隔 (秒)
+TICK: float = 0.001
+LINE: bytes = b"2022-05-15T12:34:56.789Z\n"
+
+
+def percentile(values: List[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values or [0.0])[0]
+
+
+async def client(reader: asyncio.StreamReader, sent: Deque[float], rate: int) -> None:
+    chunk = max(rate // 100, 1)
+    end = perf_counter() + SECONDS
+    while perf_counter() < end:
+        reader.feed_data(LINE * chunk)
+        sent.extend([perf_counter()] * chunk)
+        await asyncio.sleep(chunk / rate)
+    reader.feed_eof()
+
+
+async def inline(reader: asyncio.StreamReader, sent: Deque[float], latencies: List[float]) -> None:
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        aws_to_dt(line.decode().rstrip("\n"))
+        latencies.append(perf_counter() - sent.popleft())
+
+
+async def batched(
+    reader: asyncio.StreamReader, sent: Deque[float], latencies: List[float], executor: Executor
+) -> None:
+    async for batch in parse_stream(reader, executor=executor):
+        now = perf_counter()
+        latencies.extend(now - sent.popleft() for _ in batch)
+
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(perf_counter() - started - TICK)
+
+
+async def scenario(mode: str, clients: int, rate: int, executor: Optional[Executor]) -> Dict[str, float]:
+    lags: List[float] = []
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    tasks = []
+    for _ in range(clients):
+        reader, sent = asyncio.StreamReader(), deque()
+        tasks.append(client(reader, sent, rate))
+        if mode == "inline":
+            tasks.append(inline(reader, sent, latencies))
+        else:
+            tasks.append(batched(reader, sent, latencies, executor))
+    started = perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = perf_counter() - started
+    stop.set()
+    await tick
+    return {
+        "lines/s": len(latencies) / elapsed,
+        "lag p50 ms": percentile(lags, 50) * 1e3,
+        "lag p99 ms": percentile(lags, 99) * 1e3,
+        "latency p50 ms": percentile(latencies, 50) * 1e3,
+        "latency p99 ms": percentile(latencies, 99) * 1e3,
+    }
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else RATE
+    print(f"{clients} clients x {rate} lines/s for {SECONDS:.0f}s")
+    columns = ["lines/s", "lag p50 ms", "lag p99 ms", "latency p50 ms", "latency p99 ms"]
+    print(f"{'mode':<10}" + "".join(f"{column:>16}" for column in columns))
+    result = asyncio.run(scenario("inline", clients, rate, None))
+    print(f"{'inline':<10}" + "".join(f"{result[column]:>16,.2f}" for column in columns))
+    for mode, factory in [("thread", ThreadPoolExecutor), ("process", ProcessPoolExecutor)]:
+        # 全クライアントで 1 つの executor を共有する
+        with factory(max_workers=WORKERS) as executor:
+            result = asyncio.run(scenario(mode, clients, rate, executor))
+        print(f"{mode:<10}" + "".join(f"{result[column]:>16,.2f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+buffer_to_epochs on a fixed-width byte buffer vs decode + splitlines + strings_to_epochs
+
+    python -m benchmarks.bench_buffers [records]
+"""
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable
+
+from libs import buffers
+from libs.buffers import buffer_to_epochs
+from libs.datearray import strings_to_epochs
+from libs.dateutils import HYPHEN_YMD_HMS
+
+RECORDS: int = 1_000_000
+STRIDE: int = 20
+
+
+def best_s(func: Callable[[], object], repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        times.append(perf_counter() - started)
+    return min(times)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    start = datetime(2022, 5, 15)
+    text = "".join((start + timedelta(seconds=i)).strftime(HYPHEN_YMD_HMS) + "\n" for i in range(count)).encode()
+    size = len(text) / 1e6
+    old = best_s(lambda: strings_to_epochs(text.decode().splitlines(), HYPHEN_YMD_HMS))
+    print(f"{'decode + strings_to_epochs':<28}{old:>8.3f} s{size / old:>10.1f} MB/s")
+    new = best_s(lambda: buffer_to_epochs(text, HYPHEN_YMD_HMS, stride=STRIDE))
+    print(f"{'buffer_to_epochs (numpy)':<28}{new:>8.3f} s{size / new:>10.1f} MB/s{old / new:>8.1f}x")
+    np, buffers.np = buffers.np, None
+    try:
+        pure = best_s(lambda: buffer_to_epochs(text, HYPHEN_YMD_HMS, stride=STRIDE), repeat=1)
+    finally:
+        buffers.np = np
+    print(f"{'buffer_to_epochs (no numpy)':<28}{pure:>8.3f} s{size / pure:>10.1f} MB/s{old / pure:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+size and speed of encode_timestamps / decode_timestamps vs the text formats
+
+    python -m benchmarks.bench_codec [timestamps]
+"""
+import sys
+from time import perf_counter
+from typing import Callable, Tuple
+
+from libs.codec import decode_timestamps, encode_timestamps
+from libs.datearray import TimestampArray, strings_to_epochs
+from libs.dateutils import AWS_DATE_TIME_UTC, UTC, YMDHMS
+
+COUNT: int = 200_000
+# 平均 0.5 秒間隔のソート済みログ
+START: int = 1652585696789123
+GAP: int = 500_000
+
+
+def timed(func: Callable[[], object]) -> Tuple[float, object]:
+    started = perf_counter()
+    result = func()
+    return perf_counter() - started, result
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    epochs = [START + i * GAP + (i * 7919) % GAP for i in range(count)]
+    timestamps = TimestampArray(epochs, UTC)
+    print(f"{'format':<28}{'bytes/ts':>10}{'encode s':>10}{'decode s':>10}")
+    for name in [YMDHMS, AWS_DATE_TIME_UTC]:
+        encode, strings = timed(lambda: timestamps.dt_to_string(name))
+        decode, _ = timed(lambda: strings_to_epochs(strings, name, UTC))
+        size = sum(len(value) + 1 for value in strings)
+        print(f"{'text ' + name:<28}{size / count:>10.2f}{encode:>10.3f}{decode:>10.3f}")
+    for resolution in ["s", "ms", "us"]:
+        encode, data = timed(lambda: encode_timestamps(timestamps, resolution=resolution))
+        decode, _ = timed(lambda: decode_timestamps(data))
+        print(f"{'varint ' + resolution:<28}{len(data) / count:>10.2f}{encode:>10.3f}{decode:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
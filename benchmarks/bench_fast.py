@@ -0,0 +1,45 @@
+"""
+libs.dateutils vs the unchecked libs.dateutils_fast on the same valid input
+
+    python -m benchmarks.bench_fast
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from benchmarks.suite import measure
+from libs import dateutils
+from libs import dateutils_fast as fast
+from libs.dateutils import AWS_DATE_TIME_UTC, HYPHEN_YMD_HMS, JST, YMD
+
+dt: datetime = datetime(2022, 5, 15, 12, 34, 56, 789000, tzinfo=JST)
+
+CASES: List[Tuple[str, Callable[[object], object]]] = [
+    ("string_to_datetime[YMD]", lambda m: m.string_to_datetime("20220515", YMD)),
+    ("string_to_datetime[HYPHEN_YMD_HMS]", lambda m: m.string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS)),
+    ("ymd_to_dt", lambda m: m.ymd_to_dt("2022-05-15")),
+    ("ymdhms_to_dt", lambda m: m.ymdhms_to_dt("20220515123456")),
+    ("aws_to_dt", lambda m: m.aws_to_dt("2022-05-15T12:34:56.789Z")),
+    ("dt_to_string", lambda m: m.dt_to_string(dt, AWS_DATE_TIME_UTC)),
+    ("convert_tz_utc_jst", lambda m: m.convert_tz_utc_jst(dt)),
+    ("add_days", lambda m: m.add_days(dt, 3)),
+    ("add_hours", lambda m: m.add_hours(dt, 3)),
+    ("weekday_index", lambda m: m.weekday_index(dt)),
+    ("weekday_name_en", lambda m: m.weekday_name_en(dt)),
+    ("weekday_name_jp", lambda m: m.weekday_name_jp(dt)),
+    ("dt_to_unix_time", lambda m: m.dt_to_unix_time(dt)),
+    ("unix_time_to_dt", lambda m: m.unix_time_to_dt(1652585696)),
+    ("dt_to_epoch", lambda m: m.dt_to_epoch(dt, "ms")),
+    ("epoch_to_dt", lambda m: m.epoch_to_dt(1652585696789, "ms")),
+]
+
+
+def main() -> None:
+    print(f"{'function':<38}{'checked ns':>12}{'fast ns':>10}{'saved':>8}")
+    for name, call in CASES:
+        checked = measure(lambda: call(dateutils))["p50_ns"]
+        unchecked = measure(lambda: call(fast))["p50_ns"]
+        print(f"{name:<38}{checked:>12,.0f}{unchecked:>10,.0f}{1 - unchecked / checked:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+fixed-width fast path vs the previous datetime.strptime path
+
+    python -m benchmarks.bench_fixed_width
+"""
+from datetime import datetime
+from timeit import repeat
+from typing import Callable, List, Tuple
+
+from libs.dateutils import (
+    AWS_DATE_TIME_JST,
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    JST,
+    SLASH_YMD_HMS,
+    UTC,
+    YMD,
+    YMDHMS,
+    aws_to_dt,
+    ymd_to_dt,
+    ymdhms_to_dt,
+)
+
+NUMBER: int = 20_000
+
+CASES: List[Tuple[str, str, str, Callable[[str], datetime]]] = [
+    ("ymd_to_dt", "19701231", YMD, ymd_to_dt),
+    ("ymd_to_dt", "1970-12-31", HYPHEN_YMD, ymd_to_dt),
+    ("ymdhms_to_dt", "19701231123456", YMDHMS, ymdhms_to_dt),
+    ("ymdhms_to_dt", "1970-12-31 12:34:56", HYPHEN_YMD_HMS, ymdhms_to_dt),
+    ("ymdhms_to_dt", "1970/12/31 12:34:56", SLASH_YMD_HMS, ymdhms_to_dt),
+    ("aws_to_dt", "1970-12-31T12:34:56.789Z", AWS_DATE_TIME_UTC, aws_to_dt),
+    ("aws_to_dt", "1970-12-31T12:34:56+09", AWS_DATE_TIME_JST, aws_to_dt),
+]
+
+
+def best_ns(func: Callable[[], object]) -> float:
+    return min(repeat(func, number=NUMBER, repeat=5)) / NUMBER * 1e9
+
+
+def main() -> None:
+    print(f"{'function':<14}{'input':<28}{'strptime ns':>12}{'current ns':>12}{'speedup':>9}")
+    for name, date_string, format_string, func in CASES:
+        tz = UTC if date_string.endswith("Z") else JST
+        old = best_ns(lambda: datetime.strptime(date_string, format_string).replace(tzinfo=tz))
+        new = best_ns(lambda: func(date_string))
+        print(f"{name:<14}{date_string:<28}{old:>12.0f}{new:>12.0f}{old / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+IncrementalParser vs the compiled format on time-ordered log timestamps
+
+    python -m benchmarks.bench_incremental
+"""
+from datetime import datetime, timedelta
+from timeit import repeat
+from typing import Callable, List, Tuple
+
+from libs.datearray import utcoffset_us
+from libs.dateformat import compile_format
+from libs.dateutils import AWS_DATE_TIME_UTC, HYPHEN_YMD_HMS, JST, YMDHMS, string_to_datetime
+from libs.incremental import IncrementalParser
+
+LINES: int = 100_000
+# 連続するタイムスタンプの間隔 (ミリ秒): 秒ごと・分ごと・日ごとに先頭が変わる頻度が違う
+GAPS_MS: List[int] = [10, 1_000, 60_000]
+FORMATS: List[str] = [HYPHEN_YMD_HMS, YMDHMS, AWS_DATE_TIME_UTC]
+
+
+def best_ns(func: Callable[[], object]) -> float:
+    return min(repeat(func, number=1, repeat=5)) / LINES * 1e9
+
+
+def main() -> None:
+    start = datetime(2022, 5, 15, 23, 0, 0, 123000)
+    columns: List[Tuple[str, str]] = [("compiled", "to_epoch"), ("incremental", "to_epoch"), ("s2dt", "to_datetime")]
+    header = "".join(f"{name + ' ns':>16}" for name, _ in columns)
+    print(f"{'format':<24}{'gap ms':>8}{header}{'speedup':>9}")
+    offset = utcoffset_us(JST)
+    for format_string in FORMATS:
+        compiled = compile_format(format_string)
+        for gap in GAPS_MS:
+            lines = [(start + timedelta(milliseconds=gap * i)).strftime(format_string) for i in range(LINES)]
+            old = best_ns(lambda: [compiled.to_epoch(line, offset) for line in lines])
+            new = best_ns(lambda: IncrementalParser(format_string, JST).to_epochs(lines))
+            dt = best_ns(lambda: [string_to_datetime(line, format_string, JST) for line in lines])
+            print(f"{format_string:<24}{gap:>8}{old:>16.0f}{new:>16.0f}{dt:>16.0f}{old / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+scaling of parse_file_parallel with the number of worker processes
+
+    python -m benchmarks.bench_parallel [lines]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from libs.dateutils import HYPHEN_YMD_HMS
+from libs.parallel import parse_file_parallel
+
+LINES: int = 2_000_000
+
+
+def write_file(path: str, lines: int) -> None:
+    with open(path, "w") as f:
+        for i in range(lines):
+            f.write(f"2022-05-{i % 28 + 1:02d} {i % 24:02d}:{i % 60:02d}:{i * 7 % 60:02d}\n")
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else LINES
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "timestamps.txt")
+        write_file(path, lines)
+        print(f"{lines} lines, {os.path.getsize(path) / 1e6:.1f} MB, {cpus} cpus")
+        print(f"{'workers':>8}{'seconds':>10}{'lines/s':>14}{'speedup':>9}{'efficiency':>12}")
+        base = None
+        for workers in counts:
+            started = perf_counter()
+            parse_file_parallel(path, HYPHEN_YMD_HMS, workers=workers)
+            elapsed = perf_counter() - started
+            base = base or elapsed
+            speedup = base / elapsed
+            print(f"{workers:>8}{elapsed:>10.2f}{lines / elapsed:>14,.0f}{speedup:>8.2f}x{speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
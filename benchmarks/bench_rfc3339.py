@@ -0,0 +1,91 @@
+"""
+parse_rfc3339 vs datetime.fromisoformat + fixups and datetime.strptime + fixups on a mix
+of RFC 3339 timestamps with different offsets and fraction lengths
+
+    python -m benchmarks.bench_rfc3339
+
+the fixups are what the two standard parsers need before Python 3.11 to accept the mix
+(fromisoformat takes only its own isoformat() output: no "Z", no ±HHMM / ±HH, 3 or 6
+fraction digits) plus mapping the offset to the named UTC / JST that aws_to_dt returns.
+"""
+import re
+from datetime import datetime, timedelta
+from timeit import repeat
+from typing import Callable, List
+
+from libs.dateutils import JST, UTC
+from libs.rfc3339 import parse_rfc3339
+
+NUMBER: int = 20_000
+MIX: List[str] = [
+    "2022-05-15T12:34:56.789Z",
+    "2022-05-15T12:34:56+09",
+    "2022-05-15T12:34:56.123456+05:30",
+    "2022-05-15T12:34:56-0800",
+    "2022-05-15T12:34:56.123456789Z",
+    "2022-05-15 12:34:56.5+09:00",
+]
+_NAMED = {timedelta(0): UTC, timedelta(hours=9): JST}
+_RFC3339 = re.compile(
+    r"(\d{4}-\d\d-\d\d)[Tt ](\d\d:\d\d:\d\d)(?:[.,](\d{1,9}))?(?:([Zz])|([+-]\d\d)(?::?(\d\d))?)$", re.ASCII
+)
+
+
+def _normalize(date_string: str) -> str:
+    found = _RFC3339.match(date_string)
+    if found is None:
+        raise ValueError(f"time data {date_string!r} does not match format 'RFC 3339'")
+    date, time, fraction, zulu, hours, minutes = found.groups()
+    fraction = "." + (fraction + "00000")[:6] if fraction else ""
+    offset = "+00:00" if zulu else f"{hours}:{minutes or '00'}"
+    return f"{date}T{time}{fraction}{offset}"
+
+
+def fromisoformat_fixups(date_string: str) -> datetime:
+    dt = datetime.fromisoformat(_normalize(date_string))
+    return dt.replace(tzinfo=_NAMED.get(dt.utcoffset(), dt.tzinfo))
+
+
+def strptime_fixups(date_string: str) -> datetime:
+    normalized = _normalize(date_string)
+    fmt = "%Y-%m-%dT%H:%M:%S.%f%z" if "." in normalized else "%Y-%m-%dT%H:%M:%S%z"
+    dt = datetime.strptime(normalized, fmt)
+    return dt.replace(tzinfo=_NAMED.get(dt.utcoffset(), dt.tzinfo))
+
+
+def best_ns(func: Callable[[str], datetime]) -> float:
+    def run() -> None:
+        for date_string in MIX:
+            func(date_string)
+
+    return min(repeat(run, number=NUMBER // len(MIX), repeat=5)) / (NUMBER // len(MIX) * len(MIX)) * 1e9
+
+
+def main() -> None:
+    for date_string in MIX:
+        expected = parse_rfc3339(date_string)
+        assert fromisoformat_fixups(date_string) == expected and strptime_fixups(date_string) == expected
+    print(f"{'parser':<28}{'ns/timestamp':>14}{'vs parse_rfc3339':>18}")
+    ours = best_ns(parse_rfc3339)
+    rows = [
+        ("parse_rfc3339", ours),
+        ("fromisoformat + fixups", best_ns(fromisoformat_fixups)),
+        ("strptime + fixups", best_ns(strptime_fixups)),
+        ("fromisoformat (no fixups)", best_ns(datetime.fromisoformat) if _native_fromisoformat() else float("nan")),
+    ]
+    for name, ns in rows:
+        print(f"{name:<28}{ns:>14.0f}{ns / ours:>17.2f}x")
+
+
+def _native_fromisoformat() -> bool:
+    # Python 3.11 以降の fromisoformat は MIX をそのまま解析できる (tz は名前なし)
+    try:
+        for date_string in MIX:
+            datetime.fromisoformat(date_string)
+    except ValueError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
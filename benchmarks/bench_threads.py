@@ -0,0 +1,62 @@
+"""
+thread scaling of string_to_datetime vs datetime.strptime for the built-in formats
+
+    python -m benchmarks.bench_threads [strings per thread]
+
+every thread parses the same number of strings (weak scaling), so a parser without shared
+state on its hot path keeps the per-thread rate as threads are added: the speedup is close
+to the thread count on a free-threaded build (python3.13t) with as many cores. with the GIL
+the speedup stays near 1x for both parsers.
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Barrier
+from time import perf_counter
+from typing import Callable, List
+
+from benchmarks.suite import FORMAT_SAMPLES
+from libs import dateutils as du
+
+PER_THREAD: int = 20_000
+THREADS: List[int] = [1, 2, 4, 8, 16, 32]
+
+
+def throughput(parse: Callable[[str, str], object], date_string: str, fmt: str, threads: int, count: int) -> float:
+    """
+    strings per second parsed by `threads` threads together
+    """
+    barrier = Barrier(threads + 1)
+
+    def work() -> None:
+        barrier.wait()
+        for _ in range(count):
+            parse(date_string, fmt)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(work) for _ in range(threads)]
+        barrier.wait()
+        started = perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = perf_counter() - started
+    return threads * count / elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else PER_THREAD
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, {os.cpu_count()} cpus, GIL {'enabled' if gil else 'disabled'}")
+    parsers = [("string_to_datetime", du.string_to_datetime), ("strptime", datetime.strptime)]
+    print(f"{'format':<20}{'parser':<20}" + "".join(f"{f'{n} thr':>10}" for n in THREADS) + f"{'strings/s':>12}")
+    for name, date_string in FORMAT_SAMPLES.items():
+        fmt = getattr(du, name)
+        for parser_name, parse in parsers:
+            rates = [throughput(parse, date_string, fmt, threads, count) for threads in THREADS]
+            speedups = "".join(f"{rate / rates[0]:>9.2f}x" for rate in rates)
+            print(f"{name:<20}{parser_name:<20}{speedups}{rates[-1]:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+as-of join of two timestamp streams: TimeIndex + merge_asof vs datetimes with
+dt_to_unix_time per row and a linear scan
+
+    python -m benchmarks.bench_timeindex [rows]
+
+the datetime baseline runs on the first BASELINE_ROWS rows only and is extrapolated.
+"""
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+from libs.datearray import epoch_to_datetime, np
+from libs.dateutils import UTC, dt_to_unix_time
+from libs.timeindex import TimeIndex, merge_asof
+
+ROWS: int = 10_000_000
+BASELINE_ROWS: int = 200_000
+START: int = 1652585696000000
+
+
+def timed(func: Callable[[], object]) -> Tuple[float, object]:
+    started = perf_counter()
+    result = func()
+    return perf_counter() - started, result
+
+
+def baseline(events: List[datetime], references: List[datetime]) -> List[int]:
+    # 行ごとに dt_to_unix_time してから線形に走査する、これまでのやり方
+    times = [dt_to_unix_time(dt) for dt in references]
+    result, position = [], -1
+    for dt in events:
+        value = dt_to_unix_time(dt)
+        while position + 1 < len(times) and times[position + 1] <= value:
+            position += 1
+        result.append(position)
+    return result
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    if np is not None:
+        rng = np.random.default_rng(25)
+        events = START + rng.integers(0, rows * 1_000_000, rows)
+        references = START + rng.integers(0, rows * 1_000_000, rows)
+    else:
+        events = [START + (i * 7919) % rows * 1_000_000 for i in range(rows)]
+        references = [START + (i * 104729) % rows * 1_000_000 + 500_000 for i in range(rows)]
+    build, (left, right) = timed(lambda: (TimeIndex(events, UTC), TimeIndex(references, UTC)))
+    join, positions = timed(lambda: merge_asof(left, right))
+    rows_, _ = timed(lambda: right.rows(positions))
+    print(f"{rows:,} x {rows:,} rows, numpy {'yes' if np is not None else 'no'}")
+    print(f"{'TimeIndex build (sort)':<32}{build:>10.2f} s")
+    print(f"{'merge_asof':<32}{join:>10.2f} s{rows / join:>16,.0f} rows/s")
+    print(f"{'rows (map to input order)':<32}{rows_:>10.2f} s")
+
+    sample = min(rows, BASELINE_ROWS)
+    small_left = [epoch_to_datetime(epoch, UTC) for epoch in left.epochs[:sample]]
+    small_right = [epoch_to_datetime(epoch, UTC) for epoch in right.epochs[:sample]]
+    elapsed, expected = timed(lambda: baseline(small_left, small_right))
+    assert expected == list(merge_asof(left[:sample], right[:sample]))
+    print(
+        f"{'datetimes + linear scan':<32}{elapsed * rows / sample:>10.2f} s{sample / elapsed:>16,.0f} rows/s"
+        f"  (extrapolated from {sample:,} rows, datetimes already built)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+benchmark suite for libs.dateutils with a regression gate
+
+    python -m benchmarks run [--output results.json] [--filter string_to_datetime]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.2]
+    python -m benchmarks run --baseline baseline.json   # run and compare in one go
+
+the cases cover every function in libs.instrument.PUBLIC_FUNCTIONS. left out: the cache and
+clock switches (enable_parse_cache, enable_coarse_clock, ...), iter_parse_column (file I/O)
+and the other modules (datearray, codec, timeindex, ...), which have their own bench_*.py.
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Tuple
+
+from libs import dateutils as du
+
+# 1 サンプルあたりの目安時間
+SAMPLE_NS: int = 2_000_000
+SAMPLES: int = 30
+# compare で許容する中央値の悪化率
+THRESHOLD: float = 0.2
+
+Case = Tuple[str, Callable[[], object]]
+
+dt_jst: datetime = datetime(2022, 5, 15, 12, 34, 56, 789000, tzinfo=du.JST)
+dt_utc: datetime = datetime(2022, 5, 15, 3, 34, 56, 789000, tzinfo=du.UTC)
+
+FORMAT_SAMPLES: Dict[str, str] = {
+    "HYPHEN_YMD": "2022-05-15",
+    "HYPHEN_YMD_HMS": "2022-05-15 12:34:56",
+    "SLASH_YMD": "2022/05/15",
+    "SLASH_YMD_HMS": "2022/05/15 12:34:56",
+    "YMD": "20220515",
+    "YMDHMS": "20220515123456",
+    "AWS_DATE_TIME_UTC": "2022-05-15T12:34:56.789Z",
+    "AWS_DATE_TIME_JST": "2022-05-15T12:34:56+09",
+}
+
+
+def raising(func: Callable[..., object], *args, **kwargs) -> Callable[[], object]:
+    """
+    call that is expected to raise DatetimeParseError
+    """
+
+    def call() -> None:
+        try:
+            func(*args, **kwargs)
+        except du.DatetimeParseError:
+            return
+        raise AssertionError(f"{func.__name__}{args} did not raise")
+
+    return call
+
+
+def cases() -> List[Case]:
+    result: List[Case] = []
+    for name, date_string in FORMAT_SAMPLES.items():
+        fmt = getattr(du, name)
+        result.append((f"string_to_datetime[{name}]", lambda s=date_string, f=fmt: du.string_to_datetime(s, f)))
+        result.append((f"string_to_datetime[{name}]/invalid", raising(du.string_to_datetime, "2022-13-45", fmt)))
+        result.append((f"dt_to_string[{name}]", lambda f=fmt: du.dt_to_string(dt_jst, f)))
+    result += [
+        ("string_to_datetime/invalid_type", raising(du.string_to_datetime, 20220515, du.YMD)),
+        ("ymd_to_dt[YMD]", lambda: du.ymd_to_dt("20220515")),
+        ("ymd_to_dt[HYPHEN_YMD]", lambda: du.ymd_to_dt("2022-05-15")),
+        ("ymd_to_dt[SLASH_YMD]", lambda: du.ymd_to_dt("2022/05/15")),
+        ("ymd_to_dt/invalid", raising(du.ymd_to_dt, "2022-02-30")),
+        ("ymdhms_to_dt[YMDHMS]", lambda: du.ymdhms_to_dt("20220515123456")),
+        ("ymdhms_to_dt[HYPHEN_YMD_HMS]", lambda: du.ymdhms_to_dt("2022-05-15 12:34:56")),
+        ("ymdhms_to_dt[SLASH_YMD_HMS]", lambda: du.ymdhms_to_dt("2022/05/15 12:34:56")),
+        ("ymdhms_to_dt/invalid", raising(du.ymdhms_to_dt, "20220515123460")),
+        ("aws_to_dt[UTC]", lambda: du.aws_to_dt("2022-05-15T12:34:56.789Z")),
+        ("aws_to_dt[JST]", lambda: du.aws_to_dt("2022-05-15T12:34:56+09")),
+        ("aws_to_dt/invalid", raising(du.aws_to_dt, "2022-05-15T12:34:56")),
+        ("rfc3339_to_dt[Z]", lambda: du.rfc3339_to_dt("2022-05-15T12:34:56.789Z")),
+        ("rfc3339_to_dt[+05:30]", lambda: du.rfc3339_to_dt("2022-05-15T12:34:56.123456+05:30")),
+        ("rfc3339_to_dt[basic]", lambda: du.rfc3339_to_dt("20220515T123456-0800")),
+        ("rfc3339_to_dt/invalid", raising(du.rfc3339_to_dt, "2022-05-15T12:34:56")),
+        ("dt_to_string/invalid", raising(du.dt_to_string, None, du.YMD)),
+        ("get_utc_now", du.get_utc_now),
+        ("get_jts_now", du.get_jts_now),
+        ("get_unix_time_ns", du.get_unix_time_ns),
+        ("convert_tz_utc_jst[JST]", lambda: du.convert_tz_utc_jst(dt_jst)),
+        ("convert_tz_utc_jst[UTC]", lambda: du.convert_tz_utc_jst(dt_utc)),
+        ("convert_tz_utc_jst/invalid", raising(du.convert_tz_utc_jst, datetime(2022, 5, 15))),
+        ("add_days", lambda: du.add_days(dt_jst, 3)),
+        ("add_days/invalid", raising(du.add_days, dt_jst, 1.5)),
+        ("add_hours", lambda: du.add_hours(dt_jst, 3)),
+        ("add_hours/invalid", raising(du.add_hours, None, 3)),
+        ("weekday_index", lambda: du.weekday_index(dt_jst)),
+        ("weekday_index/invalid", raising(du.weekday_index, "2022-05-15")),
+        ("weekday_name_en", lambda: du.weekday_name_en(dt_jst)),
+        ("weekday_name_jp", lambda: du.weekday_name_jp(dt_jst)),
+        ("dt_to_unix_time", lambda: du.dt_to_unix_time(dt_jst)),
+        ("dt_to_unix_time/invalid", raising(du.dt_to_unix_time, None)),
+        ("unix_time_to_dt", lambda: du.unix_time_to_dt(1652585696.789)),
+        ("unix_time_to_dt/invalid", raising(du.unix_time_to_dt, "1652585696")),
+        ("dt_to_epoch[ms]", lambda: du.dt_to_epoch(dt_jst, "ms")),
+        ("dt_to_epoch/invalid", raising(du.dt_to_epoch, datetime(2022, 5, 15))),
+        ("epoch_to_dt[ms]", lambda: du.epoch_to_dt(1652585696789, "ms")),
+        ("epoch_to_dt/invalid", raising(du.epoch_to_dt, 1652585696, "min")),
+    ]
+    return result
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[], object], samples: int = SAMPLES, sample_ns: int = SAMPLE_NS) -> Dict[str, float]:
+    """
+    time func in `samples` batches sized to about sample_ns each
+    :return: {"ops_per_sec", "mean_ns", "p50_ns", "p90_ns", "p99_ns", "min_ns", "number"}
+    """
+    number = 1
+    while True:
+        started = perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = perf_counter_ns() - started
+        if elapsed >= sample_ns // 4:
+            break
+        number *= 2
+    number = max(1, number * sample_ns // max(elapsed, 1))
+    per_call: List[float] = []
+    for _ in range(samples):
+        started = perf_counter_ns()
+        for _ in range(number):
+            func()
+        per_call.append((perf_counter_ns() - started) / number)
+    per_call.sort()
+    mean = sum(per_call) / len(per_call)
+    return {
+        "ops_per_sec": 1e9 / percentile(per_call, 0.5),
+        "mean_ns": mean,
+        "p50_ns": percentile(per_call, 0.5),
+        "p90_ns": percentile(per_call, 0.9),
+        "p99_ns": percentile(per_call, 0.99),
+        "min_ns": per_call[0],
+        "number": number,
+    }
+
+
+def run(name_filter: Optional[str] = None, samples: int = SAMPLES, sample_ns: int = SAMPLE_NS) -> dict:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func in cases():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(func, samples, sample_ns)
+        print(f"{name:<48}{results[name]['ops_per_sec']:>14,.0f} ops/s  p50 {results[name]['p50_ns']:>9,.0f} ns")
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created_at": datetime.now(tz=du.UTC).isoformat(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    compare p50 latency per case
+    :return: names of the cases that regressed past threshold
+    """
+    regressions: List[str] = []
+    print(f"{'case':<48}{'baseline ns':>12}{'current ns':>12}{'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<48}{'-':>12}{result['p50_ns']:>12,.0f}{'new':>9}")
+            continue
+        change = result["p50_ns"] / base["p50_ns"] - 1
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        print(f"{name:<48}{base['p50_ns']:>12,.0f}{result['p50_ns']:>12,.0f}{change:>+9.1%}{mark}")
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="libs.dateutils benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="run the suite")
+    run_parser.add_argument("--output", help="write results as JSON")
+    run_parser.add_argument("--filter", help="only cases whose name contains this")
+    run_parser.add_argument("--samples", type=int, default=SAMPLES)
+    run_parser.add_argument("--sample-ms", type=float, default=SAMPLE_NS / 1e6)
+    run_parser.add_argument("--baseline", help="compare with this results JSON")
+    run_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    compare_parser = sub.add_parser("compare", help="compare two results JSON files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        current = run(args.filter, args.samples, int(args.sample_ms * 1e6))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        if not args.baseline:
+            return 0
+        baseline = load(args.baseline)
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,190 @@
+"""
+asyncio interface: parse timestamp lines from a stream without blocking the event loop.
+
+lines are grouped into micro-batches (batch_size lines or max_delay seconds, whichever
+comes first), each batch is parsed in an executor, and at most max_pending batches are
+in flight; when the consumer falls behind, reading from the source stops (backpressure).
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import AsyncIterable, AsyncIterator, Deque, List, Optional, Union
+
+from .dateutils import JST, DatetimeParseError, aws_to_dt, string_to_datetime
+
+DEFAULT_BATCH_SIZE: int = 1024
+# 1 行目を受け取ってからバッチを締め切るまでの最大待ち時間 (秒)
+DEFAULT_MAX_DELAY: float = 0.005
+DEFAULT_MAX_PENDING: int = 2
+READ_SIZE: int = 64 * 1024
+THREAD_EXECUTOR: str = "thread"
+PROCESS_EXECUTOR: str = "process"
+
+Source = Union[asyncio.StreamReader, AsyncIterable[Union[str, bytes]]]
+
+
+def parse_batch(lines: List[str], format_string: Optional[str] = None, tz: timezone = JST) -> List[datetime]:
+    """
+    parse one micro-batch (runs in the executor)
+    :param lines: date strings
+    :param format_string: None for AWS date time strings (aws_to_dt)
+    :param tz: timezone of the date strings (ignored for AWS date time strings)
+    :return: [datetime, ...]
+    """
+    if format_string is None:
+        return [aws_to_dt(line) for line in lines]
+    return [string_to_datetime(line, format_string, tz) for line in lines]
+
+
+class _LineBuffer:
+    """
+    lines read from the source but not yet handed to the executor.
+    put() blocks while `limit` lines are buffered, which stops reading from the source.
+    """
+
+    def __init__(self, limit: int):
+        self.lines: List[str] = []
+        self.limit = limit
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    async def put(self, lines: List[str]) -> None:
+        self.lines.extend(line for line in lines if line)
+        self._readable.set()
+        if len(self.lines) >= self.limit:
+            self._writable.clear()
+            await self._writable.wait()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        self.closed = True
+        self.error = error
+        self._readable.set()
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        self._readable.clear()
+        if timeout is None:
+            await self._readable.wait()
+        else:
+            try:
+                await asyncio.wait_for(self._readable.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def take(self, size: int, max_delay: float) -> List[str]:
+        """
+        up to `size` lines: waits for the first line, then at most max_delay seconds for the rest
+        """
+        while not self.lines and not self.closed:
+            await self._wait(None)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_delay
+        while len(self.lines) < size and not self.closed:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            await self._wait(timeout)
+        batch = self.lines[:size]
+        del self.lines[:size]
+        if len(self.lines) < self.limit:
+            self._writable.set()
+        return batch
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode()
+    except UnicodeDecodeError as e:
+        raise DatetimeParseError(f"{e}")
+
+
+async def _read(source: Source, buffer: _LineBuffer) -> None:
+    try:
+        if isinstance(source, asyncio.StreamReader):
+            rest = b""
+            while True:
+                chunk = await source.read(READ_SIZE)
+                if not chunk:
+                    break
+                lines = (rest + chunk).split(b"\n")
+                rest = lines.pop()
+                await buffer.put([_decode(line).rstrip("\r") for line in lines])
+            await buffer.put([_decode(rest).rstrip("\r")])
+        else:
+            async for line in source:
+                line = _decode(line) if isinstance(line, (bytes, bytearray)) else line
+                await buffer.put([line.rstrip("\r\n")])
+    except Exception as e:
+        buffer.close(e)
+    else:
+        buffer.close()
+
+
+def _make_executor(executor: Union[str, Executor, None]) -> Executor:
+    if executor is None or executor == THREAD_EXECUTOR:
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="dateutils-aio")
+    if executor == PROCESS_EXECUTOR:
+        return ProcessPoolExecutor(max_workers=1)
+    raise DatetimeParseError(f"executor must be '{THREAD_EXECUTOR}', '{PROCESS_EXECUTOR}' or an Executor")
+
+
+async def parse_stream(
+    source: Source,
+    format_string: Optional[str] = None,
+    tz: timezone = JST,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    executor: Union[str, Executor, None] = THREAD_EXECUTOR,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> AsyncIterator[List[datetime]]:
+    """
+    async for batch in parse_stream(reader): ... → [datetime, ...] per micro-batch, in line order
+    :param source: asyncio.StreamReader or async iterable of lines (str or bytes); empty lines are skipped
+    :param format_string: None for AWS date time strings (aws_to_dt)
+    :param tz: timezone of the date strings
+    :param batch_size: maximum lines per batch
+    :param max_delay: maximum seconds a line waits for its batch to fill up
+    :param executor: "thread", "process" or an Executor (not shut down here; share one between many streams)
+    :param max_pending: maximum batches being parsed at the same time
+    :return: async iterator of lists of datetime
+    """
+    if source is None:
+        raise DatetimeParseError("source is require")
+    if not isinstance(source, asyncio.StreamReader) and not hasattr(source, "__aiter__"):
+        raise DatetimeParseError("source must be an asyncio.StreamReader or an async iterable")
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    for name, value in [("batch_size", batch_size), ("max_pending", max_pending)]:
+        if not isinstance(value, int) or value < 1:
+            raise DatetimeParseError(f"{name} must be a positive int")
+    if not isinstance(max_delay, (int, float)) or max_delay < 0:
+        raise DatetimeParseError("max_delay must be a non-negative number")
+    owned = not isinstance(executor, Executor)
+    pool = _make_executor(executor) if owned else executor
+
+    loop = asyncio.get_running_loop()
+    buffer = _LineBuffer(batch_size * max_pending)
+    reader = loop.create_task(_read(source, buffer))
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        while True:
+            # 解析中のバッチがあり新しい行が届いていなければ、待たずに解析結果を返す
+            if len(pending) < max_pending and (buffer.lines or not (pending or buffer.closed)):
+                batch = await buffer.take(batch_size, 0 if pending else max_delay)
+                if batch:
+                    pending.append(loop.run_in_executor(pool, parse_batch, batch, format_string, tz))
+            elif pending:
+                yield await pending.popleft()
+            elif buffer.closed:
+                break
+        if buffer.error is not None:
+            raise buffer.error
+    finally:
+        reader.cancel()
+        for future in pending:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=False, cancel_futures=True)
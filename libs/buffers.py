@@ -0,0 +1,203 @@
+"""
+parsing timestamps straight out of byte buffers (bytes, bytearray, memoryview, mmap).
+
+fixed-width records are read byte by byte at their offset: no str (or bytes) slice is
+created per record. with numpy the whole buffer is viewed as a (count, width) uint8 matrix
+and parsed column-wise, which is what lets a mmap'd file be scanned at memory speed.
+records the fast paths reject are decoded and parsed by string_to_datetime, so the results
+and error messages are the same as for the decoded strings.
+"""
+from array import array
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from .datearray import EpochArray, datetime_to_epoch, np, utcoffset_us
+from .dateformat import US_PER_DAY, US_PER_SECOND, Buffer, CompiledFormat, compile_format, field_error, fields_to_epoch
+from .dateutils import JST, DatetimeParseError, string_to_datetime
+
+
+def _view(buffer: Buffer) -> Buffer:
+    # bytes / bytearray are indexed directly (faster), anything else through a byte memoryview
+    if isinstance(buffer, (bytes, bytearray)):
+        return buffer
+    try:
+        view = memoryview(buffer)
+    except TypeError:
+        raise DatetimeParseError(f"buffer must be bytes, bytearray or memoryview, but {type(buffer).__name__}")
+    if view.format != "B" or view.ndim != 1:
+        if not view.c_contiguous:
+            raise DatetimeParseError("buffer must be contiguous")
+        view = view.cast("B")
+    return view
+
+
+def _check_args(buffer: Buffer, format_string: str, tz: timezone) -> None:
+    if buffer is None:
+        raise DatetimeParseError("buffer is require")
+    if format_string is None:
+        raise DatetimeParseError("format_string is require")
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    if not isinstance(format_string, str):
+        raise DatetimeParseError(f"format_string must be a string, but {type(format_string).__name__}")
+    if not isinstance(tz, timezone):
+        raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+
+
+def _check_int(name: str, value: int, low: int) -> None:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise DatetimeParseError(f"{name} must be an integer, but {type(value).__name__}")
+    if value < low:
+        raise DatetimeParseError(f"{name} must be {low} or more")
+
+
+def _width(compiled: CompiledFormat, width: Optional[int]) -> Optional[int]:
+    if width is not None:
+        _check_int("width", width, 1)
+        return width
+    layout = compiled.record_layout()
+    return None if layout is None else layout[0]
+
+
+def _decode(view: Buffer, start: int, end: Optional[int]) -> str:
+    try:
+        return bytes(view[start:end]).decode()
+    except UnicodeDecodeError as e:
+        raise DatetimeParseError(f"{e}")
+
+
+def bytes_to_datetime(
+    buffer: Buffer, format_string: str, tz: timezone = JST, offset: int = 0, width: Optional[int] = None
+) -> datetime:
+    """
+    string_to_datetime for one record in a byte buffer
+    b"...2022-05-15 12:34:56..." → datetime(2022, 5, 15, 12, 34, 56, tzinfo=tz)
+    :param buffer: bytes, bytearray, memoryview or mmap
+    :param format_string:
+    :param tz: timezone of the date
+    :param offset: position of the record in buffer
+    :param width: record width in bytes (default: the width of the format with 6 digit %f,
+        the rest of the buffer for formats that are not fixed-width)
+    :return: datetime
+    """
+    _check_args(buffer, format_string, tz)
+    _check_int("offset", offset, 0)
+    view = _view(buffer)
+    compiled = compile_format(format_string)
+    width = _width(compiled, width)
+    parser = compiled.record_parser(width)
+    if parser is not None and offset + width <= len(view):
+        fields = parser(view, offset)
+        if fields is not None and field_error(fields) is None:
+            return datetime(*fields, tzinfo=tz)
+    return string_to_datetime(_decode(view, offset, None if width is None else offset + width), format_string, tz)
+
+
+def buffer_to_epochs(
+    buffer: Buffer,
+    format_string: str,
+    tz: timezone = JST,
+    offset: int = 0,
+    stride: Optional[int] = None,
+    width: Optional[int] = None,
+    count: Optional[int] = None,
+) -> EpochArray:
+    """
+    parse fixed-width records laid out at offset, offset + stride, ... into epoch microseconds
+    (UTC), e.g. a mmap'd file of "2022-05-15 12:34:56\\n" lines with stride=20
+    :param buffer: bytes, bytearray, memoryview or mmap
+    :param format_string: a fixed-width format (%Y %m %d %H %M %S %f and literals)
+    :param tz: timezone of the dates
+    :param offset: position of the first record
+    :param stride: distance between record starts (default: width)
+    :param width: record width in bytes (default: the width of the format with 6 digit %f)
+    :param count: number of records (default: as many as fit in the buffer)
+    :return: numpy int64 array, or array('q') if numpy is not installed
+    """
+    _check_args(buffer, format_string, tz)
+    _check_int("offset", offset, 0)
+    view = _view(buffer)
+    compiled = compile_format(format_string)
+    width = _width(compiled, width)
+    if width is None:
+        raise DatetimeParseError(f"format_string must be a fixed-width format, but {format_string!r}")
+    if stride is None:
+        stride = width
+    _check_int("stride", stride, width)
+    available = max(0, (len(view) - offset - width) // stride + 1)
+    if count is None:
+        count = available
+    _check_int("count", count, 0)
+    if count > available:
+        raise DatetimeParseError(f"buffer has {available} records, but count is {count}")
+    utcoffset = utcoffset_us(tz)
+    layout = compiled.record_layout(width)
+    if np is not None and layout is not None:
+        epochs, invalid = _parse_columns(view, offset, stride, count, layout, utcoffset)
+        for index in invalid:
+            epochs[index] = _slow_epoch(view, offset + index * stride, width, format_string, tz)
+        return epochs
+    parser = compiled.record_parser(width)
+    epochs = array("q", bytes(8 * count))
+    for index in range(count):
+        start = offset + index * stride
+        fields = None if parser is None else parser(view, start)
+        if fields is not None and field_error(fields) is None:
+            epochs[index] = fields_to_epoch(fields, utcoffset)
+        else:
+            epochs[index] = _slow_epoch(view, start, width, format_string, tz)
+    return epochs
+
+
+def _slow_epoch(view: Buffer, start: int, width: int, format_string: str, tz: timezone) -> int:
+    # a record the fast path rejects: string_to_datetime decides (and words the error)
+    return datetime_to_epoch(string_to_datetime(_decode(view, start, start + width), format_string, tz))
+
+
+def _parse_columns(
+    view: Buffer, offset: int, stride: int, count: int, layout, utcoffset: int
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    the record parser over all records at once: (count, width) strided uint8 view of the
+    buffer, one int64 column per field
+    :return: (epochs, indexes of the records the layout rejects)
+    """
+    width, fields, literals = layout
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.intp)
+    data = np.frombuffer(view, dtype=np.uint8, count=offset + (count - 1) * stride + width)
+    records = np.lib.stride_tricks.as_strided(data[offset:], shape=(count, width), strides=(stride, 1), writeable=False)
+    # 1 回の走査で全バイトを検査する: 数字の位置は 0..9、リテラルの位置はそのバイト
+    chars = records - np.uint8(48)
+    is_digit = np.zeros(width, dtype=np.bool_)
+    expected = np.zeros(width, dtype=np.uint8)
+    for _, position, size in fields:
+        is_digit[position : position + size] = True
+    for position, byte in literals:
+        expected[position] = (byte - 48) % 256
+    ok = np.where(is_digit, chars <= 9, chars == expected).all(axis=1)
+    values = [1900, 1, 1, 0, 0, 0, 0]
+    for slot, position, size in fields:
+        value = chars[:, position].astype(np.int64)
+        for column in range(position + 1, position + size):
+            value *= 10
+            value += chars[:, column]
+        values[slot] = value * 10 ** (6 - size) if slot == 6 else value
+    year, month, day, hour, minute, second, microsecond = values
+    ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (hour <= 23) & (minute <= 59) & (second <= 59)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+    ok &= day <= days_in_month[np.where(ok, month, 0)] + (leap & (month == 2))
+    days = _days_from_civil(year, month, day)
+    epochs = days * US_PER_DAY + ((hour * 3600 + minute * 60 + second) * US_PER_SECOND + microsecond - utcoffset)
+    return np.asarray(epochs, dtype=np.int64), np.flatnonzero(~ok)
+
+
+def _days_from_civil(year: "np.ndarray", month: "np.ndarray", day: "np.ndarray") -> "np.ndarray":
+    # dateformat.days_from_civil over arrays
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
@@ -0,0 +1,359 @@
+"""
+Japanese business-day calendar (weekdays that are not national holidays).
+
+holidays are computed from the rules of the national holiday law (fixed dates, Happy
+Monday, equinoxes, substitute holidays and 国民の休日) for MIN_YEAR..MAX_YEAR. every year
+is stored as a bitset of its business days plus the number of business days before it,
+so lookups are popcounts and binary searches instead of day-by-day loops.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Final, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from .datearray import EpochArray, TimestampArray, _array_tz, as_numpy, np, utcoffset_us
+from .dateformat import US_PER_DAY, days_from_civil
+from .dateutils import DatetimeParseError
+
+# 春分日・秋分日の近似式が有効な範囲
+MIN_YEAR: Final[int] = 1980
+MAX_YEAR: Final[int] = 2099
+
+D = TypeVar("D", bound=date)
+
+# 一度きりの祝日 (皇室行事など)
+_SPECIAL_HOLIDAYS: Final[Dict[int, Tuple[Tuple[int, int, str], ...]]] = {
+    1989: ((2, 24, "昭和天皇の大喪の礼"),),
+    1990: ((11, 12, "即位礼正殿の儀"),),
+    1993: ((6, 9, "皇太子徳仁親王の結婚の儀"),),
+    2019: ((5, 1, "天皇の即位の日"), (10, 22, "即位礼正殿の儀")),
+}
+# 東京オリンピック・パラリンピックによる移動 (2020, 2021 年)
+_OLYMPIC_HOLIDAYS: Final[Dict[int, Tuple[Tuple[int, int, str], ...]]] = {
+    2020: ((7, 23, "海の日"), (7, 24, "スポーツの日"), (8, 10, "山の日")),
+    2021: ((7, 22, "海の日"), (7, 23, "スポーツの日"), (8, 8, "山の日")),
+}
+
+
+def _nth_monday(year: int, month: int, n: int) -> int:
+    first = days_from_civil(year, month, 1)
+    # 1970-01-01 is Thursday (Monday == 0)
+    return 1 + (-(first + 3)) % 7 + (n - 1) * 7
+
+
+def _equinox(year: int, base: float) -> int:
+    return int(base + 0.242194 * (year - 1980) - (year - 1980) // 4)
+
+
+def national_holidays(year: int) -> Dict[date, str]:
+    """
+    national holidays of the year, including substitute holidays and 国民の休日
+    :param year: MIN_YEAR..MAX_YEAR
+    :return: {date: name}
+    """
+    if not isinstance(year, int) or not MIN_YEAR <= year <= MAX_YEAR:
+        raise DatetimeParseError(f"year must be in {MIN_YEAR}..{MAX_YEAR}")
+    holidays: Dict[date, str] = {}
+
+    def add(month: int, day: int, name: str) -> None:
+        holidays[date(year, month, day)] = name
+
+    add(1, 1, "元日")
+    add(1, _nth_monday(year, 1, 2) if year >= 2000 else 15, "成人の日")
+    add(2, 11, "建国記念の日")
+    if year >= 2020:
+        add(2, 23, "天皇誕生日")
+    add(3, _equinox(year, 20.8431), "春分の日")
+    add(4, 29, "天皇誕生日" if year <= 1988 else "みどりの日" if year <= 2006 else "昭和の日")
+    add(5, 3, "憲法記念日")
+    if year >= 2007:
+        add(5, 4, "みどりの日")
+    add(5, 5, "こどもの日")
+    if year in _OLYMPIC_HOLIDAYS:
+        for month, day, name in _OLYMPIC_HOLIDAYS[year]:
+            add(month, day, name)
+    else:
+        if 1996 <= year <= 2002:
+            add(7, 20, "海の日")
+        elif year >= 2003:
+            add(7, _nth_monday(year, 7, 3), "海の日")
+        if year >= 2016:
+            add(8, 11, "山の日")
+        if year <= 1999:
+            add(10, 10, "体育の日")
+        else:
+            add(10, _nth_monday(year, 10, 2), "体育の日" if year <= 2019 else "スポーツの日")
+    add(9, 15 if year <= 2002 else _nth_monday(year, 9, 3), "敬老の日")
+    add(9, _equinox(year, 23.2488), "秋分の日")
+    add(11, 3, "文化の日")
+    add(11, 23, "勤労感謝の日")
+    if 1989 <= year <= 2018:
+        add(12, 23, "天皇誕生日")
+    for month, day, name in _SPECIAL_HOLIDAYS.get(year, ()):
+        add(month, day, name)
+
+    one_day = timedelta(days=1)
+    # 振替休日: 日曜日の祝日の後の最初の平日 (2006 年までは翌日のみ)
+    substitutes: Dict[date, str] = {}
+    for holiday in sorted(holidays):
+        if holiday.weekday() == 6:
+            day = holiday + one_day
+            while year >= 2007 and day in holidays:
+                day += one_day
+            if day not in holidays:
+                substitutes[day] = "振替休日"
+    # 国民の休日: 祝日に挟まれた平日 (1985 年の法改正から)
+    for holiday in sorted(holidays) if year >= 1986 else ():
+        day = holiday + 2 * one_day
+        between = holiday + one_day
+        if day in holidays and between not in holidays and between not in substitutes and between.weekday() != 6:
+            substitutes[between] = "国民の休日"
+    holidays.update((day, name) for day, name in substitutes.items() if day.year == year)
+    return dict(sorted(holidays.items()))
+
+
+# 日付は epoch (1970-01-01) からの日数で扱う
+_FIRST_DAY: Final[int] = days_from_civil(MIN_YEAR, 1, 1)
+_END_DAY: Final[int] = days_from_civil(MAX_YEAR + 1, 1, 1)
+# date.toordinal() - _ORDINAL_EPOCH == days since 1970-01-01
+_ORDINAL_EPOCH: Final[int] = date(1970, 1, 1).toordinal()
+# Jan 1 of every year (days since 1970-01-01)
+_YEAR_STARTS: Final[Tuple[int, ...]] = tuple(days_from_civil(year, 1, 1) for year in range(MIN_YEAR, MAX_YEAR + 2))
+
+
+@lru_cache(maxsize=None)
+def _calendar() -> Tuple[List[int], List[int], Dict[date, str]]:
+    """
+    (business-day bitset of every year (bit n: day n of the year, 0-based),
+     business days before Jan 1 of every year and one more entry for the end, holiday names)
+    """
+    bitsets: List[int] = []
+    cumulative: List[int] = [0]
+    names: Dict[date, str] = {}
+    for i, year in enumerate(range(MIN_YEAR, MAX_YEAR + 1)):
+        holidays = national_holidays(year)
+        names.update(holidays)
+        first = _YEAR_STARTS[i]
+        bits = 0
+        for n in range(_YEAR_STARTS[i + 1] - first):
+            # 1970-01-01 is Thursday
+            if (first + n + 3) % 7 < 5:
+                bits |= 1 << n
+        for holiday in holidays:
+            bits &= ~(1 << (holiday.toordinal() - _ORDINAL_EPOCH - first))
+        bitsets.append(bits)
+        cumulative.append(cumulative[-1] + bits.bit_count())
+    return bitsets, cumulative, names
+
+
+def _day(value: date, name: str = "dt") -> int:
+    if value is None:
+        raise DatetimeParseError(f"{name} is require")
+    if not isinstance(value, date):
+        raise DatetimeParseError(f"{name} must be a datetime or date, but {type(value).__name__}")
+    if not MIN_YEAR <= value.year <= MAX_YEAR:
+        raise DatetimeParseError(f"{name} must be in {MIN_YEAR}..{MAX_YEAR}")
+    return value.toordinal() - _ORDINAL_EPOCH
+
+
+def _count_before(day: int) -> int:
+    """
+    business days in [MIN_YEAR-01-01, day)
+    """
+    bitsets, cumulative, _ = _calendar()
+    i = bisect_right(_YEAR_STARTS, day) - 1
+    return cumulative[i] + (bitsets[i] & ((1 << (day - _YEAR_STARTS[i])) - 1)).bit_count()
+
+
+def _select(index: int) -> int:
+    """
+    day of the index-th (0-based) business day since MIN_YEAR-01-01
+    """
+    bitsets, cumulative, _ = _calendar()
+    if not 0 <= index < cumulative[-1]:
+        raise DatetimeParseError(f"result must be in {MIN_YEAR}..{MAX_YEAR}")
+    i = bisect_right(cumulative, index) - 1
+    bits, rank = bitsets[i], index - cumulative[i]
+    # 年内で rank 番目に立っているビットを二分探索する
+    low, high = 0, bits.bit_length()
+    while low < high:
+        middle = (low + high) // 2
+        if (bits & ((2 << middle) - 1)).bit_count() > rank:
+            high = middle
+        else:
+            low = middle + 1
+    return _YEAR_STARTS[i] + low
+
+
+def is_business_day(dt: date) -> bool:
+    """
+    weekday that is not a Japanese national holiday
+    :param dt: datetime or date (its own local date is used)
+    :return: bool
+    """
+    day = _day(dt)
+    i = dt.year - MIN_YEAR
+    return bool(_calendar()[0][i] >> (day - _YEAR_STARTS[i]) & 1)
+
+
+def holiday_name(dt: date) -> Optional[str]:
+    """
+    datetime(2022, 5, 3) → "憲法記念日"
+    :param dt: datetime or date
+    :return: name of the national holiday, None if dt is not a holiday
+    """
+    _day(dt)
+    return _calendar()[2].get(date(dt.year, dt.month, dt.day))
+
+
+def add_business_days(dt: D, days: int = 0) -> D:
+    """
+    move dt by x business days, keeping the time of day.
+    dt itself does not need to be a business day: +1 is the first business day after it
+    :param dt: datetime or date
+    :param days: business days (negative to go back)
+    :return: datetime or date
+    """
+    day = _day(dt)
+    if days is None:
+        raise DatetimeParseError("days is require")
+    if not isinstance(days, int):
+        raise DatetimeParseError("days must be a int")
+    if days == 0:
+        return dt
+    if days > 0:
+        target = _select(_count_before(day + 1) + days - 1)
+    else:
+        target = _select(_count_before(day) + days)
+    return dt + timedelta(days=target - day)
+
+
+def business_days_between(start: date, end: date) -> int:
+    """
+    number of business days in [start, end) (by date), negative if end is before start
+    :param start: datetime or date
+    :param end: datetime or date
+    :return: int
+    """
+    start_day, end_day = _day(start, "start"), _day(end, "end")
+    return _count_before(end_day) - _count_before(start_day)
+
+
+@lru_cache(maxsize=None)
+def _tables() -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    per-day numpy tables: (business-day flags, business days before each day, business days)
+    """
+    bitsets, _, _ = _calendar()
+    flags = np.zeros(_END_DAY - _FIRST_DAY, dtype=np.bool_)
+    for i, bits in enumerate(bitsets):
+        first, length = _YEAR_STARTS[i] - _FIRST_DAY, _YEAR_STARTS[i + 1] - _YEAR_STARTS[i]
+        year = np.frombuffer(bits.to_bytes(46, "little"), dtype=np.uint8)
+        flags[first : first + length] = np.unpackbits(year, bitorder="little")[:length]
+    counts = np.zeros(len(flags) + 1, dtype=np.int64)
+    np.cumsum(flags, out=counts[1:])
+    return flags, counts, np.flatnonzero(flags)
+
+
+def _local_days(epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Optional[timezone]):
+    if epochs is None:
+        raise DatetimeParseError("values is require")
+    tz = _array_tz(epochs, tz)
+    if isinstance(epochs, TimestampArray):
+        epochs = epochs.epochs
+    offset = utcoffset_us(tz)
+    if np is None:
+        epochs = epochs if isinstance(epochs, (array, list)) else list(epochs)
+        days = [(epoch + offset) // US_PER_DAY for epoch in epochs]
+        if days and not (_FIRST_DAY <= min(days) and max(days) < _END_DAY):
+            raise DatetimeParseError(f"values must be in {MIN_YEAR}..{MAX_YEAR}")
+        return epochs, days
+    epochs = as_numpy(epochs)
+    days = (epochs + offset) // US_PER_DAY - _FIRST_DAY
+    if len(days) and (days.min() < 0 or days.max() >= _END_DAY - _FIRST_DAY):
+        raise DatetimeParseError(f"values must be in {MIN_YEAR}..{MAX_YEAR}")
+    return epochs, days
+
+
+def is_business_day_array(
+    values: Union[TimestampArray, EpochArray, Iterable[int]], tz: Optional[timezone] = None
+) -> Union["np.ndarray", array]:
+    """
+    is_business_day for every epoch
+    :param values: TimestampArray or epoch microseconds
+    :param tz: timezone used to decide the local date (default: tz of a TimestampArray, else JST)
+    :return: numpy bool array, or array('b') if numpy is not installed
+    """
+    epochs, days = _local_days(values, tz)
+    if np is None:
+        bitsets = _calendar()[0]
+        result = array("b")
+        for day in days:
+            i = bisect_right(_YEAR_STARTS, day) - 1
+            result.append(bitsets[i] >> (day - _YEAR_STARTS[i]) & 1)
+        return result
+    return _tables()[0][days]
+
+
+def add_business_days_array(
+    values: Union[TimestampArray, EpochArray, Iterable[int]], days: int, tz: Optional[timezone] = None
+) -> Union[TimestampArray, EpochArray]:
+    """
+    add_business_days for every epoch, keeping the time of day
+    :param values: TimestampArray or epoch microseconds
+    :param days: business days (negative to go back)
+    :param tz: timezone used to decide the local date (default: tz of a TimestampArray, else JST)
+    :return: TimestampArray for a TimestampArray, else numpy int64 array (array('q') without numpy)
+    """
+    if days is None:
+        raise DatetimeParseError("days is require")
+    if not isinstance(days, int):
+        raise DatetimeParseError("days must be a int")
+    source = values if isinstance(values, TimestampArray) else None
+    epochs, local_days = _local_days(values, tz)
+    if np is None:
+        result = array("q")
+        for epoch, day in zip(epochs, local_days):
+            if days == 0:
+                target = day
+            elif days > 0:
+                target = _select(_count_before(day + 1) + days - 1)
+            else:
+                target = _select(_count_before(day) + days)
+            result.append(epoch + (target - day) * US_PER_DAY)
+    else:
+        _, counts, business = _tables()
+        if days == 0:
+            targets = local_days
+        else:
+            indices = counts[local_days + 1] + days - 1 if days > 0 else counts[local_days] + days
+            if len(indices) and (indices.min() < 0 or indices.max() >= len(business)):
+                raise DatetimeParseError(f"result must be in {MIN_YEAR}..{MAX_YEAR}")
+            targets = business[indices]
+        result = epochs + (targets - local_days) * US_PER_DAY
+    if source is not None:
+        return TimestampArray(result if np is None else array("q", result.tobytes()), source.tz)
+    return result
+
+
+def business_days_between_array(
+    starts: Union[TimestampArray, EpochArray, Iterable[int]],
+    ends: Union[TimestampArray, EpochArray, Iterable[int]],
+    tz: Optional[timezone] = None,
+) -> EpochArray:
+    """
+    business_days_between element-wise
+    :param starts: TimestampArray or epoch microseconds
+    :param ends: TimestampArray or epoch microseconds, same length as starts
+    :param tz: timezone used to decide the local dates (default: tz of a TimestampArray, else JST)
+    :return: numpy int64 array, or array('q') if numpy is not installed
+    """
+    _, start_days = _local_days(starts, tz)
+    _, end_days = _local_days(ends, tz)
+    if len(start_days) != len(end_days):
+        raise DatetimeParseError("starts and ends must have the same length")
+    if np is None:
+        return array("q", [_count_before(end) - _count_before(start) for start, end in zip(start_days, end_days)])
+    counts = _tables()[1]
+    return counts[end_days] - counts[start_days]
@@ -0,0 +1,304 @@
+"""
+compact binary encoding of timestamp sequences.
+
+    header: MAGIC, VERSION, resolution (index into UNIX_TIME_UNITS), UTC offset of tz in
+            seconds (zigzag varint), tz name (varint length + UTF-8)
+    body:   one zigzag varint per timestamp, the difference from the previous one
+            (the first from 0) in units of the resolution
+
+sorted sequences at a matching resolution take 1-2 bytes per timestamp instead of the
+14-24 of the text formats. the body has no length or terminator, so a stream can be
+appended to chunk by chunk and decoded until EOF.
+"""
+from array import array
+from datetime import timedelta, timezone
+from io import BytesIO
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+from .datearray import EpochArray, TimestampArray, _convert_unit, as_numpy, np
+from .dateutils import JST, READ_BUFFER_SIZE, UNIX_TIME_UNITS, DatetimeParseError, _check_unit
+
+MAGIC: bytes = b"DTVZ"
+VERSION: int = 1
+_UNITS: Tuple[str, ...] = tuple(UNIX_TIME_UNITS)
+# resolution ns で int64 に収まる epoch マイクロ秒の絶対値
+_NS_LIMIT: int = (2**63 - 1) // 1000
+
+
+def _wrap_int64(value: int) -> int:
+    # numpy の int64 演算と同じ 2 の補数の巡回
+    return (value + 2**63) % 2**64 - 2**63
+
+
+def _zigzag_varint(value: int, out: bytearray) -> None:
+    # 0, -1, 1, -2, ... → 0, 1, 2, 3, ...; 7 bits per byte, high bit set on all but the last byte
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if position >= len(data):
+            raise DatetimeParseError("data is truncated")
+        byte = data[position]
+        value |= (byte & 0x7F) << shift
+        position += 1
+        if byte < 0x80:
+            value = value >> 1 if value & 1 == 0 else -(value >> 1) - 1
+            return value, position
+        shift += 7
+
+
+def _header(tz: timezone, unit: str) -> bytes:
+    header = bytearray(MAGIC)
+    header += bytes([VERSION, _UNITS.index(unit)])
+    _zigzag_varint(tz.utcoffset(None) // timedelta(seconds=1), header)
+    name = tz.tzname(None).encode()
+    _zigzag_varint(len(name), header)
+    return bytes(header + name)
+
+
+def _parse_header(data: bytes) -> Optional[Tuple[timezone, str, int]]:
+    """
+    (tz, resolution, header size), None if data does not hold the whole header yet
+    """
+    if len(data) < len(MAGIC) + 2:
+        if not MAGIC.startswith(bytes(data[: len(MAGIC)])):
+            raise DatetimeParseError("data is not an encoded timestamp stream")
+        return None
+    if data[: len(MAGIC)] != MAGIC:
+        raise DatetimeParseError("data is not an encoded timestamp stream")
+    if data[len(MAGIC)] != VERSION or data[len(MAGIC) + 1] >= len(_UNITS):
+        raise DatetimeParseError(f"unsupported encoding version {data[len(MAGIC)]}")
+    try:
+        seconds, position = _read_varint(data, len(MAGIC) + 2)
+        length, position = _read_varint(data, position)
+    except DatetimeParseError:
+        return None
+    if position + length > len(data):
+        return None
+    try:
+        name = bytes(data[position : position + length]).decode()
+        tz = timezone(timedelta(seconds=seconds), name)
+    except (ValueError, TypeError) as e:
+        raise DatetimeParseError(f"invalid header: {e}")
+    return tz, _UNITS[data[len(MAGIC) + 1]], position + length
+
+
+class TimestampWriter:
+    """
+    with open("events.dtvz", "wb") as f:
+        writer = TimestampWriter(f, JST, "s")
+        for chunk in chunks:
+            writer.write(chunk)
+
+    the header is written on construction, every write() appends the deltas
+    """
+
+    def __init__(self, file: BinaryIO, tz: timezone = JST, resolution: str = "us"):
+        """
+        :param file: binary file object opened for writing
+        :param tz: timezone restored by the decoder (fixed offset, e.g. JST or UTC)
+        :param resolution: "s", "ms", "us" or "ns"; timestamps are floored to it
+        """
+        if file is None:
+            raise DatetimeParseError("file is require")
+        if tz is None:
+            raise DatetimeParseError("tz is require")
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        self._factor = _check_unit(resolution)
+        self.file = file
+        self.tz = tz
+        self.resolution = resolution
+        # last written timestamp in units of the resolution
+        self._last = 0
+        file.write(_header(tz, resolution))
+
+    def write(self, epochs: Union[TimestampArray, EpochArray, Iterable[int]]) -> int:
+        """
+        append timestamps
+        :param epochs: TimestampArray or epoch microseconds (array('q'), numpy array or iterable of int)
+        :return: number of bytes written
+        """
+        if epochs is None:
+            raise DatetimeParseError("epochs is require")
+        if isinstance(epochs, TimestampArray):
+            epochs = epochs.epochs
+        if self._factor < 1000:
+            # ナノ秒は int64 で ±292 年しか表せない
+            epochs = as_numpy(epochs) if np is not None else array("q", epochs)
+            if len(epochs) and max(max(epochs), -min(epochs)) > _NS_LIMIT:
+                raise DatetimeParseError("epochs must be within 1677-09-21..2262-04-11 for resolution ns")
+        if np is None:
+            data = self._encode(epochs)
+        else:
+            data = self._encode_numpy(_convert_unit(as_numpy(epochs), 1000, self._factor))
+        self.file.write(data)
+        return len(data)
+
+    def _encode(self, epochs: Iterable[int]) -> bytes:
+        out = bytearray()
+        last, factor = self._last, self._factor
+        for epoch in epochs:
+            value = epoch * 1000 // factor
+            if not -(2**63) <= value < 2**63:
+                raise DatetimeParseError("epochs must fit in int64 at the resolution")
+            # 差分は numpy の経路と同じく int64 で巡回させるので、どちらで decode しても同じ値になる
+            _zigzag_varint(_wrap_int64(value - last), out)
+            last = value
+        self._last = last
+        return bytes(out)
+
+    def _encode_numpy(self, values: "np.ndarray") -> bytes:
+        if len(values) == 0:
+            return b""
+        # int64 の差分は桁あふれしても uint64 上で巡回するので、decode の累積和で元に戻る
+        deltas = np.diff(values, prepend=np.int64(self._last))
+        self._last = int(values[-1])
+        zigzag = (deltas.view(np.uint64) << np.uint64(1)) ^ (deltas >> 63).view(np.uint64)
+        sizes = np.ones(len(zigzag), dtype=np.intp)
+        for groups in range(1, 10):
+            sizes += zigzag >= np.uint64(1 << (7 * groups))
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        out = np.empty(int(ends[-1]), dtype=np.uint8)
+        for group in range(int(sizes.max())):
+            has = sizes > group
+            byte = (zigzag[has] >> np.uint64(7 * group)) & np.uint64(0x7F)
+            byte |= (sizes[has] > group + 1).astype(np.uint64) << np.uint64(7)
+            out[starts[has] + group] = byte
+        return out.tobytes()
+
+
+class _Decoder:
+    """
+    incremental decoder: feed() bytes in any chunking, get the timestamps completed so far
+    """
+
+    def __init__(self) -> None:
+        self.tz: Optional[timezone] = None
+        self.resolution: Optional[str] = None
+        self._factor = 0
+        self._pending = b""
+        self._last = 0
+
+    def feed(self, data: bytes) -> EpochArray:
+        data = self._pending + bytes(data)
+        if self.tz is None:
+            header = _parse_header(data)
+            if header is None:
+                self._pending = data
+                return array("q") if np is None else np.zeros(0, dtype=np.int64)
+            self.tz, self.resolution, size = header
+            self._factor = _check_unit(self.resolution)
+            data = data[size:]
+        # 末尾の書きかけの varint は次の feed まで持ち越す
+        end = len(data)
+        while end > 0 and data[end - 1] >= 0x80:
+            end -= 1
+        self._pending = data[end:]
+        if np is None:
+            return self._decode(data[:end])
+        return self._decode_numpy(np.frombuffer(data, dtype=np.uint8, count=end))
+
+    def close(self) -> None:
+        if self._pending or self.tz is None:
+            raise DatetimeParseError("data is truncated")
+
+    def _decode(self, data: bytes) -> EpochArray:
+        epochs = array("q")
+        last, factor, position = self._last, self._factor, 0
+        while position < len(data):
+            delta, position = _read_varint(data, position)
+            last = _wrap_int64(last + delta)
+            epochs.append(last * factor // 1000)
+        self._last = last
+        return epochs
+
+    def _decode_numpy(self, data: "np.ndarray") -> EpochArray:
+        if len(data) == 0:
+            return np.zeros(0, dtype=np.int64)
+        ends = np.flatnonzero(data < 0x80) + 1
+        starts = np.concatenate(([0], ends[:-1]))
+        if int((ends - starts).max()) > 10:
+            raise DatetimeParseError("data is not an encoded timestamp stream")
+        # 各バイトの varint 内での位置 → 7 ビットずつのシフト量
+        groups = np.arange(len(data)) - np.repeat(starts, ends - starts)
+        parts = (data & 0x7F).astype(np.uint64) << (groups.astype(np.uint64) * np.uint64(7))
+        zigzag = np.bitwise_or.reduceat(parts, starts)
+        deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+        deltas[0] = _wrap_int64(int(deltas[0]) + self._last)
+        values = np.cumsum(deltas)
+        self._last = int(values[-1])
+        return _convert_unit(values, self._factor, 1000)
+
+
+def encode_timestamps(
+    epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Optional[timezone] = None, resolution: str = "us"
+) -> bytes:
+    """
+    encode timestamps into the compact binary format
+    :param epochs: TimestampArray or epoch microseconds (array('q'), numpy array or iterable of int)
+    :param tz: timezone restored by decode_timestamps (default: tz of a TimestampArray, else JST)
+    :param resolution: "s", "ms", "us" or "ns"; timestamps are floored to it
+    :return: bytes
+    """
+    if tz is None:
+        tz = epochs.tz if isinstance(epochs, TimestampArray) else JST
+    out = BytesIO()
+    TimestampWriter(out, tz, resolution).write(epochs)
+    return out.getvalue()
+
+
+def decode_timestamps(data: bytes) -> TimestampArray:
+    """
+    decode the output of encode_timestamps,
+    e.g. decode_timestamps(data).dt_to_string(AWS_DATE_TIME_UTC)
+    :param data: bytes, bytearray or memoryview
+    :return: TimestampArray at the encoded tz
+    """
+    if data is None:
+        raise DatetimeParseError("data is require")
+    decoder = _Decoder()
+    epochs = decoder.feed(data)
+    decoder.close()
+    return _timestamps(epochs, decoder.tz)
+
+
+def read_timestamps(file: BinaryIO, chunk_size: int = READ_BUFFER_SIZE) -> Iterator[TimestampArray]:
+    """
+    decode a stream written by TimestampWriter chunk by chunk
+    :param file: binary file object opened for reading
+    :param chunk_size: bytes read at a time
+    :return: iterator of TimestampArray (one per chunk that completes timestamps)
+    """
+    if file is None:
+        raise DatetimeParseError("file is require")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise DatetimeParseError("chunk_size must be a positive integer")
+    return _read_timestamps(file, chunk_size)
+
+
+def _read_timestamps(file: BinaryIO, chunk_size: int) -> Iterator[TimestampArray]:
+    decoder = _Decoder()
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        epochs = decoder.feed(chunk)
+        if len(epochs):
+            yield _timestamps(epochs, decoder.tz)
+    decoder.close()
+
+
+def _timestamps(epochs: EpochArray, tz: timezone) -> TimestampArray:
+    if isinstance(epochs, array):
+        return TimestampArray(epochs, tz)
+    values = array("q")
+    values.frombytes(epochs.tobytes())
+    return TimestampArray(values, tz)
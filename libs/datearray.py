@@ -0,0 +1,600 @@
+from array import array
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union, overload
+
+from .dateformat import (
+    MISSING_ARGUMENT,
+    US_PER_DAY,
+    civil_from_days,
+    compile_format,
+    compile_strftime,
+    days_from_civil,
+    epoch_to_fields,
+    field_error,
+    fields_to_epoch,
+)
+from .dateutils import EPOCH, JST, UTC, DatetimeParseError, _check_unit
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional extra
+    np = None
+
+EpochArray = Union["np.ndarray", array]
+
+_US: timedelta = timedelta(microseconds=1)
+US_PER_HOUR: int = 3600 * 1_000_000
+MONTH: str = "month"
+# floor_to / ceil_to / date_range の単位 → マイクロ秒 (month は暦月なので含まない)
+BUCKET_UNITS: Dict[str, int] = {
+    "second": 1_000_000,
+    "minute": 60 * 1_000_000,
+    "hour": US_PER_HOUR,
+    "day": US_PER_DAY,
+    "week": 7 * US_PER_DAY,
+}
+# 1970-01-01 は木曜日なので、週の境界 (月曜日) に揃えるために 3 日ずらす
+_WEEK_SHIFT: int = 3 * US_PER_DAY
+# try_strings_to_epochs が不正な値の位置に入れる値 (numpy.datetime64("NaT") と同じ int64)
+NAT: int = -(2**63)
+
+
+class DatetimeArray(NamedTuple):
+    """
+    result of strings_to_datetimes
+    values: numpy datetime64[us] array normalized to UTC (array('q') of epoch microseconds without numpy)
+    tz: timezone of the parsed strings
+    """
+
+    values: EpochArray
+    tz: timezone
+
+
+class ParseResult(NamedTuple):
+    """
+    result of the non-raising bulk parsers
+    values: parsed values, with a sentinel (None / NAT) where the input is invalid
+    valid: True where the input parsed
+    errors: number of invalid inputs by reason
+    """
+
+    values: Union[List[Optional[datetime]], EpochArray]
+    valid: Union["np.ndarray", array]
+    errors: Dict[str, int]
+
+
+def utcoffset_us(tz: timezone) -> int:
+    """
+    fixed UTC offset of tz in microseconds
+    :param tz:
+    :return: int
+    """
+    return tz.utcoffset(None) // _US
+
+
+def _check_args(values: Iterable[str], format_string: str, tz: timezone) -> None:
+    if values is None:
+        raise DatetimeParseError("values is require")
+    if format_string is None:
+        raise DatetimeParseError("format_string is require")
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    if not isinstance(format_string, str):
+        raise DatetimeParseError(f"format_string must be a string, but {type(format_string).__name__}")
+    if not isinstance(tz, timezone):
+        raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+
+
+def iter_epochs(values: Iterable[str], format_string: str, tz: timezone = JST) -> Iterator[int]:
+    """
+    parse strings lazily into epoch microseconds (UTC)
+    :param values: iterable of date strings
+    :param format_string:
+    :param tz: timezone of the date strings
+    :return: iterator of int
+    """
+    _check_args(values, format_string, tz)
+    return _iter_epochs(values, compile_format(format_string).to_epoch, utcoffset_us(tz))
+
+
+def _iter_epochs(values: Iterable[str], to_epoch, offset: int) -> Iterator[int]:
+    for value in values:
+        try:
+            if not isinstance(value, str):
+                raise TypeError(f"date_string must be a string, but {type(value).__name__}")
+            yield to_epoch(value, offset)
+        except (ValueError, TypeError) as e:
+            raise DatetimeParseError(f"{e}")
+
+
+def strings_to_epochs(values: Sequence[str], format_string: str, tz: timezone = JST) -> EpochArray:
+    """
+    ["1970-01-01 09:00:00", ...] → [0, ...] (epoch microseconds)
+    :param values: list or array of date strings
+    :param format_string:
+    :param tz: timezone of the date strings
+    :return: numpy int64 array, or array('q') if numpy is not installed
+    """
+    epochs = iter_epochs(values, format_string, tz)
+    if np is None:
+        return array("q", epochs)
+    return np.fromiter(epochs, dtype=np.int64, count=len(values))
+
+
+def strings_to_datetimes(values: Sequence[str], format_string: str, tz: timezone = JST) -> DatetimeArray:
+    """
+    ["1970-01-01 09:00:00", ...] → numpy.datetime64 array normalized to UTC, plus the tz
+    :param values: list or array of date strings
+    :param format_string:
+    :param tz: timezone of the date strings
+    :return: DatetimeArray(values, tz), values is a numpy datetime64[us] array,
+        or array('q') of epoch microseconds if numpy is not installed
+    """
+    epochs = strings_to_epochs(values, format_string, tz)
+    if np is None:
+        return DatetimeArray(epochs, tz)
+    return DatetimeArray(epochs.view("datetime64[us]"), tz)
+
+
+def _try_parse(values: Iterable[str], format_string: str, convert: Callable, sentinel) -> tuple:
+    parse = compile_format(format_string).try_parse
+    results: list = []
+    valid = array("b")
+    errors: Dict[str, int] = {}
+    append, mark = results.append, valid.append
+    for value in values:
+        fields = parse(value)
+        if type(fields) is str:
+            reason = MISSING_ARGUMENT if value is None else fields
+        else:
+            reason = field_error(fields)
+            if reason is None:
+                append(convert(fields))
+                mark(1)
+                continue
+        errors[reason] = errors.get(reason, 0) + 1
+        append(sentinel)
+        mark(0)
+    if np is not None:
+        valid = np.frombuffer(valid, dtype=np.bool_)
+    return results, valid, errors
+
+
+def try_parse(values: Iterable[str], format_string: str, tz: timezone = JST) -> ParseResult:
+    """
+    string_to_datetime for many values without raising on invalid ones
+    ["1970-01-01", "x"] → ParseResult([datetime(1970, 1, 1), None], [True, False], {"format_mismatch": 1})
+    :param values: iterable of date strings
+    :param format_string:
+    :param tz: timezone of the date strings
+    :return: ParseResult(list of datetime or None, validity mask, error counts by reason)
+    """
+    _check_args(values, format_string, tz)
+    results, valid, errors = _try_parse(values, format_string, lambda fields: datetime(*fields, tzinfo=tz), None)
+    return ParseResult(results, valid, errors)
+
+
+def try_strings_to_epochs(values: Iterable[str], format_string: str, tz: timezone = JST) -> ParseResult:
+    """
+    strings_to_epochs without raising on invalid values, which become NAT
+    :param values: iterable of date strings
+    :param format_string:
+    :param tz: timezone of the date strings
+    :return: ParseResult(int64 array or array('q'), validity mask, error counts by reason)
+    """
+    _check_args(values, format_string, tz)
+    offset = utcoffset_us(tz)
+    results, valid, errors = _try_parse(values, format_string, lambda fields: fields_to_epoch(fields, offset), NAT)
+    epochs = array("q", results)
+    return ParseResult(epochs if np is None else as_numpy(epochs), valid, errors)
+
+
+def datetime_to_epoch(dt: datetime) -> int:
+    """
+    epoch microseconds of a tz-aware datetime
+    :param dt:
+    :return: int
+    """
+    return (dt - EPOCH) // _US
+
+
+def epoch_to_datetime(epoch: int, tz: timezone = JST) -> datetime:
+    """
+    tz-aware datetime of epoch microseconds
+    :param epoch:
+    :param tz:
+    :return: datetime
+    """
+    return (EPOCH + timedelta(microseconds=epoch)).astimezone(tz)
+
+
+class TimestampArray:
+    """
+    compact sequence of timestamps: epoch microseconds in array('q') plus one timezone.
+    8 bytes per element, datetimes are only created when elements are read.
+    """
+
+    __slots__ = ("epochs", "tz")
+
+    def __init__(self, epochs: Iterable[int] = (), tz: timezone = JST):
+        if tz is None:
+            raise DatetimeParseError("tz is require")
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        self.epochs: array = epochs if isinstance(epochs, array) and epochs.typecode == "q" else array("q", epochs)
+        self.tz: timezone = tz
+
+    @classmethod
+    def from_datetimes(cls, dts: Iterable[datetime], tz: Optional[timezone] = None) -> "TimestampArray":
+        """
+        build from tz-aware datetimes
+        :param dts:
+        :param tz: timezone of the array (default: tz of the first datetime)
+        :return: TimestampArray
+        """
+        dts = list(dts)
+        for dt in dts:
+            if not isinstance(dt, datetime):
+                raise DatetimeParseError(f"dt must be a datetime, but {type(dt).__name__}")
+            if dt.tzinfo is None:
+                raise DatetimeParseError("dt must be a datetime with timezone")
+        if tz is None:
+            tz = dts[0].tzinfo if dts else JST
+        return cls(array("q", [datetime_to_epoch(dt) for dt in dts]), tz)
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str], format_string: str, tz: timezone = JST) -> "TimestampArray":
+        """
+        parse date strings without creating datetimes
+        :param values:
+        :param format_string:
+        :param tz: timezone of the date strings
+        :return: TimestampArray
+        """
+        return cls(array("q", iter_epochs(values, format_string, tz)), tz)
+
+    @classmethod
+    def from_unix_times(
+        cls, values: Union[EpochArray, Iterable[int]], unit: str = "s", tz: timezone = JST
+    ) -> "TimestampArray":
+        """
+        build from integer Unix times
+        :param values: array('q'), numpy array or iterable of int
+        :param unit: "s", "ms", "us" or "ns" (nanoseconds are floored to microseconds)
+        :param tz:
+        :return: TimestampArray
+        """
+        factor = _check_unit(unit)
+        if np is None:
+            return cls(array("q", [value * factor // 1000 for value in values]), tz)
+        epochs = array("q")
+        epochs.frombytes(_convert_unit(as_numpy(values), factor, 1000).tobytes())
+        return cls(epochs, tz)
+
+    @classmethod
+    def from_datetime64(cls, values: "np.ndarray", tz: timezone = JST) -> "TimestampArray":
+        """
+        build from a numpy datetime64 array holding UTC times
+        :param values:
+        :param tz:
+        :return: TimestampArray
+        """
+        epochs = array("q")
+        epochs.frombytes(as_numpy(values).tobytes())
+        return cls(epochs, tz)
+
+    def to_unix_times(self, unit: str = "s") -> EpochArray:
+        """
+        integer Unix times, floored to the unit
+        :param unit: "s", "ms", "us" or "ns"
+        :return: numpy int64 array, or array('q') if numpy is not installed
+        """
+        factor = _check_unit(unit)
+        if np is None:
+            return array("q", [epoch * 1000 // factor for epoch in self.epochs])
+        return _convert_unit(as_numpy(self.epochs), 1000, factor)
+
+    def to_datetime64(self) -> "np.ndarray":
+        """
+        numpy datetime64[us] array (UTC) sharing the buffer
+        :return: numpy.ndarray
+        """
+        if np is None:
+            raise DatetimeParseError("numpy is required for to_datetime64")
+        return as_numpy(self.epochs).view("datetime64[us]")
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    @overload
+    def __getitem__(self, index: int) -> datetime:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TimestampArray":
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TimestampArray(self.epochs[index], self.tz)
+        return epoch_to_datetime(self.epochs[index], self.tz)
+
+    def __iter__(self) -> Iterator[datetime]:
+        tz = self.tz
+        for epoch in self.epochs:
+            yield epoch_to_datetime(epoch, tz)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimestampArray):
+            return NotImplemented
+        return self.tz == other.tz and self.epochs == other.epochs
+
+    def __repr__(self) -> str:
+        return f"TimestampArray(len={len(self)}, tz={self.tz})"
+
+    def _shift(self, delta: int) -> "TimestampArray":
+        if np is None:
+            return TimestampArray(array("q", [epoch + delta for epoch in self.epochs]), self.tz)
+        shifted = array("q")
+        shifted.frombytes((np.frombuffer(self.epochs, dtype=np.int64) + delta).tobytes())
+        return TimestampArray(shifted, self.tz)
+
+    def add_days(self, days: int = 0) -> "TimestampArray":
+        """
+        add x days to every timestamp
+        :param days:
+        :return: TimestampArray
+        """
+        if days is None:
+            raise DatetimeParseError("days is require")
+        if not isinstance(days, int):
+            raise DatetimeParseError("days must be a int")
+        return self._shift(days * US_PER_DAY)
+
+    def add_hours(self, hours: int = 0) -> "TimestampArray":
+        """
+        add x hours to every timestamp
+        :param hours:
+        :return: TimestampArray
+        """
+        if hours is None:
+            raise DatetimeParseError("hours is require")
+        if not isinstance(hours, int):
+            raise DatetimeParseError("hours must be a int")
+        return self._shift(hours * US_PER_HOUR)
+
+    def convert_tz_utc_jst(self) -> "TimestampArray":
+        """
+        convert timezone JST <--> UTC (the epochs are shared, only tz changes)
+        :return: TimestampArray
+        """
+        if self.tz == JST:
+            return TimestampArray(self.epochs, UTC)
+        elif self.tz == UTC:
+            return TimestampArray(self.epochs, JST)
+        else:
+            raise DatetimeParseError("dt must be a datetime with timezone UTC or JST")
+
+    def dt_to_string(self, fmt: str) -> List[str]:
+        """
+        convert every timestamp to formatted string
+        :param fmt: format string
+        :return: list of formatted datetime string
+        """
+        if fmt is None:
+            raise DatetimeParseError("fmt is require")
+        if not isinstance(fmt, str):
+            raise DatetimeParseError("fmt must be a string")
+        template = compile_strftime(fmt)
+        if template is None:
+            return [dt.strftime(fmt) for dt in self]
+        offset = utcoffset_us(self.tz)
+        formatted: List[str] = []
+        for epoch in self.epochs:
+            fields = epoch_to_fields(epoch, offset)
+            if fields[0] < 1000:
+                # strftime pads years below 1000 differently per platform
+                formatted.append(epoch_to_datetime(epoch, self.tz).strftime(fmt))
+            else:
+                formatted.append(template.format(*fields))
+        return formatted
+
+    def weekday_index(self) -> array:
+        """
+        0: Monday, 1: Tuesday, ..., 6: Sunday
+        :return: numpy uint8 array, or array('B') if numpy is not installed
+        """
+        return weekday_codes(self)
+
+    def floor_to(self, unit: str) -> "TimestampArray":
+        """
+        start of the unit (second, minute, hour, day, week, month) containing every timestamp
+        :param unit:
+        :return: TimestampArray
+        """
+        return floor_to(self, unit)
+
+    def ceil_to(self, unit: str) -> "TimestampArray":
+        """
+        first unit boundary at or after every timestamp
+        :param unit:
+        :return: TimestampArray
+        """
+        return ceil_to(self, unit)
+
+
+def as_numpy(epochs: Union[EpochArray, Iterable[int]]) -> "np.ndarray":
+    """
+    int64 numpy view (or copy) of epoch microseconds
+    :param epochs: array('q'), numpy int64 / datetime64 array or iterable of int
+    :return: numpy int64 array
+    """
+    if isinstance(epochs, array) and epochs.typecode == "q":
+        return np.frombuffer(epochs, dtype=np.int64)
+    if isinstance(epochs, np.ndarray) and epochs.dtype.kind == "M":
+        return epochs.astype("datetime64[us]").view(np.int64)
+    return np.asarray(epochs, dtype=np.int64)
+
+
+def _convert_unit(values: "np.ndarray", numerator: int, denominator: int) -> "np.ndarray":
+    # values * numerator // denominator without overflowing the intermediate
+    if numerator >= denominator:
+        return values * (numerator // denominator)
+    return values // (denominator // numerator)
+
+
+def _array_tz(epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Optional[timezone]) -> timezone:
+    # 明示された tz が優先、None なら TimestampArray の tz (それ以外は JST)
+    if tz is not None:
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        return tz
+    return epochs.tz if isinstance(epochs, TimestampArray) else JST
+
+
+def weekday_codes(
+    epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Optional[timezone] = None
+) -> EpochArray:
+    """
+    weekday of every epoch as uint8 codes, 0: Monday, 1: Tuesday, ..., 6: Sunday.
+    WEEKDAY_NAMES_EN / WEEKDAY_NAMES_JP are the matching label tables.
+    :param epochs: TimestampArray or epoch microseconds
+    :param tz: timezone used to decide the local date (default: tz of a TimestampArray, else JST)
+    :return: numpy uint8 array, or array('B') if numpy is not installed
+    """
+    tz = _array_tz(epochs, tz)
+    if isinstance(epochs, TimestampArray):
+        epochs = epochs.epochs
+    offset = utcoffset_us(tz)
+    # 1970-01-01 is Thursday
+    if np is None:
+        return array("B", [((epoch + offset) // US_PER_DAY + 3) % 7 for epoch in epochs])
+    return (((as_numpy(epochs) + offset) // US_PER_DAY + 3) % 7).astype(np.uint8)
+
+
+def _bucket(
+    epochs: Union[TimestampArray, EpochArray, Iterable[int]], unit: str, tz: Optional[timezone], ceil: bool
+):
+    if epochs is None:
+        raise DatetimeParseError("values is require")
+    if unit != MONTH and unit not in BUCKET_UNITS:
+        raise DatetimeParseError(f"unit must be one of {', '.join([*BUCKET_UNITS, MONTH])}")
+    tz = _array_tz(epochs, tz)
+    source = epochs if isinstance(epochs, TimestampArray) else None
+    if source is not None:
+        epochs = source.epochs
+    offset = utcoffset_us(tz)
+    if np is None:
+        result = array("q", [_bucket_one(epoch + offset, unit, ceil) - offset for epoch in epochs])
+    else:
+        local = as_numpy(epochs) + offset
+        if unit == MONTH:
+            months = local.view("datetime64[us]").astype("datetime64[M]")
+            floored = months.astype("datetime64[us]").view(np.int64)
+            if ceil:
+                floored = (months + (floored != local)).astype("datetime64[us]").view(np.int64)
+        else:
+            size, shift = BUCKET_UNITS[unit], _WEEK_SHIFT if unit == "week" else 0
+            if ceil:
+                floored = -(-(local + shift) // size) * size - shift
+            else:
+                floored = (local + shift) // size * size - shift
+        result = floored - offset
+    if source is not None:
+        return TimestampArray(result if np is None else array("q", result.tobytes()), source.tz)
+    return result
+
+
+def _bucket_one(local: int, unit: str, ceil: bool) -> int:
+    if unit == MONTH:
+        year, month, _ = civil_from_days(local // US_PER_DAY)
+        floored = days_from_civil(year, month, 1) * US_PER_DAY
+        if ceil and floored != local:
+            floored = days_from_civil(year + month // 12, month % 12 + 1, 1) * US_PER_DAY
+        return floored
+    size, shift = BUCKET_UNITS[unit], _WEEK_SHIFT if unit == "week" else 0
+    if ceil:
+        return -(-(local + shift) // size) * size - shift
+    return (local + shift) // size * size - shift
+
+
+def floor_to(
+    values: Union[TimestampArray, EpochArray, Iterable[int]], unit: str, tz: Optional[timezone] = None
+) -> Union[TimestampArray, EpochArray]:
+    """
+    start of the bucket containing every timestamp, in the local time of tz.
+    weeks start on Monday (weekday_index 0), month is the calendar month.
+    :param values: TimestampArray or epoch microseconds
+    :param unit: second, minute, hour, day, week or month
+    :param tz: timezone whose local time defines the buckets (default: tz of a TimestampArray, else JST)
+    :return: TimestampArray for a TimestampArray, else numpy int64 array (array('q') without numpy)
+    """
+    return _bucket(values, unit, tz, False)
+
+
+def ceil_to(
+    values: Union[TimestampArray, EpochArray, Iterable[int]], unit: str, tz: Optional[timezone] = None
+) -> Union[TimestampArray, EpochArray]:
+    """
+    first bucket boundary at or after every timestamp (timestamps on a boundary are kept)
+    :param values: TimestampArray or epoch microseconds
+    :param unit: second, minute, hour, day, week or month
+    :param tz: timezone whose local time defines the buckets (default: tz of a TimestampArray, else JST)
+    :return: TimestampArray for a TimestampArray, else numpy int64 array (array('q') without numpy)
+    """
+    return _bucket(values, unit, tz, True)
+
+
+def date_range(start: datetime, end: datetime, step: Union[timedelta, str] = "day") -> Iterator[datetime]:
+    """
+    lazy datetimes from start (inclusive) to end (exclusive), like range()
+    :param start: datetime with timezone
+    :param end: datetime with timezone
+    :param step: timedelta (may be negative) or second, minute, hour, day, week, month.
+        month keeps the day of start, clamped to the end of shorter months
+    :return: iterator of datetime in the timezone of start
+    """
+    for name, value in [("start", start), ("end", end)]:
+        if value is None:
+            raise DatetimeParseError(f"{name} is require")
+        if not isinstance(value, datetime):
+            raise DatetimeParseError(f"{name} must be a datetime, but {type(value).__name__}")
+        if value.tzinfo is None:
+            raise DatetimeParseError(f"{name} must be a datetime with timezone")
+    if step is None:
+        raise DatetimeParseError("step is require")
+    if isinstance(step, str):
+        if step == MONTH:
+            return _month_range(start, end)
+        if step not in BUCKET_UNITS:
+            raise DatetimeParseError(f"step must be a timedelta or one of {', '.join([*BUCKET_UNITS, MONTH])}")
+        step = timedelta(microseconds=BUCKET_UNITS[step])
+    if not isinstance(step, timedelta):
+        raise DatetimeParseError(f"step must be a timedelta or a unit, but {type(step).__name__}")
+    if not step:
+        raise DatetimeParseError("step must not be zero")
+    return _timedelta_range(start, end, step)
+
+
+def _timedelta_range(start: datetime, end: datetime, step: timedelta) -> Iterator[datetime]:
+    current = start
+    forward = step > timedelta(0)
+    while current < end if forward else current > end:
+        yield current
+        try:
+            current += step
+        except OverflowError:
+            # datetime.min / datetime.max を越える: end に届く前に範囲が尽きた
+            return
+
+
+def _month_range(start: datetime, end: datetime) -> Iterator[datetime]:
+    current, months = start, 0
+    while current < end:
+        yield current
+        months += 1
+        year, month = divmod(start.year * 12 + start.month - 1 + months, 12)
+        if year > 9999:
+            return
+        current = start.replace(year=year, month=month + 1, day=min(start.day, monthrange(year, month + 1)[1]))
@@ -0,0 +1,640 @@
+import re
+import threading
+import weakref
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Final, List, Optional, Pattern, Tuple, Union
+
+# compile_format が保持するコンパイル済みフォーマットの最大数
+FORMAT_CACHE_SIZE: Final[int] = 128
+
+# year, month, day, hour, minute, second, microsecond
+Fields = Tuple[int, int, int, int, int, int, int]
+# bytes, bytearray, memoryview (of unsigned bytes) or mmap: anything indexable into byte values
+Buffer = Union[bytes, bytearray, memoryview]
+# record width, (slot, position, size) per field, (position, byte) per literal byte
+RecordLayout = Tuple[int, Tuple[Tuple[int, int, int], ...], Tuple[Tuple[int, int], ...]]
+
+# directive -> (regex, field slot). the regexes are the ones used by _strptime
+# so that the compiled engine accepts exactly the same strings as strptime.
+_DIRECTIVES: Final[dict] = {
+    "Y": (r"(\d\d\d\d)", 0),
+    "m": (r"(1[0-2]|0[1-9]|[1-9])", 1),
+    "d": (r"(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])", 2),
+    "H": (r"(2[0-3]|[0-1]\d|\d)", 3),
+    "M": (r"([0-5]\d|\d)", 4),
+    "S": (r"(6[0-1]|[0-5]\d|\d)", 5),
+    "f": (r"([0-9]{1,6})", 6),
+}
+# directive -> (width, min, max) used by the fixed-width fast path.
+# every value accepted here is matched the same way by the regex above.
+_FIXED_WIDTH: Final[dict] = {
+    "Y": (4, 0, 9999),
+    "m": (2, 1, 12),
+    "d": (2, 1, 31),
+    "H": (2, 0, 23),
+    "M": (2, 0, 59),
+    "S": (2, 0, 61),
+}
+_ASCII_DIGITS: Final[bytes] = b"0123456789"
+_WHITESPACE: Final[Pattern] = re.compile(r"\s+")
+
+_DAYS_IN_MONTH: Final[Tuple[int, ...]] = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# try_parse / field_error が返す失敗理由 (libs.instrument の原因名と同じ)
+MISSING_ARGUMENT: Final[str] = "missing_argument"
+INVALID_TYPE: Final[str] = "invalid_type"
+FORMAT_MISMATCH: Final[str] = "format_mismatch"
+UNCONVERTED_DATA: Final[str] = "unconverted_data"
+OUT_OF_RANGE: Final[str] = "out_of_range"
+# libs.instrument だけが使う原因名
+INVALID_TIMEZONE: Final[str] = "invalid_timezone"
+EMPTY: Final[str] = "empty"
+
+US_PER_SECOND: Final[int] = 1_000_000
+US_PER_DAY: Final[int] = 86_400 * US_PER_SECOND
+
+
+def days_from_civil(year: int, month: int, day: int) -> int:
+    """
+    days since 1970-01-01 of the proleptic Gregorian date
+    :param year:
+    :param month:
+    :param day:
+    :return: int
+    """
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def civil_from_days(days: int) -> Tuple[int, int, int]:
+    """
+    proleptic Gregorian date of days since 1970-01-01
+    :param days:
+    :return: (year, month, day)
+    """
+    days += 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def epoch_to_fields(epoch: int, utcoffset: int = 0) -> Fields:
+    """
+    convert epoch microseconds to local fields
+    :param epoch: epoch microseconds
+    :param utcoffset: offset of the local time from UTC in microseconds
+    :return: (year, month, day, hour, minute, second, microsecond)
+    """
+    days, rest = divmod(epoch + utcoffset, US_PER_DAY)
+    seconds, microsecond = divmod(rest, US_PER_SECOND)
+    hour, seconds = divmod(seconds, 3600)
+    minute, second = divmod(seconds, 60)
+    return civil_from_days(days) + (hour, minute, second, microsecond)
+
+
+def check_fields(fields: Fields) -> None:
+    """
+    validate fields the same way the datetime constructor does
+    :param fields:
+    :return:
+    """
+    year, month, day, hour, minute, second, microsecond = fields
+    if not 1 <= year <= 9999:
+        raise ValueError(f"year {year} is out of range")
+    if not 1 <= month <= 12:
+        raise ValueError("month must be in 1..12")
+    days = _DAYS_IN_MONTH[month]
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days = 29
+    if not 1 <= day <= days:
+        raise ValueError("day is out of range for month")
+    if not 0 <= hour <= 23:
+        raise ValueError("hour must be in 0..23")
+    if not 0 <= minute <= 59:
+        raise ValueError("minute must be in 0..59")
+    if not 0 <= second <= 59:
+        raise ValueError("second must be in 0..59")
+    if not 0 <= microsecond <= 999999:
+        raise ValueError("microsecond must be in 0..999999")
+
+
+def field_error(fields: Fields) -> Optional[str]:
+    """
+    check_fields without raising
+    :param fields:
+    :return: OUT_OF_RANGE, or None if the datetime constructor accepts the fields
+    """
+    year, month, day, hour, minute, second, microsecond = fields
+    if not (1 <= year <= 9999 and 1 <= month <= 12 and 1 <= day and 0 <= hour <= 23 and 0 <= minute <= 59):
+        return OUT_OF_RANGE
+    if not (0 <= second <= 59 and 0 <= microsecond <= 999999):
+        return OUT_OF_RANGE
+    if day > _DAYS_IN_MONTH[month]:
+        if not (month == 2 and day == 29 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+            return OUT_OF_RANGE
+    return None
+
+
+def fields_to_epoch(fields: Fields, utcoffset: int = 0) -> int:
+    """
+    convert validated fields to epoch microseconds
+    :param fields:
+    :param utcoffset: offset of the fields' local time from UTC in microseconds
+    :return: int
+    """
+    year, month, day, hour, minute, second, microsecond = fields
+    seconds = days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    return seconds * US_PER_SECOND + microsecond - utcoffset
+
+
+class CompiledFormat:
+    """
+    format string compiled once into a reusable parser.
+    accepts the same input and raises the same ValueError as datetime.strptime
+    for the directives %Y %m %d %H %M %S %f %% and literal text.
+    """
+
+    __slots__ = ("format_string", "_regex", "_slots", "_fixed", "_records")
+
+    def __init__(
+        self,
+        format_string: str,
+        regex: Pattern,
+        slots: List[int],
+        fixed: Optional[Callable[[str], Optional[Fields]]] = None,
+    ):
+        self.format_string = format_string
+        self._regex = regex
+        self._slots = tuple(slots)
+        self._fixed = fixed
+        # record width → generated parser over byte buffers
+        self._records: dict = {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.format_string!r})"
+
+    def parse(self, date_string: str) -> Fields:
+        """
+        parse date_string into datetime fields
+        :param date_string:
+        :return: (year, month, day, hour, minute, second, microsecond)
+        """
+        if not isinstance(date_string, str):
+            raise TypeError(f"date_string must be a string, but {type(date_string).__name__}")
+        if self._fixed is not None:
+            fields = self._fixed(date_string)
+            if fields is not None:
+                return fields
+        found = self._regex.match(date_string)
+        if found is None:
+            raise ValueError(f"time data {date_string!r} does not match format {self.format_string!r}")
+        if len(date_string) != found.end():
+            raise ValueError(f"unconverted data remains: {date_string[found.end():]}")
+        return self._fields(found)
+
+    def match_fixed(self, date_string: str) -> Optional[Fields]:
+        """
+        fields if date_string fits the fixed-width layout exactly (fields not range checked
+        beyond what the layout implies), None otherwise or when the format has no such layout
+        :param date_string:
+        :return: fields or None
+        """
+        if self._fixed is None or not isinstance(date_string, str):
+            return None
+        return self._fixed(date_string)
+
+    def record_layout(self, width: Optional[int] = None) -> Optional[RecordLayout]:
+        """
+        layout of fixed-width records of this format in a byte buffer
+        :param width: record width in bytes (default: the width with 6 digit %f)
+        :return: (width, fields, literal bytes), None if the format has no fixed-width layout
+            or %f does not get 1-6 digits in width
+        """
+        if self._fixed is None:
+            return None
+        return _record_layout(_tokenize(self.format_string), width)
+
+    def record_parser(self, width: Optional[int] = None) -> Optional[Callable[[Buffer, int], Optional[Fields]]]:
+        """
+        parser(buffer, offset) reading the byte values of one record in place (no str / bytes
+        slice is created). like match_fixed, fields are range checked only as far as the
+        layout implies and None is returned for a record that does not fit the layout
+        :param width: record width in bytes (default: the width with 6 digit %f)
+        :return: parser, None if the format has no fixed-width layout
+        """
+        # filled lazily and shared by all threads: two threads may build the parser of the same
+        # width at once, which is a benign race (equal parsers, the dict assignment is atomic)
+        if width in self._records:
+            return self._records[width]
+        layout = self.record_layout(width)
+        parser = None if layout is None else _record_parser(layout)
+        self._records[width] = parser
+        return parser
+
+    def try_parse(self, date_string: str) -> Union[Fields, str]:
+        """
+        parse without raising: no exception is created for invalid input
+        :param date_string:
+        :return: fields, or the reason (INVALID_TYPE, FORMAT_MISMATCH, UNCONVERTED_DATA) as str
+        """
+        if not isinstance(date_string, str):
+            return INVALID_TYPE
+        if self._fixed is not None:
+            fields = self._fixed(date_string)
+            if fields is not None:
+                return fields
+        found = self._regex.match(date_string)
+        if found is None:
+            return FORMAT_MISMATCH
+        if len(date_string) != found.end():
+            return UNCONVERTED_DATA
+        return self._fields(found)
+
+    def _fields(self, found) -> Fields:
+        fields = [1900, 1, 1, 0, 0, 0, 0]
+        for slot, value in zip(self._slots, found.groups()):
+            if slot == 6:
+                value += "0" * (6 - len(value))
+            fields[slot] = int(value)
+        return tuple(fields)
+
+    def to_datetime(self, date_string: str, tz: Optional[timezone] = None) -> datetime:
+        """
+        parse date_string into datetime
+        :param date_string:
+        :param tz:
+        :return: datetime
+        """
+        return datetime(*self.parse(date_string), tzinfo=tz)
+
+    def to_epoch(self, date_string: str, utcoffset: int = 0) -> int:
+        """
+        parse date_string into epoch microseconds without creating a datetime
+        :param date_string:
+        :param utcoffset: offset of date_string's local time from UTC in microseconds
+        :return: int
+        """
+        fields = self.parse(date_string)
+        check_fields(fields)
+        return fields_to_epoch(fields, utcoffset)
+
+
+class StrptimeFormat(CompiledFormat):
+    """
+    fallback for format strings using directives that the engine does not support
+    """
+
+    __slots__ = ()
+
+    def __init__(self, format_string: str):
+        super().__init__(format_string, None, [])
+
+    def parse(self, date_string: str) -> Fields:
+        dt = datetime.strptime(date_string, self.format_string)
+        return dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond
+
+    def to_datetime(self, date_string: str, tz: Optional[timezone] = None) -> datetime:
+        return datetime.strptime(date_string, self.format_string).replace(tzinfo=tz)
+
+    def try_parse(self, date_string: str) -> Union[Fields, str]:
+        # strptime has no non-raising mode: the exception is translated into the reason
+        try:
+            return self.parse(date_string)
+        except TypeError:
+            return INVALID_TYPE
+        except ValueError as e:
+            message = str(e)
+            if "unconverted data remains" in message:
+                return UNCONVERTED_DATA
+            if "does not match format" in message:
+                return FORMAT_MISMATCH
+            return OUT_OF_RANGE
+
+
+def _tokenize(format_string: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    split format string into ("%", directive) and ("", literal) tokens,
+    None for anything the engine does not support
+    """
+    tokens: List[Tuple[str, str]] = []
+    index = 0
+    length = len(format_string)
+    while index < length:
+        char = format_string[index]
+        if char == "%":
+            if index + 1 >= length:
+                return None
+            directive = format_string[index + 1]
+            index += 2
+            if directive == "%":
+                tokens.append(("", "%"))
+            elif directive in _DIRECTIVES:
+                tokens.append(("%", directive))
+            else:
+                return None
+            continue
+        whitespace = _WHITESPACE.match(format_string, index)
+        if whitespace is not None:
+            tokens.append((" ", whitespace.group()))
+            index = whitespace.end()
+            continue
+        tokens.append(("", char))
+        index += 1
+    return tokens
+
+
+def _fixed_width_parser(tokens: List[Tuple[str, str]]) -> Optional[Callable[[str], Optional[Fields]]]:
+    """
+    generate a slice-and-int parser for formats whose fields have fixed width,
+    e.g. "%Y%m%d%H%M%S" or "%Y-%m-%dT%H:%M:%S.%fZ" (only %f may vary, 1-6 digits).
+    the parser returns None whenever the input does not fit the layout exactly or a
+    field is out of the regex range, so that the regex path decides the error.
+    """
+    width = 0
+    for index, (kind, value) in enumerate(tokens):
+        if kind != "%":
+            if not value.isascii():
+                return None
+            width += len(value)
+        elif value == "f":
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            # %f is greedy, so it must be followed by a literal (or the end) to be sliced
+            if following is not None and (following[0] == "%" or following[1][0].isdigit()):
+                return None
+        elif value in _FIXED_WIDTH:
+            width += _FIXED_WIDTH[value][0]
+        else:
+            return None
+    has_fraction = any(kind == "%" and value == "f" for kind, value in tokens)
+    lines = ["def parse(s):", "    n = len(s)"]
+    if has_fraction:
+        lines.append(f"    extra = n - {width}")
+        lines.append("    if not 1 <= extra <= 6 or not s.isascii():")
+    else:
+        lines.append(f"    if n != {width} or not s.isascii():")
+    lines.append("        return None")
+    lines.append("    b = s.encode()")
+    separators = "".join(value for kind, value in tokens if kind != "%")
+    separators = separators.translate(str.maketrans("", "", "0123456789"))
+    # every non digit must be a separator, and every separator must be in place
+    lines.append(f"    if b.translate(None, _DIGITS) != {separators.encode()!r}:")
+    lines.append("        return None")
+    fields = ["1900", "1", "1", "0", "0", "0", "0"]
+    checks: List[str] = []
+    # positions after %f are counted back from the end of the string
+    position = 0
+    from_end = False
+
+    def at(offset: int) -> str:
+        return f"b[n - {position - offset}]" if from_end else f"b[{position + offset}]"
+
+    for kind, value in tokens:
+        if kind == "%" and value == "f":
+            tail = width - position
+            fields[6] = f"int(s[{position}:n - {tail}])" if tail else f"int(s[{position}:])"
+            fields[6] += " * 10 ** (6 - extra)"
+            position, from_end = tail, True
+            continue
+        if kind != "%":
+            checks.extend(f"{at(offset)} == {char}" for offset, char in enumerate(value.encode()))
+            size = len(value)
+        else:
+            size, low, high = _FIXED_WIDTH[value]
+            name = f"v{_DIRECTIVES[value][1]}"
+            # "1970" → b[0]*1000 + b[1]*100 + b[2]*10 + b[3] - 53328 (ASCII "0" == 48)
+            terms = [f"{at(offset)}*{10 ** (size - 1 - offset)}" for offset in range(size - 1)]
+            lines.append(f"    {name} = {' + '.join(terms + [at(size - 1)])} - {48 * int('1' * size)}")
+            if value != "Y":
+                checks.append(f"{low} <= {name} <= {high}")
+            fields[_DIRECTIVES[value][1]] = name
+        position = position - size if from_end else position + size
+    if checks:
+        lines.append("    if not (" + " and ".join(checks) + "):")
+        lines.append("        return None")
+    lines.append(f"    return ({', '.join(fields)})")
+    namespace = {"_DIGITS": _ASCII_DIGITS}
+    exec("\n".join(lines), namespace)
+    return namespace["parse"]
+
+
+def _record_layout(tokens: List[Tuple[str, str]], width: Optional[int]) -> Optional[RecordLayout]:
+    """
+    byte positions of the fields and literals of a fixed-width format; only %f takes
+    the width that the fixed-width fields and literals leave
+    """
+    fixed = sum(len(value.encode()) if kind != "%" else _FIXED_WIDTH.get(value, (0,))[0] for kind, value in tokens)
+    has_fraction = any(kind == "%" and value == "f" for kind, value in tokens)
+    if width is None:
+        width = fixed + 6 if has_fraction else fixed
+    fraction = width - fixed
+    if not (1 <= fraction <= 6 if has_fraction else fraction == 0):
+        return None
+    fields: List[Tuple[int, int, int]] = []
+    literals: List[Tuple[int, int]] = []
+    position = 0
+    for kind, value in tokens:
+        if kind != "%":
+            literals.extend((position + offset, byte) for offset, byte in enumerate(value.encode()))
+            position += len(value.encode())
+            continue
+        size = fraction if value == "f" else _FIXED_WIDTH[value][0]
+        fields.append((_DIRECTIVES[value][1], position, size))
+        position += size
+    return width, tuple(fields), tuple(literals)
+
+
+def _record_parser(layout: RecordLayout) -> Callable[[Buffer, int], Optional[Fields]]:
+    """
+    generate parse(b, o) for one record at offset o of a byte buffer,
+    e.g. "%Y-%m-%d" → c0 = b[o] - 48, ..., v0 = c0*1000 + c1*100 + c2*10 + c3
+    """
+    width, fields, literals = layout
+    lines = ["def parse(b, o):"]
+    digits: List[int] = []
+    values = ["1900", "1", "1", "0", "0", "0", "0"]
+    checks: List[str] = []
+    for slot, position, size in fields:
+        digits.extend(range(position, position + size))
+        value = " + ".join(f"c{position + offset}*{10 ** (size - 1 - offset)}" for offset in range(size))
+        if slot == 6:
+            value = f"({value}) * {10 ** (6 - size)}"
+        lines.append(f"    v{slot} = {value}")
+        values[slot] = f"v{slot}"
+        if slot in (1, 2, 3, 4, 5):
+            _, low, high = _FIXED_WIDTH["mdHMS"[slot - 1]]
+            checks.append(f"{low} <= v{slot} <= {high}")
+    for position in digits:
+        lines.insert(1, f"    c{position} = b[o + {position}] - 48")
+    # every digit is a digit and every literal byte is in place, before the fields are trusted
+    conditions = [f"0 <= c{position} <= 9" for position in digits]
+    conditions += [f"b[o + {position}] == {byte}" for position, byte in literals]
+    if conditions:
+        lines.insert(len(digits) + 1, "    if not (" + " and ".join(conditions) + "):")
+        lines.insert(len(digits) + 2, "        return None")
+    if checks:
+        lines.append("    if not (" + " and ".join(checks) + "):")
+        lines.append("        return None")
+    lines.append(f"    return ({', '.join(values)})")
+    namespace: dict = {}
+    exec("\n".join(lines), namespace)
+    return namespace["parse"]
+
+
+def _build(format_string: str) -> Optional[CompiledFormat]:
+    tokens = _tokenize(format_string)
+    if tokens is None:
+        return None
+    pattern: List[str] = []
+    slots: List[int] = []
+    for kind, value in tokens:
+        if kind == "%":
+            regex, slot = _DIRECTIVES[value]
+            if slot in slots:
+                return None
+            pattern.append(regex)
+            slots.append(slot)
+        elif kind == " ":
+            pattern.append(r"\s+")
+        else:
+            pattern.append(re.escape(value))
+    regex = re.compile("".join(pattern), re.IGNORECASE)
+    return CompiledFormat(format_string, regex, slots, _fixed_width_parser(tokens))
+
+
+# directive -> str.format field used by compile_strftime
+_STRFTIME: Final[dict] = {
+    "Y": "{0:04d}",
+    "m": "{1:02d}",
+    "d": "{2:02d}",
+    "H": "{3:02d}",
+    "M": "{4:02d}",
+    "S": "{5:02d}",
+    "f": "{6:06d}",
+}
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def compile_strftime(format_string: str) -> Optional[str]:
+    """
+    translate a strftime format into a str.format template over fields,
+    "%Y-%m-%d" → "{0:04d}-{1:02d}-{2:02d}"
+    :param format_string:
+    :return: template, None if the format uses directives other than %Y %m %d %H %M %S %f %%
+    """
+    tokens = _tokenize(format_string)
+    if tokens is None:
+        return None
+    template: List[str] = []
+    for kind, value in tokens:
+        if kind == "%":
+            template.append(_STRFTIME[value])
+        else:
+            template.append(value.replace("{", "{{").replace("}", "}}"))
+    return "".join(template)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def compile_format(format_string: str) -> CompiledFormat:
+    """
+    compile format string into a parser, cached by format string
+    :param format_string:
+    :return: CompiledFormat (StrptimeFormat for unsupported directives)
+    """
+    if not isinstance(format_string, str):
+        raise TypeError(f"format_string must be a string, but {type(format_string).__name__}")
+    compiled = _build(format_string)
+    if compiled is None:
+        return StrptimeFormat(format_string)
+    return compiled
+
+
+# thread_format のスレッドごとのキャッシュ: (世代, {format_string: CompiledFormat}, [ヒット数])
+_local = threading.local()
+# format_cache_clear で増やし、各スレッドのキャッシュを次の参照時に捨てさせる
+_generation: int = 0
+# 各スレッドのヒット数カウンタ (スレッドへの弱参照, [ヒット数])。書き込むのは持ち主のスレッドだけ
+_counters: List[Tuple[weakref.ref, List[int]]] = []
+_counters_lock = threading.Lock()
+# 終了したスレッドのヒット数の合計、format_cache_clear 時点のヒット数の合計
+_retired_hits: int = 0
+_cleared_hits: int = 0
+
+
+def _thread_counter() -> List[int]:
+    # スレッドごとに最初の 1 回だけ呼ばれる: 終了したスレッドのカウンタはここでまとめる
+    global _retired_hits
+    counter = [0]
+    with _counters_lock:
+        alive = []
+        for ref, hits in _counters:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                _retired_hits += hits[0]
+            else:
+                alive.append((ref, hits))
+        alive.append((weakref.ref(threading.current_thread()), counter))
+        _counters[:] = alive
+    return counter
+
+
+def _thread_hits() -> int:
+    with _counters_lock:
+        return _retired_hits + sum(hits[0] for _, hits in _counters)
+
+
+def thread_format(format_string: str) -> CompiledFormat:
+    """
+    compile_format through a per-thread cache. a hit reads only the calling thread's dict and
+    bumps the thread's own counter, so parsing threads share no lock (the lru_cache of
+    compile_format takes one per call on free-threaded builds). CompiledFormat is shared:
+    its only mutable state is the lazily filled record_parser table, see there
+    :param format_string:
+    :return: CompiledFormat (StrptimeFormat for unsupported directives)
+    """
+    try:
+        generation, formats, hits = _local.cache
+    except AttributeError:
+        generation, formats, hits = None, None, _thread_counter()
+    if generation != _generation:
+        formats = {}
+        _local.cache = (_generation, formats, hits)
+    compiled = formats.get(format_string)
+    if compiled is not None:
+        hits[0] += 1
+        return compiled
+    compiled = compile_format(format_string)
+    if len(formats) >= FORMAT_CACHE_SIZE:
+        formats.clear()
+    formats[format_string] = compiled
+    return compiled
+
+
+def format_cache_info():
+    """
+    hit/miss statistics of the compiled format cache. hits include the per-thread cache
+    hits of thread_format (string_to_datetime), misses are the formats actually compiled
+    :return: CacheInfo(hits, misses, maxsize, currsize)
+    """
+    info = compile_format.cache_info()
+    return info._replace(hits=info.hits + _thread_hits() - _cleared_hits)
+
+
+def format_cache_clear() -> None:
+    """
+    clear the compiled format cache (the per-thread caches of thread_format included)
+    and reset the statistics
+    :return:
+    """
+    global _generation, _cleared_hits
+    _generation += 1
+    _cleared_hits = _thread_hits()
+    compile_format.cache_clear()
@@ -1,5 +1,13 @@
+import csv
+import json
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Final, List, Optional, Union
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Callable, Dict, Final, Iterator, List, Optional, Tuple, Union
+
+from .dateformat import thread_format
+from .rfc3339 import parse_rfc3339, register_timezone
 
 HYPHEN_YMD: Final[str] = "%Y-%m-%d"
 HYPHEN_YMD_HMS: Final[str] = "%Y-%m-%d %H:%M:%S"
@@ -10,6 +18,25 @@ YMDHMS: Final[str] = "%Y%m%d%H%M%S"
 AWS_DATE_TIME_UTC: Final[str] = "%Y-%m-%dT%H:%M:%S.%fZ"
 AWS_DATE_TIME_JST: Final[str] = "%Y-%m-%dT%H:%M:%S+09"
 
+WEEKDAY_NAMES_EN: Final[Tuple[str, ...]] = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+WEEKDAY_NAMES_JP: Final[Tuple[str, ...]] = ("月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日")
+
+# unix time の単位 → ナノ秒
+UNIX_TIME_UNITS: Final[dict] = {"s": 1_000_000_000, "ms": 1_000_000, "us": 1_000, "ns": 1}
+
+CSV_FILE: Final[str] = "csv"
+JSONL_FILE: Final[str] = "jsonl"
+# iter_parse_column の読み込みバッファサイズ
+READ_BUFFER_SIZE: Final[int] = 1024 * 1024
+
 # 日本標準時
 JST: Final[timezone] = timezone(timedelta(hours=+9), "JST")
 # 東ヨーロッパ時間
@@ -27,11 +54,84 @@ MST: Final[timezone] = timezone(timedelta(hours=-7), "MST")
 # 太平洋標準時
 PST: Final[timezone] = timezone(timedelta(hours=-8), "PST")
 
+EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=UTC)
+
+# rfc3339_to_dt / aws_to_dt は "Z" / "+00:00" を UTC、"+09" / "+09:00" を JST にする
+register_timezone(UTC)
+register_timezone(JST)
+
 
 class DatetimeParseError(Exception):
     pass
 
 
+# enable_parse_cache のデフォルトの最大エントリ数
+PARSE_CACHE_SIZE: Final[int] = 4096
+
+
+def _parse(date_string: str, format_string: str, tz: timezone, tzname: Optional[str]) -> datetime:
+    # tzname is part of the cache key: timezones with the same offset compare equal
+    if format_string is None:
+        # rfc3339_to_dt: the timezone comes from the string
+        return parse_rfc3339(date_string)
+    return thread_format(format_string).to_datetime(date_string, tz)
+
+
+_parse_cache: Optional[Callable[[str, str, timezone, Optional[str]], datetime]] = None
+
+
+def enable_parse_cache(maxsize: int = PARSE_CACHE_SIZE) -> None:
+    """
+    memoize string_to_datetime (and ymd_to_dt / ymdhms_to_dt, which use it) on
+    (date_string, format_string, tz) and rfc3339_to_dt / aws_to_dt on date_string.
+    repeated strings return the same datetime object. the cache is shared by all threads
+    (one lock per call), without it the parse path keeps only per-thread state.
+    :param maxsize: maximum number of cached datetimes (least recently used ones are dropped)
+    :return:
+    """
+    if not isinstance(maxsize, int) or isinstance(maxsize, bool) or maxsize < 1:
+        raise DatetimeParseError("maxsize must be a positive int")
+    global _parse_cache
+    _parse_cache = lru_cache(maxsize=maxsize)(_parse)
+
+
+def disable_parse_cache() -> None:
+    """
+    parse every call again and drop the cached datetimes
+    :return:
+    """
+    global _parse_cache
+    _parse_cache = None
+
+
+def parse_cache_info() -> Optional[Dict[str, Union[int, float]]]:
+    """
+    :return: {"hits", "misses", "maxsize", "currsize", "hit_rate"}, None if the cache is disabled
+    """
+    cache = _parse_cache
+    if cache is None:
+        return None
+    info = cache.cache_info()
+    calls = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "maxsize": info.maxsize,
+        "currsize": info.currsize,
+        "hit_rate": info.hits / calls if calls else 0.0,
+    }
+
+
+def parse_cache_clear() -> None:
+    """
+    drop the cached datetimes and reset the statistics
+    :return:
+    """
+    cache = _parse_cache
+    if cache is not None:
+        cache.cache_clear()
+
+
 def string_to_datetime(date_string: str, format_string: str, tz: timezone = JST) -> datetime:
     if date_string is None:
         raise DatetimeParseError("date_string is require")
@@ -48,7 +148,10 @@ def string_to_datetime(date_string: str, format_string: str, tz: timezone = JST)
         if not isinstance(tz, timezone):
             raise TypeError(f"tz must be a timezone, but {type(tz).__name__}")
 
-        return datetime.strptime(date_string, format_string).replace(tzinfo=tz)
+        cache = _parse_cache
+        if cache is not None:
+            return cache(date_string, format_string, tz, tz.tzname(None))
+        return thread_format(format_string).to_datetime(date_string, tz)
     except (ValueError, TypeError) as e:
         raise DatetimeParseError(f"{e}")
 
@@ -87,12 +190,14 @@ def ymdhms_to_dt(date_string: str, tz=JST) -> datetime:
     return string_to_datetime(date_string=date_string, format_string=fmt, tz=tz)
 
 
-def aws_to_dt(date_string: str) -> datetime:
+def rfc3339_to_dt(date_string: str) -> datetime:
     """
-    "1970-12-31T12:34:56.789Z" → datetime(1970, 12, 31, 12, 34, 56, 789, timezone=UTC)
-    "1970-12-31T12:34:56+09" → datetime(1970, 12, 31, 12, 34, 56, timezone=JST)
+    "1970-12-31T12:34:56.789Z" → datetime(1970, 12, 31, 12, 34, 56, 789000, timezone=UTC)
+    "1970-12-31T12:34:56+05:30" → datetime(1970, 12, 31, 12, 34, 56, timezone=UTC+05:30)
+    RFC 3339 and the common ISO 8601 subset: YYYY-MM-DD or YYYYMMDD, "T" or " ", HH:MM[:SS]
+    or HHMM[SS], 0-9 fraction digits (truncated to microseconds), Z / ±HH:MM / ±HHMM / ±HH
     :param date_string:
-    :return:
+    :return: datetime (UTC and JST offsets get the UTC and JST timezones)
     """
     if date_string is None:
         raise DatetimeParseError("date_string is require")
@@ -100,15 +205,24 @@ def aws_to_dt(date_string: str) -> datetime:
         raise DatetimeParseError("date_string must be a string")
     if date_string == "":
         raise DatetimeParseError("date_string is empty")
-    tz: Optional[timezone] = None
-    fmt: Optional[str] = None
-    if date_string.endswith("Z"):
-        tz = UTC
-        fmt = AWS_DATE_TIME_UTC
-    if date_string.endswith("+09"):
-        tz = JST
-        fmt = AWS_DATE_TIME_JST
-    return string_to_datetime(date_string=date_string, format_string=fmt, tz=tz)
+    try:
+        cache = _parse_cache
+        if cache is not None:
+            return cache(date_string, None, None, None)
+        return parse_rfc3339(date_string)
+    except ValueError as e:
+        raise DatetimeParseError(f"{e}")
+
+
+def aws_to_dt(date_string: str) -> datetime:
+    """
+    "1970-12-31T12:34:56.789Z" → datetime(1970, 12, 31, 12, 34, 56, 789, timezone=UTC)
+    "1970-12-31T12:34:56+09" → datetime(1970, 12, 31, 12, 34, 56, timezone=JST)
+    any other offset and fraction length is accepted as well, see rfc3339_to_dt
+    :param date_string:
+    :return:
+    """
+    return rfc3339_to_dt(date_string)
 
 
 def dt_to_string(dt: datetime, fmt: str) -> str:
@@ -129,11 +243,126 @@ def dt_to_string(dt: datetime, fmt: str) -> str:
     return dt.strftime(fmt)
 
 
+class CoarseClock:
+    """
+    wall clock with a coarse resolution for frequent timestamping.
+    time advances with time.monotonic_ns and is resynced with the wall clock every resync_ns.
+    within one tick the same int / datetime objects are returned.
+    """
+
+    def __init__(self, resolution_ns: int = 1_000_000, resync_ns: int = 1_000_000_000):
+        if not isinstance(resolution_ns, int) or resolution_ns < 1:
+            raise DatetimeParseError("resolution_ns must be a positive int")
+        if not isinstance(resync_ns, int) or resync_ns < 1:
+            raise DatetimeParseError("resync_ns must be a positive int")
+        self.resolution_ns: int = resolution_ns
+        self.resync_ns: int = resync_ns
+        self._synced_at: int = 0
+        self._offset: int = 0
+        self._sync(time.monotonic_ns())
+        # (tick, epoch ns) and (tick, {(tz, tzname): datetime}) are replaced as a whole: threads never see a torn state
+        self._now: Tuple[int, int] = (-1, 0)
+        self._datetimes: Tuple[int, Dict[Tuple[timezone, Optional[str]], datetime]] = (-1, {})
+
+    def _sync(self, monotonic: int) -> None:
+        self._offset = time.time_ns() - monotonic
+        self._synced_at = monotonic
+
+    def time_ns(self) -> int:
+        """
+        current Unix time in nanoseconds, truncated to the resolution
+        :return: int
+        """
+        monotonic = time.monotonic_ns()
+        tick = monotonic // self.resolution_ns
+        now = self._now
+        if now[0] == tick:
+            return now[1]
+        if monotonic - self._synced_at >= self.resync_ns:
+            self._sync(monotonic)
+        epoch_ns = (monotonic + self._offset) // self.resolution_ns * self.resolution_ns
+        self._now = (tick, epoch_ns)
+        return epoch_ns
+
+    def now(self, tz: timezone = UTC) -> datetime:
+        """
+        current datetime at tz, truncated to the resolution
+        :param tz:
+        :return: datetime
+        """
+        # tzname is part of the key: timezones with the same offset compare equal
+        key = (tz, tz.tzname(None))
+        cached_tick, datetimes = self._datetimes
+        if cached_tick == time.monotonic_ns() // self.resolution_ns:
+            dt = datetimes.get(key)
+            if dt is not None:
+                return dt
+        self.time_ns()
+        tick, epoch_ns = self._now
+        if cached_tick != tick:
+            datetimes = {}
+            self._datetimes = (tick, datetimes)
+        dt = (EPOCH + timedelta(microseconds=epoch_ns // 1000)).astimezone(tz)
+        datetimes[key] = dt
+        return dt
+
+
+_coarse_clock: Optional[CoarseClock] = None
+
+
+def _ms_to_ns(name: str, value: float) -> int:
+    if value is None:
+        raise DatetimeParseError(f"{name} is require")
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise DatetimeParseError(f"{name} must be a int or float, but {type(value).__name__}")
+    if not 0 < value < float("inf"):
+        raise DatetimeParseError(f"{name} must be a positive number")
+    ns = int(value * 1_000_000)
+    if ns < 1:
+        raise DatetimeParseError(f"{name} must be at least 0.000001 (1 nanosecond)")
+    return ns
+
+
+def enable_coarse_clock(resolution_ms: float = 1, resync_ms: float = 1000) -> CoarseClock:
+    """
+    make get_utc_now / get_jts_now / get_unix_time_ns use a coarse clock
+    :param resolution_ms: tick length in milliseconds (e.g. 1 or 10)
+    :param resync_ms: interval to resync with the wall clock in milliseconds
+    :return: CoarseClock
+    """
+    global _coarse_clock
+    _coarse_clock = CoarseClock(_ms_to_ns("resolution_ms", resolution_ms), _ms_to_ns("resync_ms", resync_ms))
+    return _coarse_clock
+
+
+def disable_coarse_clock() -> None:
+    """
+    go back to reading the wall clock on every call
+    :return:
+    """
+    global _coarse_clock
+    _coarse_clock = None
+
+
+def get_unix_time_ns() -> int:
+    """
+    current Unix time in nanoseconds (coarse if enable_coarse_clock was called)
+    :return: int
+    """
+    clock = _coarse_clock
+    if clock is not None:
+        return clock.time_ns()
+    return time.time_ns()
+
+
 def get_utc_now() -> datetime:
     """
     current datetime at UTC
     :return: datetime
     """
+    clock = _coarse_clock
+    if clock is not None:
+        return clock.now(UTC)
     return datetime.now(tz=UTC)
 
 
@@ -142,6 +371,9 @@ def get_jts_now() -> datetime:
     current datetime at JST
     :return:
     """
+    clock = _coarse_clock
+    if clock is not None:
+        return clock.now(JST)
     return datetime.now(tz=JST)
 
 
@@ -223,16 +455,7 @@ def weekday_name_en(dt: datetime) -> str:
     :param dt:
     :return:
     """
-    names: List[str] = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-    return names[weekday_index(dt)]
+    return WEEKDAY_NAMES_EN[weekday_index(dt)]
 
 
 def weekday_name_jp(dt: datetime) -> str:
@@ -241,8 +464,7 @@ def weekday_name_jp(dt: datetime) -> str:
     :param dt:
     :return:
     """
-    names: List[str] = ["月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日"]
-    return names[weekday_index(dt)]
+    return WEEKDAY_NAMES_JP[weekday_index(dt)]
 
 
 def dt_to_unix_time(dt: datetime) -> float:
@@ -273,4 +495,127 @@ def unix_time_to_dt(ut: Union[float, int], tz: timezone = JST) -> datetime:
         raise DatetimeParseError("ut must be a float or int")
     if not isinstance(tz, timezone):
         raise DatetimeParseError("tz must be a timezone")
-    return datetime.fromtimestamp(ut).replace(tzinfo=tz)
+    return datetime.fromtimestamp(ut, tz=tz)
+
+
+def _check_unit(unit: str) -> int:
+    if unit not in UNIX_TIME_UNITS:
+        raise DatetimeParseError(f"unit must be one of {', '.join(UNIX_TIME_UNITS)}")
+    return UNIX_TIME_UNITS[unit]
+
+
+def dt_to_epoch(dt: datetime, unit: str = "s") -> int:
+    """
+    get integer Unix time from datetime, without the float rounding of dt_to_unix_time
+    :param dt: datetime with timezone
+    :param unit: "s", "ms", "us" or "ns"
+    :return: int (floored to the unit)
+    """
+    if dt is None:
+        raise DatetimeParseError("dt is require")
+    if not isinstance(dt, datetime):
+        raise DatetimeParseError("dt must be a datetime")
+    if dt.tzinfo is None:
+        raise DatetimeParseError("dt must be a datetime with timezone")
+    factor = _check_unit(unit)
+    return (dt - EPOCH) // timedelta(microseconds=1) * 1000 // factor
+
+
+def epoch_to_dt(epoch: int, unit: str = "s", tz: timezone = JST) -> datetime:
+    """
+    get datetime from integer Unix time (nanoseconds are floored to microseconds)
+    :param epoch:
+    :param unit: "s", "ms", "us" or "ns"
+    :param tz:
+    :return: datetime
+    """
+    if epoch is None:
+        raise DatetimeParseError("epoch is require")
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    if not isinstance(epoch, int):
+        raise DatetimeParseError("epoch must be a int")
+    if not isinstance(tz, timezone):
+        raise DatetimeParseError("tz must be a timezone")
+    factor = _check_unit(unit)
+    try:
+        return (EPOCH + timedelta(microseconds=epoch * factor // 1000)).astimezone(tz)
+    except OverflowError as e:
+        raise DatetimeParseError(f"{e}")
+
+
+def iter_parse_column(
+    path_or_file: Union[Path, str, IO[str]],
+    column: Union[str, int],
+    format_string: str,
+    tz: timezone = JST,
+    batch_size: Optional[int] = None,
+    file_type: Optional[str] = None,
+) -> Iterator[Union[datetime, List[datetime]]]:
+    """
+    parse a timestamp column of a CSV (with header) or JSONL file lazily
+    :param path_or_file: file path or opened text file
+    :param column: CSV header name / index, or JSONL key
+    :param format_string:
+    :param tz: timezone
+    :param batch_size: yield lists of this size instead of single datetimes
+    :param file_type: CSV_FILE or JSONL_FILE, guessed from the file name if omitted
+    :return: iterator of datetime (or list of datetime)
+    """
+    if path_or_file is None:
+        raise DatetimeParseError("path_or_file is require")
+    if column is None:
+        raise DatetimeParseError("column is require")
+    if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+        raise DatetimeParseError("batch_size must be a positive int")
+    if file_type is None:
+        name = path_or_file if isinstance(path_or_file, (Path, str)) else getattr(path_or_file, "name", "")
+        file_type = JSONL_FILE if Path(str(name)).suffix in (".jsonl", ".ndjson") else CSV_FILE
+    if file_type not in (CSV_FILE, JSONL_FILE):
+        raise DatetimeParseError(f"file_type must be {CSV_FILE} or {JSONL_FILE}")
+
+    values = _iter_column(path_or_file, column, file_type)
+    rows = (string_to_datetime(date_string=value, format_string=format_string, tz=tz) for value in values)
+    if batch_size is None:
+        return rows
+    return _iter_batches(rows, batch_size)
+
+
+def _iter_column(path_or_file: Union[Path, str, IO[str]], column: Union[str, int], file_type: str) -> Iterator:
+    if isinstance(path_or_file, (Path, str)):
+        with open(path_or_file, "r", newline="", buffering=READ_BUFFER_SIZE) as f:
+            yield from _iter_column(f, column, file_type)
+        return
+    if file_type == JSONL_FILE:
+        for number, line in enumerate(path_or_file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise DatetimeParseError(f"line {number} is not valid JSON: {e}")
+            if not isinstance(record, dict):
+                raise DatetimeParseError(f"line {number} must be a JSON object, but {type(record).__name__}")
+            yield record.get(column)
+        return
+    reader = csv.reader(path_or_file)
+    header = next(reader, [])
+    index = column
+    if not isinstance(column, int):
+        if column not in header:
+            raise DatetimeParseError(f"column {column} not found")
+        index = header.index(column)
+    for row in reader:
+        if row:
+            yield row[index] if index < len(row) else None
+
+
+def _iter_batches(rows: Iterator[datetime], batch_size: int) -> Iterator[List[datetime]]:
+    batch: List[datetime] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
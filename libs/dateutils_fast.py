@@ -0,0 +1,118 @@
+"""
+unchecked variants of the libs.dateutils API for inputs that are already validated.
+
+same arguments and same results as libs.dateutils on valid input, but without the
+None / isinstance guards and without wrapping errors: invalid input raises whatever
+the underlying call raises (ValueError, TypeError, AttributeError, ...), not DatetimeParseError.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+from .dateformat import compile_format, thread_format
+from .dateutils import (  # noqa: F401
+    AWS_DATE_TIME_JST,
+    AWS_DATE_TIME_UTC,
+    CET,
+    CST,
+    EET,
+    EPOCH,
+    EST,
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    JST,
+    MST,
+    PST,
+    SLASH_YMD,
+    SLASH_YMD_HMS,
+    UNIX_TIME_UNITS,
+    UTC,
+    WEEKDAY_NAMES_EN,
+    WEEKDAY_NAMES_JP,
+    YMD,
+    YMDHMS,
+    DatetimeParseError,
+    get_jts_now,
+    get_unix_time_ns,
+    get_utc_now,
+)
+from .rfc3339 import parse_rfc3339
+
+_US: timedelta = timedelta(microseconds=1)
+_YMD = compile_format(YMD)
+_SLASH_YMD = compile_format(SLASH_YMD)
+_HYPHEN_YMD = compile_format(HYPHEN_YMD)
+_YMDHMS = compile_format(YMDHMS)
+_SLASH_YMD_HMS = compile_format(SLASH_YMD_HMS)
+_HYPHEN_YMD_HMS = compile_format(HYPHEN_YMD_HMS)
+
+
+def string_to_datetime(date_string: str, format_string: str, tz: timezone = JST) -> datetime:
+    return thread_format(format_string).to_datetime(date_string, tz)
+
+
+def ymd_to_dt(date_string: str, tz=JST) -> datetime:
+    if "-" in date_string:
+        return _HYPHEN_YMD.to_datetime(date_string, tz)
+    if "/" in date_string:
+        return _SLASH_YMD.to_datetime(date_string, tz)
+    return _YMD.to_datetime(date_string, tz)
+
+
+def ymdhms_to_dt(date_string: str, tz=JST) -> datetime:
+    if "-" in date_string:
+        return _HYPHEN_YMD_HMS.to_datetime(date_string, tz)
+    if "/" in date_string:
+        return _SLASH_YMD_HMS.to_datetime(date_string, tz)
+    return _YMDHMS.to_datetime(date_string, tz)
+
+
+def rfc3339_to_dt(date_string: str) -> datetime:
+    return parse_rfc3339(date_string)
+
+
+def aws_to_dt(date_string: str) -> datetime:
+    return parse_rfc3339(date_string)
+
+
+def dt_to_string(dt: datetime, fmt: str) -> str:
+    return dt.strftime(fmt)
+
+
+def convert_tz_utc_jst(dt: datetime) -> datetime:
+    return dt.astimezone(UTC if dt.tzinfo == JST else JST)
+
+
+def add_days(dt: datetime, days: int = 0) -> datetime:
+    return dt + timedelta(days=days)
+
+
+def add_hours(dt: datetime, hours: int = 0) -> datetime:
+    return dt + timedelta(hours=hours)
+
+
+def weekday_index(dt: datetime) -> int:
+    return dt.weekday()
+
+
+def weekday_name_en(dt: datetime) -> str:
+    return WEEKDAY_NAMES_EN[dt.weekday()]
+
+
+def weekday_name_jp(dt: datetime) -> str:
+    return WEEKDAY_NAMES_JP[dt.weekday()]
+
+
+def dt_to_unix_time(dt: datetime) -> float:
+    return dt.timestamp()
+
+
+def unix_time_to_dt(ut: Union[float, int], tz: timezone = JST) -> datetime:
+    return datetime.fromtimestamp(ut, tz=tz)
+
+
+def dt_to_epoch(dt: datetime, unit: str = "s") -> int:
+    return (dt - EPOCH) // _US * 1000 // UNIX_TIME_UNITS[unit]
+
+
+def epoch_to_dt(epoch: int, unit: str = "s", tz: timezone = JST) -> datetime:
+    return (EPOCH + timedelta(microseconds=epoch * UNIX_TIME_UNITS[unit] // 1000)).astimezone(tz)
@@ -0,0 +1,175 @@
+"""
+stateful parser for time-ordered strings of one format.
+
+consecutive log timestamps usually share the date (and often the hour and minute), so the
+parser remembers the prefix up to %H and up to %S of the last fully parsed string together
+with the epoch of that day / minute. when a new string has the same prefix only the tail
+is parsed. prefixes are only reused for fixed-width layouts, where equal prefixes
+mean equal fields, so the results are exactly those of string_to_datetime.
+"""
+import re
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+
+from .datearray import EpochArray, np, utcoffset_us
+from .dateformat import (
+    US_PER_DAY,
+    US_PER_SECOND,
+    CompiledFormat,
+    check_fields,
+    compile_format,
+    days_from_civil,
+    field_error,
+)
+from .dateutils import JST, DatetimeParseError
+
+_DIRECTIVE = re.compile(r"%(.)")
+_SAMPLE = datetime(2000, 1, 1)
+
+
+def _split(format_string: str, at: str, before: str, after: str) -> Optional[Tuple[int, CompiledFormat]]:
+    """
+    (width of the string before directive `at`, compiled format of the rest) when the
+    directives before `at` are all in `before` and the ones from `at` on are all in `after`
+    """
+    directives = [(found.start(), found.group(1)) for found in _DIRECTIVE.finditer(format_string)]
+    starts = [start for start, directive in directives if directive == at]
+    if len(starts) != 1:
+        return None
+    start = starts[0]
+    if any(directive not in (before if position < start else after) + "%" for position, directive in directives):
+        return None
+    tail = compile_format(format_string[start:])
+    if tail.match_fixed(_SAMPLE.strftime(format_string[start:])) is None:
+        return None
+    return len(_SAMPLE.strftime(format_string[:start])), tail
+
+
+class IncrementalParser:
+    """
+    parser = IncrementalParser(HYPHEN_YMD_HMS, JST)
+    for line in sorted_lines:
+        epoch = parser.to_epoch(line)
+
+    works for any format string; the prefix reuse applies to fixed-width formats whose
+    date directives (%Y %m %d) all come before %H and %M before %S, e.g. YMDHMS,
+    HYPHEN_YMD_HMS, SLASH_YMD_HMS, AWS_DATE_TIME_UTC.
+    """
+
+    __slots__ = (
+        "format_string",
+        "tz",
+        "_format",
+        "_offset",
+        "_origin",
+        "_day",
+        "_minute",
+        "_day_key",
+        "_day_base",
+        "_minute_key",
+        "_minute_base",
+    )
+
+    def __init__(self, format_string: str, tz: timezone = JST):
+        """
+        :param format_string:
+        :param tz: timezone of the date strings
+        """
+        if format_string is None:
+            raise DatetimeParseError("format_string is require")
+        if tz is None:
+            raise DatetimeParseError("tz is require")
+        if not isinstance(format_string, str):
+            raise DatetimeParseError(f"format_string must be a string, but {type(format_string).__name__}")
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        self.format_string = format_string
+        self.tz = tz
+        self._format = compile_format(format_string)
+        self._offset = utcoffset_us(tz)
+        # epoch 0 at tz: to_datetime is one timedelta addition
+        self._origin = datetime(1970, 1, 1, tzinfo=tz) + timedelta(microseconds=self._offset)
+        self._day = _split(format_string, "H", "Ymd", "HMSf")
+        self._minute = _split(format_string, "S", "YmdHM", "Sf")
+        # the prefix of the last fixed-width string and the epoch of its day / minute
+        self._day_key: Optional[str] = None
+        self._day_base = 0
+        self._minute_key: Optional[str] = None
+        self._minute_base = 0
+
+    def __repr__(self) -> str:
+        return f"IncrementalParser({self.format_string!r}, {self.tz})"
+
+    def to_epoch(self, date_string: str) -> int:
+        """
+        parse date_string into epoch microseconds (UTC)
+        :param date_string:
+        :return: int
+        """
+        if date_string is None:
+            raise DatetimeParseError("date_string is require")
+        if not isinstance(date_string, str):
+            return self._parse(date_string)
+        minute = self._minute
+        if minute is not None and date_string[: minute[0]] == self._minute_key:
+            fields = minute[1].match_fixed(date_string[minute[0] :])
+            if fields is not None and fields[5] <= 59:
+                return self._minute_base + fields[5] * US_PER_SECOND + fields[6]
+        day = self._day
+        if day is not None and date_string[: day[0]] == self._day_key:
+            fields = day[1].match_fixed(date_string[day[0] :])
+            if fields is not None and fields[5] <= 59:
+                base = self._day_base + (fields[3] * 3600 + fields[4] * 60) * US_PER_SECOND
+                if minute is not None:
+                    self._minute_key, self._minute_base = date_string[: minute[0]], base
+                return base + fields[5] * US_PER_SECOND + fields[6]
+        return self._parse(date_string)
+
+    def _parse(self, date_string: str) -> int:
+        fields = self._format.match_fixed(date_string)
+        if fields is None or field_error(fields) is not None:
+            # not the fixed-width layout (or an invalid date): no prefix to reuse
+            try:
+                if not isinstance(date_string, str):
+                    raise TypeError(f"date_string must be a string, but {type(date_string).__name__}")
+                fields = self._format.parse(date_string)
+                check_fields(fields)
+            except (ValueError, TypeError) as e:
+                raise DatetimeParseError(f"{e}")
+            return self._day_epoch(fields) + self._time(fields)
+        base = self._day_epoch(fields)
+        if self._day is not None:
+            self._day_key, self._day_base = date_string[: self._day[0]], base
+        if self._minute is not None:
+            self._minute_key = date_string[: self._minute[0]]
+            self._minute_base = base + (fields[3] * 3600 + fields[4] * 60) * US_PER_SECOND
+        return base + self._time(fields)
+
+    def _day_epoch(self, fields) -> int:
+        return days_from_civil(fields[0], fields[1], fields[2]) * US_PER_DAY - self._offset
+
+    @staticmethod
+    def _time(fields) -> int:
+        return (fields[3] * 3600 + fields[4] * 60 + fields[5]) * US_PER_SECOND + fields[6]
+
+    def to_datetime(self, date_string: str) -> datetime:
+        """
+        parse date_string into datetime at tz (same result as string_to_datetime)
+        :param date_string:
+        :return: datetime
+        """
+        return self._origin + timedelta(microseconds=self.to_epoch(date_string))
+
+    def to_epochs(self, values: Iterable[str]) -> EpochArray:
+        """
+        parse many (ideally time-ordered) strings into epoch microseconds
+        :param values: iterable of date strings
+        :return: numpy int64 array, or array('q') if numpy is not installed
+        """
+        if values is None:
+            raise DatetimeParseError("values is require")
+        epochs = array("q", map(self.to_epoch, values))
+        if np is None:
+            return epochs
+        return np.frombuffer(epochs, dtype=np.int64)
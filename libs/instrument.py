@@ -0,0 +1,206 @@
+"""
+opt-in call / latency / error instrumentation for libs.dateutils
+
+enable() wraps the public functions in the libs.dateutils module namespace, so nothing is
+measured (and nothing costs) until it is called. calls through `dateutils.xxx` and the calls
+dateutils makes internally are counted; names imported with `from libs.dateutils import xxx`
+before enable() keep pointing to the unwrapped function.
+"""
+import json
+import sys
+from functools import wraps
+from logging import INFO, Logger
+from threading import Lock
+from time import perf_counter_ns
+from typing import Callable, Dict, Final, Iterable, Optional, Tuple
+
+from . import dateutils
+from . import logger as libs_logger
+from .dateformat import (
+    EMPTY,
+    FORMAT_MISMATCH,
+    INVALID_TIMEZONE,
+    INVALID_TYPE,
+    MISSING_ARGUMENT,
+    OUT_OF_RANGE,
+    UNCONVERTED_DATA,
+)
+
+# 計測対象の関数と、フォーマット文字列の引数 (名前, 位置)
+PUBLIC_FUNCTIONS: Final[Dict[str, Optional[Tuple[str, int]]]] = {
+    "string_to_datetime": ("format_string", 1),
+    "ymd_to_dt": None,
+    "ymdhms_to_dt": None,
+    "rfc3339_to_dt": None,
+    "aws_to_dt": None,
+    "dt_to_string": ("fmt", 1),
+    "get_utc_now": None,
+    "get_jts_now": None,
+    "get_unix_time_ns": None,
+    "convert_tz_utc_jst": None,
+    "add_days": None,
+    "add_hours": None,
+    "weekday_index": None,
+    "weekday_name_en": None,
+    "weekday_name_jp": None,
+    "dt_to_unix_time": None,
+    "unix_time_to_dt": None,
+    "dt_to_epoch": None,
+    "epoch_to_dt": None,
+}
+
+# DatetimeParseError のメッセージ → 原因 (先に一致したもの。"with timezone" は "must be a" より前)
+ERROR_CAUSES: Final[Tuple[Tuple[str, str], ...]] = (
+    ("is require", MISSING_ARGUMENT),
+    ("with timezone", INVALID_TIMEZONE),
+    ("must be a", INVALID_TYPE),
+    ("does not match format", FORMAT_MISMATCH),
+    ("unconverted data remains", UNCONVERTED_DATA),
+    ("out of range", OUT_OF_RANGE),
+    ("must be in", OUT_OF_RANGE),
+    ("is empty", EMPTY),
+)
+
+_lock = Lock()
+_originals: Dict[str, Callable] = {}
+_calls: Dict[str, int] = {}
+_errors: Dict[str, Dict[str, int]] = {}
+_latency: Dict[str, Dict[str, object]] = {}
+_callers: Dict[str, int] = {}
+_track_callers: bool = False
+
+
+def error_cause(message: str) -> str:
+    """
+    classify a DatetimeParseError message
+    :param message:
+    :return: cause name
+    """
+    for needle, cause in ERROR_CAUSES:
+        if needle in message:
+            return cause
+    return "other"
+
+
+def _record(name: str, key: str, elapsed_ns: int, error: Optional[BaseException], caller: Optional[str]) -> None:
+    # 2 のべき乗ごとのバケット (上限 ns)
+    bucket = 1 << max(elapsed_ns, 1).bit_length()
+    with _lock:
+        _calls[name] = _calls.get(name, 0) + 1
+        latency = _latency.get(key)
+        if latency is None:
+            latency = _latency[key] = {"count": 0, "total_ns": 0, "max_ns": 0, "histogram": {}}
+        latency["count"] += 1
+        latency["total_ns"] += elapsed_ns
+        latency["max_ns"] = max(latency["max_ns"], elapsed_ns)
+        latency["histogram"][bucket] = latency["histogram"].get(bucket, 0) + 1
+        if error is not None:
+            causes = _errors.setdefault(name, {})
+            cause = error_cause(str(error))
+            causes[cause] = causes.get(cause, 0) + 1
+        if caller is not None:
+            _callers[caller] = _callers.get(caller, 0) + 1
+
+
+def _instrument(name: str, func: Callable, format_arg: Optional[Tuple[str, int]]) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = name
+        if format_arg is not None:
+            arg_name, position = format_arg
+            fmt = kwargs.get(arg_name) if len(args) <= position else args[position]
+            key = f"{name}[{fmt}]"
+        caller = None
+        if _track_callers:
+            frame = sys._getframe(1)
+            caller = f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name} -> {name}"
+        error = None
+        started = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        except dateutils.DatetimeParseError as e:
+            error = e
+            raise
+        finally:
+            _record(name, key, perf_counter_ns() - started, error, caller)
+
+    return wrapper
+
+
+def enable(functions: Optional[Iterable[str]] = None, track_callers: bool = False) -> None:
+    """
+    start instrumenting libs.dateutils
+    :param functions: function names (default: PUBLIC_FUNCTIONS)
+    :param track_callers: also count calls per calling function (uses sys._getframe)
+    :return:
+    """
+    global _track_callers
+    _track_callers = track_callers
+    for name in functions or PUBLIC_FUNCTIONS:
+        if name in _originals:
+            continue
+        if name not in PUBLIC_FUNCTIONS:
+            raise ValueError(f"{name} is not an instrumentable function")
+        original = getattr(dateutils, name)
+        _originals[name] = original
+        setattr(dateutils, name, _instrument(name, original, PUBLIC_FUNCTIONS[name]))
+
+
+def disable() -> None:
+    """
+    restore the original functions (stats are kept)
+    :return:
+    """
+    for name, original in _originals.items():
+        setattr(dateutils, name, original)
+    _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset_stats() -> None:
+    with _lock:
+        _calls.clear()
+        _errors.clear()
+        _latency.clear()
+        _callers.clear()
+
+
+def get_stats() -> dict:
+    """
+    snapshot of the collected stats
+    :return: {"calls": {...}, "errors": {...}, "latency": {...}, "callers": {...}}
+    """
+    with _lock:
+        latency = {}
+        for key, value in _latency.items():
+            latency[key] = {
+                "count": value["count"],
+                "total_ns": value["total_ns"],
+                "mean_ns": value["total_ns"] / value["count"],
+                "max_ns": value["max_ns"],
+                "histogram": {f"<={bucket}ns": count for bucket, count in sorted(value["histogram"].items())},
+            }
+        return {
+            "calls": dict(_calls),
+            "errors": {name: dict(causes) for name, causes in _errors.items()},
+            "latency": latency,
+            "callers": dict(sorted(_callers.items(), key=lambda item: -item[1])),
+        }
+
+
+def log_stats(logger: Optional[Logger] = None, level: int = INFO, reset: bool = False) -> dict:
+    """
+    write a stats snapshot to the logger (default: the libs logger, see libs.utils.get_logger)
+    :param logger:
+    :param level:
+    :param reset: reset the stats after logging
+    :return: the snapshot
+    """
+    stats = get_stats()
+    (logger or libs_logger).log(level, "dateutils stats %s", json.dumps(stats, ensure_ascii=False))
+    if reset:
+        reset_stats()
+    return stats
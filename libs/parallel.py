@@ -0,0 +1,118 @@
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .datearray import EpochArray, iter_epochs, np
+from .dateutils import JST, DatetimeParseError
+
+# これより小さいファイルはプロセスを起動せずに解析する
+MIN_PARALLEL_BYTES: int = 1024 * 1024
+# ワーカーが一度に decode するバイト数
+CHUNK_BYTES: int = 1024 * 1024
+
+
+def split_ranges(path: Union[Path, str], parts: int) -> List[Tuple[int, int]]:
+    """
+    split a file into at most `parts` byte ranges that start and end on line boundaries
+    :param path:
+    :param parts:
+    :return: [(start, stop), ...]
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges: List[Tuple[int, int]] = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for part in range(1, parts + 1):
+            stop = size if part == parts else size * part // parts
+            if stop <= start:
+                continue
+            newline = mm.find(b"\n", stop - 1) if stop < size else -1
+            stop = size if newline == -1 else newline + 1
+            if stop > start:
+                ranges.append((start, stop))
+            start = stop
+            if start >= size:
+                break
+    return ranges
+
+
+def _iter_chunks(mm: mmap.mmap, start: int, stop: int) -> Iterator[List[str]]:
+    # 範囲全体を bytes / str / list にコピーせず、改行で終わる CHUNK_BYTES ほどの塊ごとに decode して行に分ける
+    position = start
+    while position < stop:
+        end = min(position + CHUNK_BYTES, stop)
+        if end < stop:
+            newline = mm.find(b"\n", end - 1, stop)
+            end = stop if newline == -1 else newline + 1
+        try:
+            lines = mm[position:end].decode().split("\n")
+        except UnicodeDecodeError as e:
+            raise DatetimeParseError(f"{e}")
+        position = end
+        values = [line[:-1] if line.endswith("\r") else line for line in lines]
+        yield [value for value in values if value]
+
+
+def parse_range(path: Union[Path, str], start: int, stop: int, format_string: str, tz: timezone) -> array:
+    """
+    parse one timestamp per line of path[start:stop] into epoch microseconds
+    :param path:
+    :param start: byte offset
+    :param stop: byte offset
+    :param format_string:
+    :param tz:
+    :return: array('q')
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = chain.from_iterable(_iter_chunks(mm, start, stop))
+        return array("q", iter_epochs(lines, format_string, tz))
+
+
+def parse_file_parallel(
+    path: Union[Path, str], format_string: str, workers: Optional[int] = None, tz: timezone = JST
+) -> EpochArray:
+    """
+    parse a file of one timestamp per line with a process pool, keeping the line order
+    :param path:
+    :param format_string:
+    :param workers: number of processes (default: os.cpu_count())
+    :param tz: timezone of the timestamps
+    :return: numpy int64 array of epoch microseconds, or array('q') if numpy is not installed
+    """
+    if path is None:
+        raise DatetimeParseError("path is require")
+    if format_string is None:
+        raise DatetimeParseError("format_string is require")
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        raise DatetimeParseError("workers must be a positive int")
+    if not Path(path).is_file():
+        raise DatetimeParseError(f"{path} is not a file")
+
+    if workers == 1 or os.path.getsize(path) < MIN_PARALLEL_BYTES:
+        ranges = split_ranges(path, 1)
+        parts = [parse_range(path, start, stop, format_string, tz) for start, stop in ranges]
+    else:
+        ranges = split_ranges(path, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(parse_range, path, start, stop, format_string, tz) for start, stop in ranges]
+            parts = [future.result() for future in futures]
+
+    if np is None:
+        result = array("q")
+        for part in parts:
+            result.extend(part)
+        return result
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate([np.frombuffer(part, dtype=np.int64) for part in parts])
@@ -0,0 +1,166 @@
+"""
+single-pass parser for RFC 3339 and the common ISO 8601 date-time subset:
+
+    2022-05-15T12:34:56Z            2022-05-15 12:34:56.789+09:00
+    2022-05-15T12:34:56,5-0800      2022-05-15T12:34+05:30
+    20220515T123456.123456789+09    2022-05-15t12:34:56z
+
+date (extended YYYY-MM-DD or basic YYYYMMDD), "T" / "t" / " ", time (HH:MM[:SS] or
+basic HHMM[SS]), optional fraction ("." or "," and 1-9 digits, truncated to
+microseconds) and a required offset ("Z", "z", ±HH:MM, ±HHMM or ±HH).
+
+every position is looked at once, the fraction / offset split is one str.lstrip and the
+offset is resolved through a table of the offset strings seen so far, so equal offsets share
+one timezone object. register_timezone() makes an offset resolve to a named timezone
+(libs.dateutils registers UTC and JST).
+"""
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Dict, Final, Tuple
+
+_FRACTION_CHARS: Final[str] = ".,0123456789"
+# date_string[4:17:3] of YYYY-MM-DDTHH:MM:SS
+_SEPARATORS: Final[frozenset] = frozenset(["--T::", "--t::", "-- ::"])
+# 既知のオフセット文字列 → timezone (登録された名前付き timezone と "Z" は最初から入っている)
+_OFFSET_STRINGS: Dict[str, timezone] = {}
+# オフセット秒 → timezone
+_OFFSETS: Dict[int, timezone] = {}
+_lock = Lock()
+
+
+def register_timezone(tz: timezone) -> None:
+    """
+    resolve tz's UTC offset to tz itself (e.g. "+09:00" → JST instead of an unnamed UTC+09:00)
+    :param tz: fixed offset timezone
+    :return:
+    """
+    if not isinstance(tz, timezone):
+        raise TypeError(f"tz must be a timezone, but {type(tz).__name__}")
+    seconds = tz.utcoffset(None) // timedelta(seconds=1)
+    with _lock:
+        _OFFSETS[seconds] = tz
+        for text, known in list(_OFFSET_STRINGS.items()):
+            if known.utcoffset(None) == tz.utcoffset(None):
+                _OFFSET_STRINGS[text] = tz
+        if seconds == 0:
+            _OFFSET_STRINGS["Z"] = _OFFSET_STRINGS["z"] = tz
+
+
+def offset_timezone(seconds: int) -> timezone:
+    """
+    the shared timezone of a UTC offset
+    :param seconds: UTC offset in seconds
+    :return: timezone (the registered one, if any)
+    """
+    tz = _OFFSETS.get(seconds)
+    if tz is None:
+        tz = timezone(timedelta(seconds=seconds))
+        with _lock:
+            tz = _OFFSETS.setdefault(seconds, tz)
+    return tz
+
+
+def _mismatch(date_string: str) -> ValueError:
+    return ValueError(f"time data {date_string!r} does not match format 'RFC 3339'")
+
+
+def _offset(text: str, date_string: str) -> timezone:
+    # ±HH:MM, ±HHMM, ±HH; the resolved string is kept so the next lookup is a dict hit
+    size = len(text)
+    if size not in (3, 5, 6) or text[0] not in "+-" or (size == 6 and text[3] != ":"):
+        raise _mismatch(date_string)
+    digits = text[1:3] + text[-2:] if size > 3 else text[1:3] + "00"
+    if not digits.isdigit() or not digits.isascii():
+        raise _mismatch(date_string)
+    hours, minutes = int(digits[:2]), int(digits[2:])
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"offset {text} is out of range")
+    seconds = (hours * 3600 + minutes * 60) * (-1 if text[0] == "-" else 1)
+    tz = offset_timezone(seconds)
+    if len(_OFFSET_STRINGS) < 4096:
+        _OFFSET_STRINGS[text] = tz
+    return tz
+
+
+def parse_rfc3339(date_string: str) -> datetime:
+    """
+    "2022-05-15T12:34:56.789+05:30" → datetime(2022, 5, 15, 12, 34, 56, 789000, tzinfo=UTC+05:30)
+    raises ValueError / TypeError like datetime.strptime
+    :param date_string:
+    :return: datetime with the offset's timezone
+    """
+    if not isinstance(date_string, str):
+        raise TypeError(f"date_string must be a string, but {type(date_string).__name__}")
+    n = len(date_string)
+    if n >= 20 and date_string[4:17:3] in _SEPARATORS:
+        # YYYY-MM-DDTHH:MM:SS is converted by the C parser of datetime.isoformat() output,
+        # the fraction and the offset are split off by one lstrip
+        offset = date_string[19:].lstrip(_FRACTION_CHARS)
+        end = n - len(offset)
+        tz = _OFFSET_STRINGS.get(offset)
+        if tz is not None:
+            try:
+                if end == 19:
+                    return datetime.fromisoformat(date_string[:19]).replace(tzinfo=tz)
+                fraction = date_string[20:end]
+                if date_string[19] in ".," and len(fraction) <= 9 and fraction.isdigit():
+                    microsecond = int((fraction + "00000")[:6])
+                    return datetime.fromisoformat(date_string[:19]).replace(microsecond=microsecond, tzinfo=tz)
+            except ValueError:
+                # out of range fields: the generic path words the error
+                pass
+    return _parse(date_string)
+
+
+def _parse(date_string: str) -> datetime:
+    has_second, position, digits = _layout(date_string)
+    if len(digits) != 14 or not digits.isdigit():
+        raise _mismatch(date_string)
+    rest = date_string[position:]
+    offset = rest.lstrip(_FRACTION_CHARS)
+    microsecond = 0
+    if len(offset) != len(rest):
+        # fraction of the second only (a fraction of the minute is not supported)
+        fraction = rest[: len(rest) - len(offset)]
+        if not has_second or fraction[0] not in ".," or not 2 <= len(fraction) <= 10 or not fraction[1:].isdigit():
+            raise _mismatch(date_string)
+        microsecond = int((fraction[1:] + "00000")[:6])
+    tz = _OFFSET_STRINGS.get(offset)
+    if tz is None:
+        if not offset:
+            raise ValueError(f"time data {date_string!r} does not match format 'RFC 3339' (no UTC offset)")
+        tz = _offset(offset, date_string)
+    value = int(digits)
+    value, second = divmod(value, 100)
+    value, minute = divmod(value, 100)
+    value, hour = divmod(value, 100)
+    value, day = divmod(value, 100)
+    year, month = divmod(value, 100)
+    return datetime(year, month, day, hour, minute, second, microsecond, tz)
+
+
+def _layout(date_string: str) -> Tuple[bool, int, bytes]:
+    """
+    (seconds given, position after the time, the 14 date / time digits)
+    """
+    n = len(date_string)
+    if n < 14:
+        raise _mismatch(date_string)
+    if date_string[4] == "-":
+        # extended: YYYY-MM-DD?HH:MM[:SS]
+        if date_string[7] != "-" or date_string[10] not in "Tt " or date_string[13] != ":":
+            raise _mismatch(date_string)
+        digits = date_string[0:4] + date_string[5:7] + date_string[8:10] + date_string[11:13] + date_string[14:16]
+        if n > 16 and date_string[16] == ":":
+            return True, 19, (digits + date_string[17:19]).encode()
+        return False, 16, (digits + "00").encode()
+    # basic: YYYYMMDD?HHMM[SS]
+    if date_string[8] not in "Tt ":
+        raise _mismatch(date_string)
+    digits = date_string[0:8] + date_string[9:13]
+    if date_string[13:15].isdigit():
+        return True, 15, (digits + date_string[13:15]).encode()
+    return False, 13, (digits + "00").encode()
+
+
+register_timezone(timezone.utc)
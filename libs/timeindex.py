@@ -0,0 +1,312 @@
+"""
+sorted timestamp index for range queries and as-of joins.
+
+    events = TimeIndex.from_strings(event_lines, HYPHEN_YMD_HMS)
+    quotes = TimeIndex(quote_epochs, UTC)
+    matched = quotes.rows(merge_asof(events, quotes))   # quote row per event (sorted event order)
+
+the timestamps are kept as sorted epoch microseconds in array('q') and no datetime is created
+per row. lookups are binary searches. merge_asof walks both indexes once (O(n + m)) without
+numpy; with numpy it binary-searches every left key in right with searchsorted instead
+(O(n log m)), as the vectorised search beats a linear merge in a Python loop.
+positions refer to the sorted order, `order` maps them back to the rows of the input.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Tuple, Union, overload
+
+from .datearray import EpochArray, TimestampArray, as_numpy, datetime_to_epoch, epoch_to_datetime, np
+from .dateutils import JST, DatetimeParseError
+
+Bound = Union[datetime, int]
+BACKWARD: str = "backward"
+FORWARD: str = "forward"
+NEAREST: str = "nearest"
+_DIRECTIONS = (BACKWARD, FORWARD, NEAREST)
+
+
+def _to_epoch(name: str, value: Bound) -> int:
+    if value is None:
+        raise DatetimeParseError(f"{name} is require")
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            raise DatetimeParseError(f"{name} must be a datetime with timezone")
+        return datetime_to_epoch(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise DatetimeParseError(f"{name} must be a datetime or epoch microseconds, but {type(value).__name__}")
+
+
+def _to_array(values: "np.ndarray") -> array:
+    result = array("q")
+    result.frombytes(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+    return result
+
+
+class TimeIndex:
+    """
+    sorted sequence of timestamps: epoch microseconds in array('q') plus one timezone.
+    epochs: sorted epoch microseconds
+    order: input row of every sorted position, None if the input was already sorted
+    """
+
+    __slots__ = ("epochs", "tz", "order")
+
+    def __init__(self, epochs: Union[TimestampArray, EpochArray, Iterable[int]] = (), tz: Optional[timezone] = None):
+        """
+        :param epochs: TimestampArray or epoch microseconds (array('q'), numpy array or iterable of int),
+            in any order (equal timestamps keep their input order)
+        :param tz: timezone of the datetimes read from the index (default: tz of a TimestampArray, else JST)
+        """
+        if epochs is None:
+            raise DatetimeParseError("epochs is require")
+        if isinstance(epochs, TimestampArray):
+            tz = epochs.tz if tz is None else tz
+            epochs = epochs.epochs
+        tz = JST if tz is None else tz
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        if not (isinstance(epochs, array) and epochs.typecode == "q") and not (
+            np is not None and isinstance(epochs, np.ndarray)
+        ):
+            epochs = array("q", epochs)
+        self.tz: timezone = tz
+        self.order: Optional[array] = None
+        if np is not None:
+            values = as_numpy(epochs)
+            if len(values) > 1 and bool((values[1:] < values[:-1]).any()):
+                order = np.argsort(values, kind="stable")
+                self.order = _to_array(order)
+                values = values[order]
+            self.epochs: array = epochs if isinstance(epochs, array) and self.order is None else _to_array(values)
+            return
+        values = epochs
+        if any(values[i] < values[i - 1] for i in range(1, len(values))):
+            order = sorted(range(len(values)), key=values.__getitem__)
+            self.order = array("q", order)
+            values = array("q", [values[i] for i in order])
+        self.epochs = values
+
+    @classmethod
+    def _sorted(cls, epochs: array, tz: timezone, order: Optional[array]) -> "TimeIndex":
+        index = cls.__new__(cls)
+        index.epochs, index.tz, index.order = epochs, tz, order
+        return index
+
+    @classmethod
+    def from_datetimes(cls, dts: Iterable[datetime], tz: Optional[timezone] = None) -> "TimeIndex":
+        """
+        build from tz-aware datetimes
+        :param dts:
+        :param tz: timezone of the index (default: tz of the first datetime)
+        :return: TimeIndex
+        """
+        return cls(TimestampArray.from_datetimes(dts, tz))
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str], format_string: str, tz: timezone = JST) -> "TimeIndex":
+        """
+        parse date strings without creating datetimes
+        :param values:
+        :param format_string:
+        :param tz: timezone of the date strings
+        :return: TimeIndex
+        """
+        return cls(TimestampArray.from_strings(values, format_string, tz))
+
+    @property
+    def timestamps(self) -> TimestampArray:
+        """
+        the sorted timestamps as TimestampArray (the epochs are shared)
+        """
+        return TimestampArray(self.epochs, self.tz)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    @overload
+    def __getitem__(self, index: int) -> datetime:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TimeIndex":
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise DatetimeParseError("step of a TimeIndex slice must be 1")
+            start, stop, _ = index.indices(len(self))
+            stop = max(start, stop)
+            order = array("q", range(start, stop)) if self.order is None else self.order[start:stop]
+            return TimeIndex._sorted(self.epochs[start:stop], self.tz, order)
+        return epoch_to_datetime(self.epochs[index], self.tz)
+
+    def __iter__(self) -> Iterator[datetime]:
+        return iter(self.timestamps)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimeIndex):
+            return NotImplemented
+        return self.tz == other.tz and self.epochs == other.epochs
+
+    def __repr__(self) -> str:
+        return f"TimeIndex(len={len(self)}, tz={self.tz})"
+
+    def range_positions(self, start: Optional[Bound] = None, end: Optional[Bound] = None) -> Tuple[int, int]:
+        """
+        positions of the timestamps in [start, end)
+        :param start: tz-aware datetime or epoch microseconds, None for no lower bound
+        :param end: tz-aware datetime or epoch microseconds (exclusive), None for no upper bound
+        :return: (first, stop), index[first:stop] holds the timestamps in the range
+        """
+        low = 0 if start is None else bisect_left(self.epochs, _to_epoch("start", start))
+        high = len(self) if end is None else bisect_left(self.epochs, _to_epoch("end", end))
+        return low, max(low, high)
+
+    def between(self, start: Optional[Bound] = None, end: Optional[Bound] = None) -> "TimeIndex":
+        """
+        timestamps in [start, end)
+        :param start: tz-aware datetime or epoch microseconds, None for no lower bound
+        :param end: tz-aware datetime or epoch microseconds (exclusive), None for no upper bound
+        :return: TimeIndex (order still maps to the rows of the original input)
+        """
+        low, high = self.range_positions(start, end)
+        return self[low:high]
+
+    def asof(self, value: Bound, allow_exact_matches: bool = True) -> int:
+        """
+        position of the last timestamp at or before value
+        :param value: tz-aware datetime or epoch microseconds
+        :param allow_exact_matches: False for the last timestamp strictly before value
+        :return: position, -1 if every timestamp is later
+        """
+        epoch = _to_epoch("value", value)
+        if allow_exact_matches:
+            return bisect_right(self.epochs, epoch) - 1
+        return bisect_left(self.epochs, epoch) - 1
+
+    def nearest(self, value: Bound) -> int:
+        """
+        position of the timestamp closest to value (the earlier one on a tie)
+        :param value: tz-aware datetime or epoch microseconds
+        :return: position, -1 if the index is empty
+        """
+        epoch = _to_epoch("value", value)
+        epochs = self.epochs
+        before = bisect_right(epochs, epoch) - 1
+        after = before + 1
+        if after == len(epochs):
+            return before
+        if before < 0 or epochs[after] - epoch < epoch - epochs[before]:
+            return after
+        return before
+
+    def rows(self, positions: Union[EpochArray, Iterable[int]]) -> EpochArray:
+        """
+        input rows of sorted positions, e.g. of the result of merge_asof
+        :param positions: positions, -1 is kept as -1
+        :return: numpy int64 array, or array('q') if numpy is not installed
+        """
+        if np is None:
+            order = self.order
+            if order is None:
+                return array("q", positions)
+            return array("q", [order[position] if position >= 0 else -1 for position in positions])
+        positions = as_numpy(positions)
+        if self.order is None:
+            return positions.copy()
+        return np.where(positions >= 0, as_numpy(self.order)[positions], -1)
+
+
+def merge_asof(
+    left: TimeIndex,
+    right: TimeIndex,
+    direction: str = BACKWARD,
+    tolerance: Optional[int] = None,
+    allow_exact_matches: bool = True,
+) -> EpochArray:
+    """
+    match every timestamp of left with one of right, both walked once in sorted order
+    :param left: TimeIndex
+    :param right: TimeIndex
+    :param direction: "backward" (last right at or before), "forward" (first right at or after)
+        or "nearest" (closest, the earlier one on a tie); of equal right timestamps
+        backward takes the last and forward the first
+    :param tolerance: maximum distance in microseconds, None for no limit
+    :param allow_exact_matches: False to match only strictly earlier / later timestamps
+    :return: position in right per position in left (-1 for no match),
+        numpy int64 array, or array('q') if numpy is not installed
+    """
+    if left is None:
+        raise DatetimeParseError("left is require")
+    if right is None:
+        raise DatetimeParseError("right is require")
+    if not isinstance(left, TimeIndex) or not isinstance(right, TimeIndex):
+        raise DatetimeParseError("left and right must be a TimeIndex")
+    if direction not in _DIRECTIONS:
+        raise DatetimeParseError(f"direction must be one of {', '.join(_DIRECTIONS)}")
+    if tolerance is not None and (not isinstance(tolerance, int) or isinstance(tolerance, bool) or tolerance < 0):
+        raise DatetimeParseError("tolerance must be a non-negative int")
+    if np is None:
+        return _merge_asof(left.epochs, right.epochs, direction, tolerance, allow_exact_matches)
+    return _merge_asof_numpy(as_numpy(left.epochs), as_numpy(right.epochs), direction, tolerance, allow_exact_matches)
+
+
+def _merge_asof(
+    left: array, right: array, direction: str, tolerance: Optional[int], allow_exact_matches: bool
+) -> array:
+    result = array("q", bytes(8 * len(left)))
+    size = len(right)
+    # before: 最後の right <= value (exact を許さなければ <), after: 最初の right >= value (> value)
+    before, after = -1, 0
+    for position, value in enumerate(left):
+        if allow_exact_matches:
+            while before + 1 < size and right[before + 1] <= value:
+                before += 1
+            while after < size and right[after] < value:
+                after += 1
+        else:
+            while before + 1 < size and right[before + 1] < value:
+                before += 1
+            while after < size and right[after] <= value:
+                after += 1
+        backward = value - right[before] if before >= 0 else None
+        forward = right[after] - value if after < size else None
+        if direction == BACKWARD or (direction == NEAREST and backward is not None):
+            if direction == NEAREST and forward is not None and forward < backward:
+                match, distance = after, forward
+            else:
+                match, distance = before, backward
+        else:
+            match, distance = (after, forward) if forward is not None else (-1, None)
+        if distance is None or (tolerance is not None and distance > tolerance):
+            match = -1
+        result[position] = match
+    return result
+
+
+def _merge_asof_numpy(
+    left: "np.ndarray", right: "np.ndarray", direction: str, tolerance: Optional[int], allow_exact_matches: bool
+) -> "np.ndarray":
+    # left の各キーを right の中で独立に二分探索する (ベクトル化した O(n log m))
+    size = len(right)
+    if size == 0:
+        return np.full(len(left), -1, dtype=np.int64)
+    before = np.searchsorted(right, left, side="right" if allow_exact_matches else "left") - 1
+    after = np.searchsorted(right, left, side="left" if allow_exact_matches else "right")
+    has_before = before >= 0
+    has_after = after < size
+    backward = np.where(has_before, left - right[np.maximum(before, 0)], 0)
+    forward = np.where(has_after, right[np.minimum(after, size - 1)] - left, 0)
+    if direction == BACKWARD:
+        use_after = np.zeros(len(left), dtype=bool)
+    elif direction == FORWARD:
+        use_after = np.ones(len(left), dtype=bool)
+    else:
+        use_after = has_after & (~has_before | (forward < backward))
+    found = np.where(use_after, has_after, has_before)
+    if tolerance is not None:
+        found &= np.where(use_after, forward, backward) <= tolerance
+    return np.where(found, np.where(use_after, after, before), -1)
@@ -0,0 +1,394 @@
+"""
+DST-aware timezone conversion backed by transition tables read from the system tzdata.
+
+each IANA zone is loaded once (TZif file + POSIX TZ rule for the years after the last
+explicit transition) into a sorted table of UTC transition times, so a conversion is a
+binary search plus an add. Zone is a datetime.tzinfo, so scalar and bulk conversion agree.
+"""
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from threading import Lock
+from typing import Final, Iterable, List, Optional, Pattern, Tuple, Union
+
+from .datearray import EpochArray, TimestampArray, as_numpy, np, utcoffset_us
+from .dateformat import civil_from_days, days_from_civil
+from .dateutils import DatetimeParseError
+
+try:
+    from zoneinfo import TZPATH, ZoneInfo
+except ImportError:  # python < 3.9
+    ZoneInfo = None
+    TZPATH = (
+        "/usr/share/zoneinfo",
+        "/usr/lib/zoneinfo",
+        "/usr/share/lib/zoneinfo",
+        "/etc/zoneinfo",
+    )
+
+# POSIX TZ ルールから遷移を生成する初期の最終年 (それ以降は必要になった時点で延長する)
+TRANSITION_TABLE_END_YEAR: Final[int] = 2100
+
+_EPOCH_NAIVE: Final[datetime] = datetime(1970, 1, 1)
+_SECOND: Final[timedelta] = timedelta(seconds=1)
+_OFFSET: Final[str] = r"[+-]?\d{1,3}(?::\d{2}(?::\d{2})?)?"
+_NAME: Final[str] = r"<[^>]+>|[A-Za-z]{3,}"
+_POSIX_TZ: Final[Pattern] = re.compile(
+    rf"(?P<std>{_NAME})(?P<stdoff>{_OFFSET})"
+    rf"(?:(?P<dst>{_NAME})(?P<dstoff>{_OFFSET})?(?:,(?P<start>[^,]+),(?P<end>[^,]+))?)?$"
+)
+
+# (utcoffset seconds, dst seconds (0 for standard time), abbreviation)
+Period = Tuple[int, int, str]
+
+
+def _parse_offset(text: str) -> int:
+    sign = -1 if text.startswith("-") else 1
+    parts = [int(part) for part in text.lstrip("+-").split(":")] + [0, 0]
+    return sign * (parts[0] * 3600 + parts[1] * 60 + parts[2])
+
+
+class PosixRule:
+    """
+    POSIX TZ string such as "EST5EDT,M3.2.0,M11.1.0" (the footer of TZif v2+ files)
+    """
+
+    def __init__(self, text: str):
+        found = _POSIX_TZ.match(text)
+        if found is None:
+            raise DatetimeParseError(f"unsupported TZ rule {text!r}")
+        self.text = text
+        # POSIX offsets are west-positive
+        self.std: Period = (-_parse_offset(found["stdoff"]), 0, found["std"].strip("<>"))
+        self.dst: Optional[Period] = None
+        self.start: Optional[str] = found["start"]
+        self.end: Optional[str] = found["end"]
+        if found["dst"]:
+            offset = -_parse_offset(found["dstoff"]) if found["dstoff"] else self.std[0] + 3600
+            self.dst = (offset, offset - self.std[0], found["dst"].strip("<>"))
+            if self.start is None:
+                # default US rule
+                self.start, self.end = "M3.2.0", "M11.1.0"
+
+    @staticmethod
+    def _local_seconds(rule: str, year: int) -> int:
+        date, _, time = rule.partition("/")
+        seconds = _parse_offset(time) if time else 7200
+        if date.startswith("M"):
+            month, week, weekday = (int(part) for part in date[1:].split("."))
+            first = days_from_civil(year, month, 1)
+            # 1970-01-01 is Thursday (Sunday == 0)
+            day = first + (weekday - (first + 4)) % 7 + (week - 1) * 7
+            next_month = days_from_civil(year + month // 12, month % 12 + 1, 1)
+            while day >= next_month:
+                day -= 7
+        elif date.startswith("J"):
+            julian = int(date[1:])
+            leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+            day = days_from_civil(year, 1, 1) + julian - 1 + (leap and julian >= 60)
+        else:
+            day = days_from_civil(year, 1, 1) + int(date)
+        return day * 86400 + seconds
+
+    def transitions(self, year: int) -> List[Tuple[int, Period]]:
+        """
+        UTC transitions of the year, sorted
+        :param year:
+        :return: [(epoch seconds, period starting there), ...]
+        """
+        if self.dst is None:
+            return []
+        start = self._local_seconds(self.start, year) - self.std[0]
+        end = self._local_seconds(self.end, year) - self.dst[0]
+        return sorted([(start, self.dst), (end, self.std)])
+
+
+def _dst_offsets(indices: bytes, types: List[Tuple[int, int, int]]) -> List[int]:
+    """
+    dst seconds of every ttinfo type. TZif stores only the isdst flag, so the offset is inferred
+    the way zoneinfo does: the difference from the standard type next to the first transition
+    into the type, one hour if there is none (or the difference is not below 24 hours)
+    """
+    isdsts = [bool(isdst) for _, isdst, _ in types]
+    dsts = [0] * len(types)
+    for i in range(1, len(indices)):
+        index = indices[i]
+        if not isdsts[index] or dsts[index]:
+            continue
+        utoff = types[index][0]
+        dst = 0
+        if not isdsts[indices[i - 1]]:
+            dst = utoff - types[indices[i - 1]][0]
+        if not dst and index < len(types) - 1 and i + 1 < len(indices):
+            # 次の遷移も夏時間なら、この型は後の遷移で決まるのを待つ
+            if isdsts[indices[i + 1]]:
+                continue
+            dst = utoff - types[indices[i + 1]][0]
+        dsts[index] = dst if -86400 < dst < 86400 else 0
+    return [(dst or 3600) if isdst else 0 for dst, isdst in zip(dsts, isdsts)]
+
+
+def _read_tzif(data: bytes) -> Tuple[List[int], List[Period], Period, Optional[str]]:
+    """
+    :return: (transition times, period after each transition, period before the first one, footer)
+    """
+    if data[:4] != b"TZif":
+        raise DatetimeParseError("not a TZif file")
+    version = data[4:5]
+    header = struct.Struct(">6l")
+    isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = header.unpack_from(data, 20)
+    time_size, offset = 4, 44
+    if version >= b"2":
+        # skip the 32-bit block and read the 64-bit one
+        offset += timecnt * 5 + typecnt * 6 + charcnt + leapcnt * 8 + isstdcnt + isutcnt
+        isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = header.unpack_from(data, offset + 20)
+        time_size, offset = 8, offset + 44
+    times = list(struct.unpack_from(f">{timecnt}{'q' if time_size == 8 else 'l'}", data, offset))
+    offset += timecnt * time_size
+    indices = data[offset : offset + timecnt]
+    offset += timecnt
+    types = [struct.unpack_from(">lBB", data, offset + 6 * i) for i in range(typecnt)]
+    offset += typecnt * 6
+    chars = data[offset : offset + charcnt]
+    offset += charcnt + leapcnt * (time_size + 4) + isstdcnt + isutcnt
+    dsts = _dst_offsets(indices, types)
+
+    def period(index: int) -> Period:
+        utoff, _, abbrind = types[index]
+        return utoff, dsts[index], chars[abbrind : chars.index(b"\0", abbrind)].decode()
+
+    footer = None
+    if version >= b"2":
+        footer = data[offset:].strip(b"\n").decode() or None
+    return times, [period(index) for index in indices], period(0), footer
+
+
+def _find_tzif(key: str) -> bytes:
+    normalized = os.path.normpath(key)
+    if os.path.isabs(key) or normalized.startswith("..") or normalized != key:
+        raise DatetimeParseError(f"invalid timezone key {key!r}")
+    for base in TZPATH:
+        path = os.path.join(base, key)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read()
+    raise DatetimeParseError(f"timezone {key!r} not found in {', '.join(TZPATH)}")
+
+
+class Zone(tzinfo):
+    """
+    tzinfo for an IANA zone with a precomputed transition table
+    """
+
+    def __init__(self, key: str, times: List[int], periods: List[Period], before: Period, rule: Optional[PosixRule]):
+        self.key = key
+        self._rule = rule
+        self._lock = Lock()
+        self._set_table(times, periods, before)
+        last_year = civil_from_days(times[-1] // 86400)[0] if times else 1970
+        self._end_year = last_year
+        self.extend(TRANSITION_TABLE_END_YEAR)
+
+    def _set_table(self, times: List[int], periods: List[Period], before: Period) -> None:
+        self._times = times
+        self._periods = periods
+        self._before = before
+        # period i is in effect from times[i - 1] to times[i]
+        all_periods = [before] + periods
+        offsets = [period[0] for period in all_periods]
+        self._offsets_td = [timedelta(seconds=offset) for offset in offsets]
+        self._offsets_us = array("q", [offset * 1_000_000 for offset in offsets])
+        self._times_us = array("q", [time * 1_000_000 for time in times])
+        self._dst_td = [timedelta(seconds=period[1]) for period in all_periods]
+        # local (wall) transition times for fold=0 / fold=1, as in PEP 495 / zoneinfo
+        wall0, wall1 = [], []
+        for i, time in enumerate(times):
+            before_offset, after_offset = offsets[i], offsets[i + 1]
+            wall0.append(time + max(before_offset, after_offset))
+            wall1.append(time + min(before_offset, after_offset))
+        self._wall = (wall0, wall1)
+        self._numpy = None
+
+    def extend(self, year: int) -> None:
+        """
+        generate transitions from the POSIX rule up to the end of year
+        :param year:
+        :return:
+        """
+        if self._rule is None or self._rule.dst is None or year <= self._end_year:
+            return
+        with self._lock:
+            if year <= self._end_year:
+                return
+            times, periods = list(self._times), list(self._periods)
+            for current in range(self._end_year, year + 1):
+                for time, period in self._rule.transitions(current):
+                    if not times or time > times[-1]:
+                        times.append(time)
+                        periods.append(period)
+            self._set_table(times, periods, self._before)
+            self._end_year = year
+
+    def _cover(self, seconds: int) -> None:
+        if self._rule is not None and self._rule.dst is not None and self._times and seconds >= self._times[-1]:
+            year = civil_from_days(seconds // 86400)[0]
+            if year >= self._end_year:
+                self.extend(min(year + 1, 9999))
+
+    def _local_index(self, dt: datetime) -> int:
+        seconds = (dt.replace(tzinfo=None) - _EPOCH_NAIVE) // _SECOND
+        self._cover(seconds)
+        return bisect_right(self._wall[dt.fold], seconds)
+
+    def utcoffset(self, dt: Optional[datetime]) -> Optional[timedelta]:
+        if dt is None:
+            return None
+        return self._offsets_td[self._local_index(dt)]
+
+    def dst(self, dt: Optional[datetime]) -> Optional[timedelta]:
+        if dt is None:
+            return None
+        return self._dst_td[self._local_index(dt)]
+
+    def tzname(self, dt: Optional[datetime]) -> Optional[str]:
+        if dt is None:
+            return None
+        index = self._local_index(dt)
+        return self._before[2] if index == 0 else self._periods[index - 1][2]
+
+    def fromutc(self, dt: datetime) -> datetime:
+        if not isinstance(dt, datetime) or dt.tzinfo is not self:
+            raise ValueError("fromutc: dt.tzinfo is not self")
+        seconds = (dt.replace(tzinfo=None) - _EPOCH_NAIVE) // _SECOND
+        self._cover(seconds)
+        index = bisect_right(self._times, seconds)
+        local = dt + self._offsets_td[index]
+        if index > 0:
+            previous, current = self._offsets_td[index - 1], self._offsets_td[index]
+            # second occurrence of a repeated wall time
+            if previous > current and seconds < self._times[index - 1] + (previous - current) // _SECOND:
+                local = local.replace(fold=1)
+        return local
+
+    def utcoffsets_us(self, epochs: Union[EpochArray, Iterable[int]]) -> EpochArray:
+        """
+        UTC offset in microseconds at each epoch (microseconds, UTC)
+        :param epochs:
+        :return: numpy int64 array, or array('q') if numpy is not installed
+        """
+        if np is None:
+            epochs = epochs if isinstance(epochs, (array, list)) else list(epochs)
+            if len(epochs):
+                self._cover(max(epochs) // 1_000_000)
+            times, offsets = self._times_us, self._offsets_us
+            return array("q", [offsets[bisect_right(times, epoch)] for epoch in epochs])
+        values = as_numpy(epochs)
+        if len(values):
+            self._cover(int(values.max()) // 1_000_000)
+        table = self._numpy
+        if table is None:
+            table = self._numpy = (
+                np.frombuffer(self._times_us, dtype=np.int64),
+                np.frombuffer(self._offsets_us, dtype=np.int64),
+            )
+        return table[1][np.searchsorted(table[0], values, side="right")]
+
+    def __repr__(self) -> str:
+        return f"Zone({self.key!r})"
+
+    def __str__(self) -> str:
+        return self.key
+
+    def __reduce__(self):
+        return load_zone, (self.key,)
+
+
+@lru_cache(maxsize=None)
+def load_zone(key: str) -> Zone:
+    """
+    load an IANA zone (e.g. "America/New_York") from the system tzdata, once per key
+    :param key:
+    :return: Zone
+    """
+    if not isinstance(key, str):
+        raise DatetimeParseError(f"key must be a string, but {type(key).__name__}")
+    times, periods, before, footer = _read_tzif(_find_tzif(key))
+    rule = PosixRule(footer) if footer else None
+    if not times and rule is not None:
+        before = rule.std
+    return Zone(key, times, periods, before, rule)
+
+
+def _resolve(tz: Union[str, tzinfo]) -> tzinfo:
+    if tz is None:
+        raise DatetimeParseError("tz is require")
+    if isinstance(tz, str):
+        return load_zone(tz)
+    if not isinstance(tz, (timezone, Zone)) and not (ZoneInfo is not None and isinstance(tz, ZoneInfo)):
+        raise DatetimeParseError(f"tz must be a timezone, Zone, ZoneInfo or IANA key, but {type(tz).__name__}")
+    return tz
+
+
+def _table_zone(tz: tzinfo) -> tzinfo:
+    # ZoneInfo has no bulk lookup: the bulk functions use the Zone of the same key
+    if ZoneInfo is not None and isinstance(tz, ZoneInfo):
+        if tz.key is None:
+            raise DatetimeParseError("ZoneInfo without a key is not supported by the bulk conversion")
+        return load_zone(tz.key)
+    return tz
+
+
+def convert_tz(dt: datetime, tz: Union[str, tzinfo]) -> datetime:
+    """
+    convert datetime to another timezone
+    :param dt: datetime with timezone
+    :param tz: timezone constant (JST, UTC, ...), Zone, zoneinfo.ZoneInfo or IANA key such as "America/New_York"
+    :return: datetime
+    """
+    if dt is None:
+        raise DatetimeParseError("dt is require")
+    if not isinstance(dt, datetime):
+        raise DatetimeParseError(f"dt must be a datetime, but {type(dt).__name__}")
+    if dt.tzinfo is None:
+        raise DatetimeParseError("dt must be a datetime with timezone")
+    return dt.astimezone(_resolve(tz))
+
+
+def utcoffsets(epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Union[str, tzinfo]) -> EpochArray:
+    """
+    UTC offset (microseconds) of tz at each epoch
+    :param epochs: TimestampArray or epoch microseconds (UTC)
+    :param tz: timezone constant, Zone, zoneinfo.ZoneInfo or IANA key
+    :return: numpy int64 array, or array('q') if numpy is not installed
+    """
+    tz = _table_zone(_resolve(tz))
+    if isinstance(epochs, TimestampArray):
+        epochs = epochs.epochs
+    if isinstance(tz, Zone):
+        return tz.utcoffsets_us(epochs)
+    offset = utcoffset_us(tz)
+    if np is None:
+        return array("q", [offset]) * len(epochs if isinstance(epochs, (array, list)) else list(epochs))
+    return np.full(len(as_numpy(epochs)), offset, dtype=np.int64)
+
+
+def convert_tz_array(
+    epochs: Union[TimestampArray, EpochArray, Iterable[int]], tz: Union[str, tzinfo]
+) -> EpochArray:
+    """
+    local wall-clock time in tz of each epoch, as microseconds since 1970-01-01 00:00 local
+    :param epochs: TimestampArray or epoch microseconds (UTC)
+    :param tz: timezone constant, Zone, zoneinfo.ZoneInfo or IANA key
+    :return: numpy int64 array, or array('q') if numpy is not installed
+    """
+    if isinstance(epochs, TimestampArray):
+        epochs = epochs.epochs
+    if np is None:
+        epochs = epochs if isinstance(epochs, (array, list)) else list(epochs)
+        return array("q", [epoch + offset for epoch, offset in zip(epochs, utcoffsets(epochs, tz))])
+    values = as_numpy(epochs)
+    return values + utcoffsets(values, tz)
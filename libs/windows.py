@@ -0,0 +1,243 @@
+"""
+streaming tumbling / sliding window counts over unbounded timestamp streams.
+
+events are counted per pane (gcd of window size and slide), so memory is one int per
+active pane whatever the window overlap. the count of the first open window is kept as a
+running sum: each pane is added once when the window reaches it and subtracted once when
+the window passes it, so emitting a window does not scan the panes. slide may not exceed
+size (every event belongs to at least one window). a window is emitted once the watermark
+(largest event time seen minus the allowed lateness) passes its end; events whose
+windows have all been closed by the watermark are dropped and counted in `dropped`.
+"""
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from math import gcd
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from .datearray import _WEEK_SHIFT, BUCKET_UNITS, datetime_to_epoch, epoch_to_datetime, utcoffset_us
+from .dateformat import compile_format
+from .dateutils import JST, DatetimeParseError, ymdhms_to_dt
+
+Timestamp = Union[str, int, datetime]
+
+
+class Window(NamedTuple):
+    start: datetime
+    end: datetime
+    count: int
+
+
+def _duration(name: str, value: Union[timedelta, str]) -> int:
+    if isinstance(value, str):
+        if value not in BUCKET_UNITS:
+            raise DatetimeParseError(f"{name} must be a timedelta or one of {', '.join(BUCKET_UNITS)}")
+        return BUCKET_UNITS[value]
+    if not isinstance(value, timedelta):
+        raise DatetimeParseError(f"{name} must be a timedelta or a unit, but {type(value).__name__}")
+    return value // timedelta(microseconds=1)
+
+
+class WindowCounter:
+    """
+    counter = WindowCounter("hour", tz=JST)
+    for line in lines:
+        for window in counter.add(line): ...
+    for window in counter.flush(): ...
+
+    windows are aligned to the local time of tz (days start at midnight, weeks on Monday);
+    windows without events are not emitted.
+    """
+
+    def __init__(
+        self,
+        size: Union[timedelta, str],
+        slide: Union[timedelta, str, None] = None,
+        lateness: timedelta = timedelta(0),
+        tz: timezone = JST,
+        format_string: Optional[str] = None,
+    ):
+        """
+        :param size: window length, timedelta or second, minute, hour, day, week
+        :param slide: distance between window starts, at most size (default: size, i.e. tumbling windows)
+        :param lateness: how far behind the latest event an event may arrive and still be counted
+        :param tz: timezone of string input, of the emitted datetimes and of the window alignment
+        :param format_string: format of string input (default: the layouts accepted by ymdhms_to_dt)
+        """
+        if size is None:
+            raise DatetimeParseError("size is require")
+        if tz is None:
+            raise DatetimeParseError("tz is require")
+        if not isinstance(tz, timezone):
+            raise DatetimeParseError(f"tz must be a timezone, but {type(tz).__name__}")
+        if lateness is None:
+            raise DatetimeParseError("lateness is require")
+        if format_string is not None and not isinstance(format_string, str):
+            raise DatetimeParseError(f"format_string must be a string, but {type(format_string).__name__}")
+        self.size = _duration("size", size)
+        self.slide = self.size if slide is None else _duration("slide", slide)
+        self.lateness = _duration("lateness", lateness)
+        if self.size <= 0 or self.slide <= 0:
+            raise DatetimeParseError("size and slide must be positive")
+        if self.slide > self.size:
+            raise DatetimeParseError("slide must not be greater than size")
+        if self.lateness < 0:
+            raise DatetimeParseError("lateness must not be negative")
+        self.tz = tz
+        self.format_string = format_string
+        self.dropped = 0
+        self._pane = gcd(self.size, self.slide)
+        # epoch microseconds → window-aligned local time
+        self._shift = utcoffset_us(tz) + _WEEK_SHIFT
+        self._to_epoch = compile_format(format_string).to_epoch if format_string is not None else None
+        # window length and slide in panes
+        self._width = self.size // self._pane
+        self._step = self.slide // self._pane
+        self._panes: Dict[int, int] = {}
+        # pane indices inside the first open window and after it (min-heaps)
+        self._inside: List[int] = []
+        self._ahead: List[int] = []
+        # event count of the first open window
+        self._sum = 0
+        self._watermark: Optional[int] = None
+        # index of the first window that has not been emitted
+        self._next: Optional[int] = None
+        # end of the earliest window with events: nothing to emit before the watermark reaches it
+        self._due: Optional[int] = None
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """
+        events before this are late; None until the first event
+        """
+        if self._watermark is None:
+            return None
+        return epoch_to_datetime(self._watermark - self._shift, self.tz)
+
+    def _epoch(self, value: Timestamp) -> int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                raise DatetimeParseError("dt must be a datetime with timezone")
+            return datetime_to_epoch(value)
+        if isinstance(value, str):
+            if self._to_epoch is None:
+                return datetime_to_epoch(ymdhms_to_dt(value, self.tz))
+            try:
+                return self._to_epoch(value, self._shift - _WEEK_SHIFT)
+            except ValueError as e:
+                raise DatetimeParseError(f"{e}")
+        if value is None:
+            raise DatetimeParseError("value is require")
+        raise DatetimeParseError(f"value must be a string, int or datetime, but {type(value).__name__}")
+
+    def add(self, value: Timestamp) -> List[Window]:
+        """
+        count one event
+        :param value: date string, epoch microseconds or datetime with timezone
+        :return: windows closed by this event, oldest first
+        """
+        time = self._epoch(value) + self._shift
+        if self._watermark is not None and time // self.slide * self.slide + self.size <= self._watermark:
+            self.dropped += 1
+            return []
+        if self._watermark is not None:
+            # windows that ended before the watermark are closed even if they had no events
+            closed = (self._watermark - self.size) // self.slide + 1
+            if self._next is None or closed > self._next:
+                self._advance(closed)
+        pane = time // self._pane
+        count = self._panes.get(pane)
+        inside = self._next is not None and pane < self._next * self._step + self._width
+        if count:
+            self._panes[pane] = count + 1
+        else:
+            self._panes[pane] = 1
+            heappush(self._inside if inside else self._ahead, pane)
+            end = self._first_window(pane) + self.size
+            if self._due is None or end < self._due:
+                self._due = end
+        if inside:
+            self._sum += 1
+        watermark = time - self.lateness
+        if self._watermark is None or watermark > self._watermark:
+            self._watermark = watermark
+            if watermark >= self._due:
+                return self._emit(watermark)
+        return []
+
+    def _first_window(self, pane: int) -> int:
+        # start of the earliest open window that contains the pane
+        index = -(-(pane * self._pane + self._pane - self.size) // self.slide)
+        if self._next is not None and self._next > index:
+            index = self._next
+        return index * self.slide
+
+    def flush(self) -> List[Window]:
+        """
+        emit every window that still has events (end of stream)
+        :return: windows, oldest first
+        """
+        return self._emit(None)
+
+    def _emit(self, watermark: Optional[int]) -> List[Window]:
+        windows: List[Window] = []
+        self._due = None
+        while self._inside or self._ahead:
+            # 先頭の窓が空なら、次にイベントのある pane を含む最初の窓まで飛ばす
+            index = self._next if self._sum else self._first_window(self._ahead[0]) // self.slide
+            start = index * self.slide
+            if watermark is not None and start + self.size > watermark:
+                self._due = start + self.size
+                break
+            self._advance(index)
+            windows.append(self._window(start, self._sum))
+            self._advance(index + 1)
+        return windows
+
+    def _advance(self, index: int) -> None:
+        # 集計中の窓を index に進める: 出ていく pane を引き、入ってくる pane を足す
+        self._next = index
+        low = index * self._step
+        high = low + self._width
+        inside, ahead, panes = self._inside, self._ahead, self._panes
+        while inside and inside[0] < low:
+            self._sum -= panes.pop(heappop(inside))
+        while ahead and ahead[0] < high:
+            pane = heappop(ahead)
+            heappush(inside, pane)
+            self._sum += panes[pane]
+
+    def _window(self, start: int, count: int) -> Window:
+        start -= self._shift
+        return Window(epoch_to_datetime(start, self.tz), epoch_to_datetime(start + self.size, self.tz), count)
+
+
+def window_counts(
+    values: Iterable[Timestamp],
+    size: Union[timedelta, str],
+    slide: Union[timedelta, str, None] = None,
+    lateness: timedelta = timedelta(0),
+    tz: timezone = JST,
+    format_string: Optional[str] = None,
+) -> Iterator[Window]:
+    """
+    lazy window counts of an (unbounded) iterable of timestamps, see WindowCounter
+    :param values: date strings, epoch microseconds or datetimes with timezone
+    :param size: window length, timedelta or second, minute, hour, day, week
+    :param slide: distance between window starts, at most size (default: size, i.e. tumbling windows)
+    :param lateness: how far behind the latest event an event may arrive and still be counted
+    :param tz: timezone of string input, of the emitted datetimes and of the window alignment
+    :param format_string: format of string input (default: the layouts accepted by ymdhms_to_dt)
+    :return: iterator of Window(start, end, count)
+    """
+    if values is None:
+        raise DatetimeParseError("values is require")
+    counter = WindowCounter(size, slide, lateness, tz, format_string)
+    return _window_counts(values, counter)
+
+
+def _window_counts(values: Iterable[Timestamp], counter: WindowCounter) -> Iterator[Window]:
+    for value in values:
+        yield from counter.add(value)
+    yield from counter.flush()
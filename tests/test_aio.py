@@ -0,0 +1,115 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import raises
+
+from libs.aio import parse_batch, parse_stream
+from libs.dateutils import HYPHEN_YMD_HMS, UTC, DatetimeParseError, aws_to_dt, string_to_datetime
+
+lines = [f"2022-05-{day:02d}T{hour:02d}:34:56.789Z" for day in range(1, 29) for hour in range(24)]
+
+
+def collect(source, **kwargs):
+    async def run():
+        return [batch async for batch in parse_stream(source, **kwargs)]
+
+    return asyncio.run(run())
+
+
+async def aiter(values):
+    for value in values:
+        yield value
+
+
+def test_parse_batch():
+    assert parse_batch(lines[:3]) == [aws_to_dt(line) for line in lines[:3]]
+    assert parse_batch(["2022-05-15 12:34:56"], HYPHEN_YMD_HMS, UTC) == [
+        string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS, UTC)
+    ]
+
+
+def test_async_iterable():
+    expected = [aws_to_dt(line) for line in lines]
+    batches = collect(aiter(lines), batch_size=100)
+    assert [dt for batch in batches for dt in batch] == expected
+    assert max(len(batch) for batch in batches) <= 100
+    batches = collect(aiter(line.encode() + b"\r\n" for line in lines), batch_size=1, max_pending=3)
+    assert [dt for batch in batches for dt in batch] == expected
+
+
+def test_stream_reader():
+    async def run():
+        reader = asyncio.StreamReader()
+
+        async def feed():
+            for i in range(0, len(lines), 50):
+                reader.feed_data("\n".join(lines[i : i + 50]).encode() + b"\n\n")
+                await asyncio.sleep(0.001)
+            reader.feed_eof()
+
+        feeder = asyncio.create_task(feed())
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = [dt async for batch in parse_stream(reader, executor=executor, max_pending=4) for dt in batch]
+        await feeder
+        return result
+
+    assert asyncio.run(run()) == [aws_to_dt(line) for line in lines]
+
+
+def test_process_executor():
+    values = ["2022-05-15 12:34:56", "2022-05-16 01:02:03"]
+    batches = collect(aiter(values), format_string=HYPHEN_YMD_HMS, tz=UTC, executor="process")
+    assert batches == [[string_to_datetime(value, HYPHEN_YMD_HMS, UTC) for value in values]]
+
+
+def test_backpressure():
+    async def run():
+        read = 0
+
+        async def source():
+            nonlocal read
+            for line in lines:
+                read += 1
+                yield line
+
+        stream = parse_stream(source(), batch_size=10, max_pending=2)
+        await stream.__anext__()
+        await asyncio.sleep(0.05)
+        # 消費されない間は batch_size * max_pending 行 + 解析中の行までしか読まない
+        assert read <= 10 * 2 * 2 + 1
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_errors():
+    with raises(DatetimeParseError):
+        collect(aiter([lines[0], "2022-05-15"]))
+    with raises(DatetimeParseError):
+        collect(None)
+    with raises(DatetimeParseError):
+        collect(lines)
+    for kwargs in [{"batch_size": 0}, {"max_pending": None}, {"max_delay": -1}, {"executor": "fiber"}, {"tz": None}]:
+        with raises(DatetimeParseError):
+            collect(aiter(lines), **kwargs)
+
+    async def broken():
+        yield lines[0]
+        raise OSError("connection reset")
+
+    with raises(OSError):
+        collect(broken())
+
+
+def test_undecodable_bytes():
+    with raises(DatetimeParseError):
+        collect(aiter([lines[0].encode(), b"\xff2022-05-15T12:34:56Z"]))
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(lines[0].encode() + b"\n\xff\xfe\n")
+        reader.feed_eof()
+        return [batch async for batch in parse_stream(reader)]
+
+    with raises(DatetimeParseError):
+        asyncio.run(run())
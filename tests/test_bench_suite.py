@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from pytest import raises
+
+from benchmarks import suite
+from libs import dateutils as du
+from libs.instrument import PUBLIC_FUNCTIONS
+
+
+def _results(p50_ns):
+    return {"results": {name: {"p50_ns": value} for name, value in p50_ns.items()}}
+
+
+def test_compare():
+    baseline = _results({"a": 100.0, "b": 100.0})
+    current = _results({"a": 115.0, "b": 90.0, "c": 50.0})
+    assert suite.compare(baseline, current, threshold=0.2) == []
+    assert suite.compare(baseline, current, threshold=0.1) == ["a"]
+
+
+def test_main_exit_code(tmp_path):
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text('{"results": {"a": {"p50_ns": 100.0}}}')
+    current.write_text('{"results": {"a": {"p50_ns": 150.0}}}')
+    assert suite.main(["compare", str(baseline), str(current)]) == 1
+    assert suite.main(["compare", str(baseline), str(current), "--threshold", "0.6"]) == 0
+
+
+def test_cases_cover_public_functions():
+    names = {name.split("[")[0].split("/")[0] for name, _ in suite.cases()}
+    assert set(PUBLIC_FUNCTIONS) <= names
+
+
+def test_cases_run():
+    # 正常系は値を返し、/invalid は raising() の中で DatetimeParseError を確かめる
+    for name, func in suite.cases():
+        if "/invalid" in name:
+            assert func.__qualname__ == "raising.<locals>.call", name
+            func()
+        else:
+            assert func() is not None, name
+    with raises(AssertionError):
+        suite.raising(du.add_days, datetime(2022, 5, 15, tzinfo=du.JST), 1)()
@@ -0,0 +1,107 @@
+import mmap
+from array import array
+from datetime import datetime, timedelta
+
+from pytest import raises
+
+from libs import buffers
+from libs.buffers import buffer_to_epochs, bytes_to_datetime
+from libs.datearray import datetime_to_epoch, strings_to_epochs
+from libs.dateutils import (
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD_HMS,
+    JST,
+    UTC,
+    YMD,
+    DatetimeParseError,
+    string_to_datetime,
+)
+
+dts = [datetime(1999, 12, 31, 23, 59, 58) + timedelta(seconds=7919 * i, microseconds=271 * i) for i in range(500)]
+records = [dt.strftime(HYPHEN_YMD_HMS) for dt in dts]
+# 20 byte stride: 19 byte record + "\n"
+text = "".join(record + "\n" for record in records).encode()
+dirty = [
+    "2022-05-15 12:34:60",
+    "2022-02-29 00:00:00",
+    "2024-02-29 00:00:00",
+    "2022-13-15 12:34:56",
+    "2022-05-15T12:34:56",
+    "2022-05-15 12:34:5x",
+    "2022-05-15  1:34:56",
+    "0000-05-15 12:34:56",
+    "2022-05-15 12:34:+5",
+]
+
+
+def outcome(parse, *args, **kwargs):
+    try:
+        return parse(*args, **kwargs)
+    except DatetimeParseError as e:
+        return str(e)
+
+
+def test_bytes_to_datetime():
+    for buffer in [text, bytearray(text), memoryview(text), memoryview(array("b", text))]:
+        for index in [0, 1, 499]:
+            expected = string_to_datetime(records[index], HYPHEN_YMD_HMS, UTC)
+            assert bytes_to_datetime(buffer, HYPHEN_YMD_HMS, UTC, offset=index * 20) == expected
+    for record in dirty:
+        expected = outcome(string_to_datetime, record, HYPHEN_YMD_HMS, JST)
+        assert outcome(bytes_to_datetime, record.encode(), HYPHEN_YMD_HMS) == expected, record
+    assert bytes_to_datetime(b"x2022-05-15T12:34:56.7Zx", AWS_DATE_TIME_UTC, UTC, 1, 22) == datetime(
+        2022, 5, 15, 12, 34, 56, 700000, tzinfo=UTC
+    )
+    # 固定幅でないフォーマットはバッファの残りを解析する
+    assert bytes_to_datetime(b"..May 15 2022", "%b %d %Y", offset=2) == datetime(2022, 5, 15, tzinfo=JST)
+    assert bytes_to_datetime(b"2022-05-1", "%Y-%m-%d") == datetime(2022, 5, 1, tzinfo=JST)
+
+
+def _bulk():
+    expected = [datetime_to_epoch(string_to_datetime(record, HYPHEN_YMD_HMS, JST)) for record in records]
+    assert list(buffer_to_epochs(text, HYPHEN_YMD_HMS, stride=20)) == expected
+    assert list(buffer_to_epochs(memoryview(text), HYPHEN_YMD_HMS, offset=40, stride=60, count=3)) == expected[2:11:3]
+    assert list(buffer_to_epochs(b"", HYPHEN_YMD_HMS)) == []
+    fractions = b"2022-05-15T12:34:56.7Z2022-05-15T12:34:57.8Z"
+    assert list(buffer_to_epochs(bytearray(fractions), AWS_DATE_TIME_UTC, UTC, width=22)) == [
+        datetime_to_epoch(datetime(2022, 5, 15, 12, 34, second, micro, tzinfo=UTC))
+        for second, micro in [(56, 700000), (57, 800000)]
+    ]
+    with open(__file__, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert len(buffer_to_epochs(mapped, YMD, count=0)) == 0
+    # 高速経路が弾いたレコードも string_to_datetime と同じ結果・同じエラーになる
+    for record in dirty:
+        expected = outcome(strings_to_epochs, [records[0], record], HYPHEN_YMD_HMS)
+        result = outcome(buffer_to_epochs, (records[0] + record).encode(), HYPHEN_YMD_HMS)
+        assert (result if isinstance(result, str) else list(result)) == (
+            expected if isinstance(expected, str) else list(expected)
+        ), record
+    return buffer_to_epochs(text, HYPHEN_YMD_HMS, stride=20, count=2)
+
+
+def test_buffer_to_epochs():
+    assert _bulk().dtype.name == "int64"
+
+
+def test_buffer_to_epochs_without_numpy(monkeypatch):
+    monkeypatch.setattr(buffers, "np", None)
+    assert isinstance(_bulk(), array)
+
+
+def test_invalid():
+    for args, kwargs in [
+        ((None, YMD), {}),
+        ((b"20220515", None), {}),
+        (("20220515", YMD), {}),
+        ((b"20220515", YMD, None), {}),
+        ((b"20220515", YMD), {"offset": -1}),
+        ((b"20220515", YMD), {"width": 0}),
+        ((b"\xff\xfe220515", YMD), {}),
+    ]:
+        with raises(DatetimeParseError):
+            bytes_to_datetime(*args, **kwargs)
+    for kwargs in [{"stride": 7}, {"count": 2}, {"offset": 1.5}, {"count": -1}]:
+        with raises(DatetimeParseError):
+            buffer_to_epochs(b"20220515", YMD, **kwargs)
+    with raises(DatetimeParseError):
+        buffer_to_epochs(b"May 15 2022", "%b %d %Y")
@@ -0,0 +1,134 @@
+import random
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from pytest import raises
+
+from libs import businessday, datearray
+from libs.businessday import (
+    MAX_YEAR,
+    MIN_YEAR,
+    add_business_days,
+    add_business_days_array,
+    business_days_between,
+    business_days_between_array,
+    holiday_name,
+    is_business_day,
+    is_business_day_array,
+    national_holidays,
+)
+from libs.datearray import TimestampArray, datetime_to_epoch
+from libs.dateutils import JST, UTC, DatetimeParseError
+
+rng = random.Random(18)
+dts = [
+    datetime(rng.randrange(MIN_YEAR, MAX_YEAR), rng.randrange(1, 13), rng.randrange(1, 29), rng.randrange(24))
+    for _ in range(300)
+]
+dts += [datetime(2024, 12, 30), datetime(2019, 4, 26, 18), datetime(2000, 1, 1)]
+dts = [dt.replace(tzinfo=JST) for dt in dts]
+
+
+holidays = lru_cache(maxsize=None)(national_holidays)
+
+
+def brute_is_business_day(dt):
+    return dt.weekday() < 5 and date(dt.year, dt.month, dt.day) not in holidays(dt.year)
+
+
+def brute_add(dt, days):
+    step = 1 if days > 0 else -1
+    while days:
+        dt += timedelta(days=step)
+        if brute_is_business_day(dt):
+            days -= step
+    return dt
+
+
+def test_national_holidays():
+    assert [(d.month, d.day) for d in national_holidays(2024)] == [
+        (1, 1), (1, 8), (2, 11), (2, 12), (2, 23), (3, 20), (4, 29), (5, 3), (5, 4), (5, 5), (5, 6),
+        (7, 15), (8, 11), (8, 12), (9, 16), (9, 22), (9, 23), (10, 14), (11, 3), (11, 4), (11, 23),
+    ]  # fmt: skip
+    holidays_2019 = national_holidays(2019)
+    for day in [date(2019, 4, 30), date(2019, 5, 2)]:
+        assert holidays_2019[day] == "国民の休日"
+    assert holidays_2019[date(2019, 5, 1)] == "天皇の即位の日"
+    assert national_holidays(2009)[date(2009, 9, 22)] == "国民の休日"
+    assert national_holidays(1988)[date(1988, 5, 4)] == "国民の休日"
+    assert date(1985, 5, 4) not in national_holidays(1985)
+    assert national_holidays(2021)[date(2021, 7, 23)] == "スポーツの日"
+    assert national_holidays(1984)[date(1984, 1, 2)] == "振替休日"
+    assert [len(national_holidays(year)) >= 12 for year in range(MIN_YEAR, MAX_YEAR + 1)] == [True] * 120
+
+
+def test_scalar():
+    assert holiday_name(datetime(2022, 5, 3, tzinfo=JST)) == "憲法記念日"
+    assert holiday_name(date(2022, 5, 6)) is None
+    assert not is_business_day(date(2022, 5, 3))
+    assert is_business_day(date(2022, 5, 6))
+    for dt in dts:
+        assert is_business_day(dt) == brute_is_business_day(dt)
+        for days in [1, 3, -1, -7, 40]:
+            assert add_business_days(dt, days) == brute_add(dt, days), (dt, days)
+        assert add_business_days(dt, 0) is dt
+    assert add_business_days(date(2019, 4, 26), 1) == date(2019, 5, 7)
+    assert business_days_between(date(2019, 4, 26), date(2019, 5, 7)) == 1
+    assert business_days_between(date(2019, 5, 7), date(2019, 4, 26)) == -1
+    assert business_days_between(datetime(1980, 1, 1), datetime(2099, 12, 31)) > 29000
+    for start, end in zip(dts, dts[1:50]):
+        lower, upper = sorted([start, end])
+        count = sum(brute_is_business_day(lower + timedelta(days=i)) for i in range((upper.date() - lower.date()).days))
+        assert business_days_between(lower, upper) == count
+
+
+def _bulk(monkeypatch=None):
+    epochs = [datetime_to_epoch(dt) for dt in dts]
+    assert list(is_business_day_array(epochs)) == [is_business_day(dt) for dt in dts]
+    for days in [0, 1, -3, 25]:
+        assert list(add_business_days_array(epochs, days)) == [
+            datetime_to_epoch(add_business_days(dt, days)) for dt in dts
+        ]
+    assert list(business_days_between_array(epochs, epochs[::-1])) == [
+        business_days_between(start, end) for start, end in zip(dts, dts[::-1])
+    ]
+    timestamps = TimestampArray(epochs, UTC)
+    shifted = add_business_days_array(timestamps, 1)
+    assert isinstance(shifted, TimestampArray)
+    assert list(shifted) == [add_business_days(dt.astimezone(UTC), 1) for dt in dts]
+    # 明示した tz が TimestampArray の tz より優先され、結果は元の tz のまま
+    in_jst = add_business_days_array(timestamps, 1, JST)
+    assert in_jst.tz is UTC and list(in_jst.epochs) == [datetime_to_epoch(add_business_days(dt, 1)) for dt in dts]
+    assert list(is_business_day_array(timestamps, JST)) == [is_business_day(dt) for dt in dts]
+    assert list(business_days_between_array(timestamps, timestamps[::-1], JST)) == [
+        business_days_between(start, end) for start, end in zip(dts, dts[::-1])
+    ]
+
+
+def test_bulk():
+    _bulk()
+
+
+def test_bulk_without_numpy(monkeypatch):
+    monkeypatch.setattr(businessday, "np", None)
+    monkeypatch.setattr(datearray, "np", None)
+    _bulk()
+    assert isinstance(is_business_day_array([datetime_to_epoch(dts[0])]), array)
+
+
+def test_invalid():
+    for args in [(None,), ("2022-05-03",), (date(1979, 12, 31),), (date(2100, 1, 1),)]:
+        with raises(DatetimeParseError):
+            is_business_day(*args)
+    for args in [(date(2022, 5, 3), None), (date(2022, 5, 3), 1.5), (date(2099, 12, 30), 5), (date(1980, 1, 3), -5)]:
+        with raises(DatetimeParseError):
+            add_business_days(*args)
+    with raises(DatetimeParseError):
+        national_holidays(1979)
+    with raises(DatetimeParseError):
+        business_days_between_array([0], [0, 1])
+    with raises(DatetimeParseError):
+        is_business_day_array([datetime_to_epoch(datetime(2100, 1, 2, tzinfo=UTC))])
+    with raises(DatetimeParseError):
+        add_business_days_array([datetime_to_epoch(datetime(2099, 12, 30, tzinfo=UTC))], 5)
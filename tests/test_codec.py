@@ -0,0 +1,98 @@
+import io
+import random
+from array import array
+
+from pytest import raises
+
+from libs import codec, datearray
+from libs.codec import TimestampWriter, decode_timestamps, encode_timestamps, read_timestamps
+from libs.datearray import TimestampArray
+from libs.dateutils import AWS_DATE_TIME_UTC, JST, UTC, YMDHMS, DatetimeParseError, dt_to_string
+
+rng = random.Random(22)
+epochs = [1652585696789123]
+for _ in range(2000):
+    epochs.append(epochs[-1] + rng.choice([0, 1, 999, 10**6, 3 * 10**9, -(10**6), rng.randrange(-(10**12), 10**12)]))
+epochs += [-(2**62), 2**62, 0, -1]
+FLOOR = {"s": 10**6, "ms": 1000, "us": 1, "ns": 1}
+
+
+def _roundtrip():
+    for resolution, floor in FLOOR.items():
+        values = epochs if resolution != "ns" else epochs[:-4]
+        data = encode_timestamps(values, UTC, resolution)
+        expected = [epoch // floor * floor for epoch in values]
+        decoded = decode_timestamps(data)
+        assert decoded.tz == UTC and list(decoded.epochs) == expected
+        for chunk_size in [1, 5, 4096]:
+            chunks = list(read_timestamps(io.BytesIO(data), chunk_size))
+            assert [epoch for chunk in chunks for epoch in chunk.epochs] == expected
+    return encode_timestamps(epochs[:50], JST, "ms")
+
+
+def test_roundtrip():
+    _roundtrip()
+
+
+def test_roundtrip_without_numpy(monkeypatch):
+    encoded = _roundtrip()
+    monkeypatch.setattr(codec, "np", None)
+    monkeypatch.setattr(datearray, "np", None)
+    assert _roundtrip() == encoded
+
+
+def test_cross_path(monkeypatch):
+    # numpy の有無で書いたバイト列が同じで、どちらの経路でも読める (ns の int64 を超える差分を含む)
+    extremes = [-(9 * 10**15), 9 * 10**15, -(9 * 10**15), 0, 9 * 10**15 - 1]
+    cases = [(extremes, "ns"), (epochs[:-4], "ns"), (epochs, "us"), (epochs, "s")]
+    encoded = [encode_timestamps(values, UTC, resolution) for values, resolution in cases]
+    decoded = [list(decode_timestamps(data).epochs) for data in encoded]
+    monkeypatch.setattr(codec, "np", None)
+    monkeypatch.setattr(datearray, "np", None)
+    assert [encode_timestamps(values, UTC, resolution) for values, resolution in cases] == encoded
+    assert [list(decode_timestamps(data).epochs) for data in encoded] == decoded
+    assert decoded[0] == extremes
+    with raises(DatetimeParseError):
+        encode_timestamps([2**63], UTC, "us")
+
+
+def test_compact():
+    seconds = [1652585696000000 + i * 10**6 for i in range(1000)]
+    data = encode_timestamps(seconds, JST, "s")
+    # 先頭 (0 からの差分) は 5 バイト、以降の 1 秒刻みは 1 件 1 バイト
+    assert len(data) - len(encode_timestamps([], JST, "s")) == 5 + 999
+    timestamps = decode_timestamps(data)
+    assert timestamps.tz == JST and timestamps.tz.tzname(None) == "JST"
+    assert timestamps.dt_to_string(YMDHMS)[:2] == ["20220515123456", "20220515123457"]
+    assert timestamps.dt_to_string(YMDHMS)[-1] == dt_to_string(timestamps[-1], YMDHMS)
+    array_ = TimestampArray(seconds[:3], UTC)
+    assert decode_timestamps(memoryview(encode_timestamps(array_))).dt_to_string(AWS_DATE_TIME_UTC)[0] == (
+        "2022-05-15T03:34:56.000000Z"
+    )
+
+
+def test_writer():
+    f = io.BytesIO()
+    writer = TimestampWriter(f, JST, "us")
+    written = writer.write(array("q", epochs[:1000])) + writer.write(epochs[1000:])
+    written += writer.write(TimestampArray([], JST))
+    assert written + len(encode_timestamps([], JST)) == len(f.getvalue())
+    assert f.getvalue() == encode_timestamps(epochs, JST)
+
+
+def test_invalid():
+    data = encode_timestamps(epochs[:10], UTC)
+    for broken in [b"", b"DT", b"XXXX\x01\x02", data[:-1], data[:7], b"DTVZ\x02\x02\x00\x00", b"DTVZ\x01\x09\x00\x00"]:
+        with raises(DatetimeParseError):
+            decode_timestamps(broken)
+    with raises(DatetimeParseError):
+        list(read_timestamps(io.BytesIO(data[:-1])))
+    with raises(DatetimeParseError):
+        decode_timestamps(None)
+    with raises(DatetimeParseError):
+        read_timestamps(io.BytesIO(data), 0)
+    for args in [(None,), (io.BytesIO(), None), (io.BytesIO(), "JST"), (io.BytesIO(), UTC, "min")]:
+        with raises(DatetimeParseError):
+            TimestampWriter(*args)
+    with raises(DatetimeParseError):
+        encode_timestamps([2**62], UTC, "ns")
@@ -0,0 +1,133 @@
+from array import array
+from datetime import datetime, timedelta
+from itertools import islice
+
+from pytest import raises
+
+from libs import datearray
+from libs.datearray import TimestampArray, ceil_to, date_range, datetime_to_epoch, floor_to
+from libs.dateutils import JST, PST, UTC, DatetimeParseError, add_days, add_hours, weekday_index
+
+dts = [
+    datetime(1969, 12, 31, 23, 59, 59, 999999, tzinfo=UTC),
+    datetime(1970, 1, 1, tzinfo=JST),
+    datetime(2000, 2, 29, 12, 34, 56, 789000, tzinfo=JST),
+    datetime(2022, 5, 15, 23, 30, tzinfo=UTC),
+    datetime(2022, 12, 31, 15, 0, tzinfo=UTC),
+    datetime(1900, 3, 1, 8, 0, 1, tzinfo=PST),
+]
+
+
+def floor_dt(dt, unit):
+    dt = dt.replace(microsecond=0)
+    if unit in ("minute", "hour", "day", "week", "month"):
+        dt = dt.replace(second=0)
+    if unit in ("hour", "day", "week", "month"):
+        dt = dt.replace(minute=0)
+    if unit in ("day", "week", "month"):
+        dt = dt.replace(hour=0)
+    if unit == "week":
+        dt = add_days(dt, -weekday_index(dt))
+    if unit == "month":
+        dt = dt.replace(day=1)
+    return dt
+
+
+def next_boundary(dt, unit):
+    if unit == "month":
+        return dt.replace(year=dt.year + dt.month // 12, month=dt.month % 12 + 1)
+    return dt + timedelta(microseconds=datearray.BUCKET_UNITS[unit])
+
+
+def expected(unit, tz, ceil):
+    result = []
+    for dt in dts:
+        local = dt.astimezone(tz)
+        floored = floor_dt(local, unit)
+        if ceil and floored != local:
+            floored = next_boundary(floored, unit)
+        result.append(datetime_to_epoch(floored))
+    return result
+
+
+def test_floor_ceil():
+    epochs = [datetime_to_epoch(dt) for dt in dts]
+    for unit in ["second", "minute", "hour", "day", "week", "month"]:
+        for tz in [JST, UTC, PST]:
+            assert list(floor_to(epochs, unit, tz)) == expected(unit, tz, False), (unit, tz)
+            assert list(ceil_to(epochs, unit, tz)) == expected(unit, tz, True), (unit, tz)
+
+
+def test_floor_ceil_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    test_floor_ceil()
+    assert isinstance(floor_to([0], "day"), array)
+
+
+def test_timestamp_array():
+    timestamps = TimestampArray.from_datetimes(dts, PST)
+    floored = timestamps.floor_to("week")
+    assert isinstance(floored, TimestampArray)
+    assert floored.tz is PST
+    assert list(floored.epochs) == expected("week", PST, False)
+    assert list(timestamps.ceil_to("month").epochs) == expected("month", PST, True)
+    assert all(weekday_index(dt) == 0 for dt in floored)
+    # 明示した tz でバケットを切り、結果は元の tz のまま
+    in_jst = floor_to(timestamps, "day", JST)
+    assert in_jst.tz is PST and list(in_jst.epochs) == expected("day", JST, False)
+
+
+def test_date_range():
+    start = datetime(2022, 3, 1, tzinfo=JST)
+    hours = list(date_range(start, start + timedelta(days=2), "hour"))
+    assert hours == [add_hours(start, i) for i in range(48)]
+    assert list(date_range(start, add_days(start, 3), timedelta(days=1))) == [add_days(start, i) for i in range(3)]
+    assert list(date_range(start, add_days(start, -2), timedelta(days=-1))) == [start, add_days(start, -1)]
+    assert list(date_range(start, start, "day")) == []
+    assert list(date_range(start, start - timedelta(1), "day")) == []
+    utc_end = datetime(2022, 3, 1, 12, tzinfo=UTC)
+    assert list(date_range(start, utc_end, "day"))[-1] == start
+    assert list(date_range(start, utc_end, "day"))[0].tzinfo is JST
+
+
+def test_date_range_month():
+    start = datetime(2020, 1, 31, 12, tzinfo=UTC)
+    months = list(date_range(start, datetime(2021, 1, 1, tzinfo=UTC), "month"))
+    assert [dt.day for dt in months] == [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    assert [dt.month for dt in months] == list(range(1, 13))
+    assert months[-1] == datetime(2020, 12, 31, 12, tzinfo=UTC)
+    assert len(list(date_range(datetime(9999, 11, 1, tzinfo=UTC), datetime.max.replace(tzinfo=UTC), "month"))) == 2
+
+
+def test_date_range_edges():
+    last = datetime(9999, 12, 30, tzinfo=JST)
+    assert list(date_range(last, datetime(9999, 12, 31, 23, tzinfo=JST), "day")) == [last, add_days(last, 1)]
+    assert list(date_range(last, datetime.max.replace(tzinfo=JST), "week")) == [last]
+    first = datetime(1, 1, 2, 12, tzinfo=JST)
+    assert list(date_range(first, datetime.min.replace(tzinfo=JST), timedelta(days=-1))) == [first, add_days(first, -1)]
+
+
+def test_date_range_is_lazy():
+    start = datetime(1970, 1, 1, tzinfo=UTC)
+    steps = date_range(start, datetime(9999, 1, 1, tzinfo=UTC), "second")
+    assert list(islice(steps, 3)) == [start + timedelta(seconds=i) for i in range(3)]
+
+
+def test_invalid():
+    start = datetime(2022, 3, 1, tzinfo=JST)
+    for args in [
+        (None, start),
+        (start, "2022-03-02"),
+        (datetime(2022, 3, 1), start),
+        (start, start, None),
+        (start, start, "year"),
+        (start, start, 1),
+        (start, start, timedelta(0)),
+    ]:
+        with raises(DatetimeParseError):
+            date_range(*args)
+    for args in [(None, "day"), ([0], "year"), ([0], "day", "JST")]:
+        with raises(DatetimeParseError):
+            floor_to(*args)
+        with raises(DatetimeParseError):
+            ceil_to(*args)
@@ -0,0 +1,83 @@
+from array import array
+from datetime import datetime
+
+from pytest import importorskip, raises
+
+from libs import datearray
+from libs.datearray import iter_epochs, strings_to_datetimes, strings_to_epochs
+from libs.dateutils import (
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD_HMS,
+    JST,
+    UTC,
+    YMD,
+    DatetimeParseError,
+    string_to_datetime,
+)
+
+values = ["1970-01-01 09:00:00", "2022-05-15 12:34:56", "2000-02-29 23:59:59"]
+
+
+def _epoch(dt: datetime) -> int:
+    return round(dt.timestamp() * 1_000_000)
+
+
+def test_iter_epochs():
+    answer = [_epoch(string_to_datetime(v, HYPHEN_YMD_HMS)) for v in values]
+    assert list(iter_epochs(values, HYPHEN_YMD_HMS)) == answer
+    assert answer[0] == 0
+
+
+def test_iter_epochs_utc():
+    answer = [_epoch(string_to_datetime(v, HYPHEN_YMD_HMS, UTC)) for v in values]
+    assert list(iter_epochs(values, HYPHEN_YMD_HMS, UTC)) == answer
+
+
+def test_iter_epochs_fraction():
+    assert list(iter_epochs(["1970-01-01T00:00:01.5Z"], AWS_DATE_TIME_UTC, UTC)) == [1_500_000]
+
+
+def test_iter_epochs_fallback_format():
+    assert list(iter_epochs(["Jan 02 1970"], "%b %d %Y", UTC)) == [86400 * 1_000_000]
+
+
+def test_strings_to_epochs_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    result = strings_to_epochs(values, HYPHEN_YMD_HMS)
+    assert isinstance(result, array)
+    assert result.typecode == "q"
+    assert list(result) == list(iter_epochs(values, HYPHEN_YMD_HMS))
+    assert strings_to_datetimes(values, HYPHEN_YMD_HMS) == (result, JST)
+
+
+def test_strings_to_epochs_numpy():
+    np = importorskip("numpy")
+    result = strings_to_epochs(np.array(values), HYPHEN_YMD_HMS)
+    assert result.dtype == np.int64
+    assert result.tolist() == list(iter_epochs(values, HYPHEN_YMD_HMS))
+
+
+def test_strings_to_datetimes_numpy():
+    np = importorskip("numpy")
+    result, tz = strings_to_datetimes(values, HYPHEN_YMD_HMS, JST)
+    assert tz is JST and strings_to_datetimes(values, HYPHEN_YMD_HMS, UTC).tz is UTC
+    assert result.dtype == np.dtype("datetime64[us]")
+    assert result[0] == np.datetime64("1970-01-01T00:00:00", "us")
+    assert result[1] == np.datetime64("2022-05-15T03:34:56", "us")
+
+
+def test_invalid_value():
+    for invalid in ["2021-02-29", "19701301", "abc", "", None, 19700101]:
+        with raises(DatetimeParseError):
+            strings_to_epochs(["19700101", invalid], YMD)
+
+
+def test_invalid_args():
+    with raises(DatetimeParseError):
+        strings_to_epochs(None, YMD)
+    with raises(DatetimeParseError):
+        strings_to_epochs(values, None)
+    with raises(DatetimeParseError):
+        strings_to_epochs(values, YMD, tz=None)
+    with raises(DatetimeParseError):
+        strings_to_epochs(values, YMD, tz=123)
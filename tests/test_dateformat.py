@@ -0,0 +1,174 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pytest import raises
+
+from libs.dateformat import (
+    CompiledFormat,
+    StrptimeFormat,
+    compile_format,
+    format_cache_clear,
+    format_cache_info,
+    thread_format,
+)
+from libs.dateutils import (
+    AWS_DATE_TIME_JST,
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    JST,
+    SLASH_YMD,
+    SLASH_YMD_HMS,
+    YMD,
+    YMDHMS,
+    DatetimeParseError,
+    string_to_datetime,
+)
+
+FORMATS = [
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    SLASH_YMD,
+    SLASH_YMD_HMS,
+    YMD,
+    YMDHMS,
+    AWS_DATE_TIME_UTC,
+    AWS_DATE_TIME_JST,
+    "%d.%m.%Y %H:%M",
+    "[%Y] %%",
+]
+
+INPUTS = [
+    "1970-01-01",
+    "1970-1-1",
+    "2020-02-29",
+    "2021-02-29",
+    "1970-01-01 12:34:56",
+    "1970-01-01   12:34:56",
+    "1970-01-01\t12:34:56",
+    "1970/12/31",
+    "1970/12/31 23:59:59",
+    "19701231",
+    "19701231235959",
+    "19701231235960",
+    "1970123",
+    "1970-01-01T00:00:00.000Z",
+    "1970-01-01T00:00:00.1z",
+    "1970-01-01T00:00:00.1234567Z",
+    "1970-01-01T00:00:00+09",
+    "31.12.1970 23:59",
+    "[1970] %",
+    "0000-01-01",
+    "１９７０-01-01",
+    "",
+    "abc",
+]
+
+
+def _strptime_result(date_string, format_string):
+    try:
+        return datetime.strptime(date_string, format_string)
+    except ValueError as e:
+        return str(e)
+
+
+def _compiled_result(date_string, format_string):
+    try:
+        return compile_format(format_string).to_datetime(date_string)
+    except ValueError as e:
+        return str(e)
+
+
+def test_parity_with_strptime():
+    for format_string in FORMATS:
+        for date_string in INPUTS:
+            expected = _strptime_result(date_string, format_string)
+            assert _compiled_result(date_string, format_string) == expected, (date_string, format_string)
+
+
+def test_fixed_width_parity_with_strptime():
+    rand = random.Random(0)
+    samples = [
+        (YMD, "19701231"),
+        (YMDHMS, "19701231235959"),
+        (HYPHEN_YMD_HMS, "2000-02-29 12:34:56"),
+        (AWS_DATE_TIME_UTC, "1970-12-31T12:34:56.789Z"),
+        (AWS_DATE_TIME_JST, "1970-12-31T12:34:56+09"),
+    ]
+    for format_string, valid in samples:
+        for _ in range(500):
+            chars = list(valid)
+            for _ in range(rand.randint(1, 2)):
+                chars[rand.randrange(len(chars))] = rand.choice("0123456789 -+:.TZz9")
+            date_string = "".join(chars)
+            expected = _strptime_result(date_string, format_string)
+            assert _compiled_result(date_string, format_string) == expected, (date_string, format_string)
+
+
+def test_compiled_for_builtin_formats():
+    for format_string in FORMATS:
+        compiled = compile_format(format_string)
+        assert type(compiled) is CompiledFormat
+        assert compiled.format_string == format_string
+
+
+def test_parse_fields():
+    fields = compile_format(AWS_DATE_TIME_UTC).parse("1970-12-31T12:34:56.789Z")
+    assert fields == (1970, 12, 31, 12, 34, 56, 789000)
+
+
+def test_fallback_to_strptime():
+    compiled = compile_format("%b %d %Y")
+    assert isinstance(compiled, StrptimeFormat)
+    assert compiled.to_datetime("Jan 02 1970", JST) == datetime(1970, 1, 2, tzinfo=JST)
+
+
+def test_fallback_for_bad_format():
+    for format_string in ["%Y-%Q", "%Y %"]:
+        assert isinstance(compile_format(format_string), StrptimeFormat)
+        with raises(DatetimeParseError):
+            string_to_datetime(date_string="1970-01", format_string=format_string)
+
+
+def test_cache_info():
+    format_cache_clear()
+    compile_format(YMD)
+    compile_format(YMD)
+    compile_format(YMDHMS)
+    info = format_cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+    assert info.currsize == 2
+    format_cache_clear()
+    assert format_cache_info().currsize == 0
+
+
+def test_compile_invalid_type():
+    with raises(TypeError):
+        compile_format(123)
+
+
+def test_thread_format():
+    format_cache_clear()
+    compiled = thread_format(YMDHMS)
+    assert thread_format(YMDHMS) is compiled
+    assert format_cache_info().misses == 1 and format_cache_info().hits == 1
+    string_to_datetime("20220515123456", YMDHMS)
+    assert format_cache_info().hits == 2
+    format_cache_clear()
+    assert format_cache_info().hits == 0
+    assert thread_format(YMDHMS) is not compiled
+
+    def parse(index):
+        date_string = f"2022-05-{index % 28 + 1:02d} 12:34:56"
+        return [thread_format(HYPHEN_YMD_HMS).parse(date_string) for _ in range(100)], thread_format(YMD)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse, range(64)))
+    # 各スレッドの初回は共有キャッシュのヒット: 64 タスク × 101 回のうち compile は 2 回だけ
+    info = format_cache_info()
+    assert info.misses == 3 and info.hits == 64 * 101 - 2
+    for index, (fields, compiled) in enumerate(results):
+        assert set(fields) == {(2022, 5, index % 28 + 1, 12, 34, 56, 0)}
+        assert compiled is compile_format(YMD)
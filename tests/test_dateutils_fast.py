@@ -0,0 +1,119 @@
+import inspect
+from datetime import datetime, timedelta
+
+from libs import dateutils
+from libs import dateutils_fast as fast
+from libs.dateutils import (
+    AWS_DATE_TIME_JST,
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    JST,
+    PST,
+    SLASH_YMD,
+    SLASH_YMD_HMS,
+    UTC,
+    YMD,
+    YMDHMS,
+)
+
+# fast に対応する関数を持たない (1 回だけ呼ぶ設定/IO 系の) 関数
+NOT_MIRRORED = {
+    "iter_parse_column",
+    "enable_coarse_clock",
+    "disable_coarse_clock",
+    "enable_parse_cache",
+    "disable_parse_cache",
+    "parse_cache_info",
+    "parse_cache_clear",
+}
+
+FORMATS = [HYPHEN_YMD, HYPHEN_YMD_HMS, SLASH_YMD, SLASH_YMD_HMS, YMD, YMDHMS, AWS_DATE_TIME_UTC, AWS_DATE_TIME_JST]
+
+dts = [
+    datetime(1970, 1, 1, tzinfo=JST),
+    datetime(1969, 12, 31, 23, 59, 59, 999999, tzinfo=UTC),
+    datetime(2000, 2, 29, 12, 34, 56, 789000, tzinfo=JST),
+    datetime(2022, 5, 15, 3, 4, 5, 6, tzinfo=UTC),
+    datetime(2038, 1, 19, 3, 14, 8, tzinfo=PST),
+]
+
+
+def assert_same(expected, actual):
+    assert actual == expected
+    assert type(actual) is type(expected)
+    if isinstance(expected, datetime):
+        assert actual.tzinfo == expected.tzinfo
+        assert actual.tzname() == expected.tzname()
+
+
+def test_mirrors_public_api():
+    public = {
+        name
+        for name, value in inspect.getmembers(dateutils, inspect.isfunction)
+        if value.__module__ == dateutils.__name__ and not name.startswith("_")
+    }
+    for name in public - NOT_MIRRORED:
+        assert callable(getattr(fast, name)), name
+        assert list(inspect.signature(getattr(fast, name)).parameters) == list(
+            inspect.signature(getattr(dateutils, name)).parameters
+        ), name
+
+
+def test_string_to_datetime():
+    for dt in dts:
+        for fmt in FORMATS:
+            date_string = dt.strftime(fmt)
+            for tz in [JST, UTC]:
+                expected = dateutils.string_to_datetime(date_string, fmt, tz)
+                assert_same(expected, fast.string_to_datetime(date_string, fmt, tz))
+    expected = dateutils.string_to_datetime("Jan 02 1970", "%b %d %Y")
+    assert_same(expected, fast.string_to_datetime("Jan 02 1970", "%b %d %Y"))
+
+
+def test_ymd_ymdhms_aws():
+    for dt in dts:
+        for fmt in [YMD, SLASH_YMD, HYPHEN_YMD]:
+            date_string = dt.strftime(fmt)
+            assert_same(dateutils.ymd_to_dt(date_string), fast.ymd_to_dt(date_string))
+            assert_same(dateutils.ymd_to_dt(date_string, UTC), fast.ymd_to_dt(date_string, UTC))
+        for fmt in [YMDHMS, SLASH_YMD_HMS, HYPHEN_YMD_HMS]:
+            date_string = dt.strftime(fmt)
+            assert_same(dateutils.ymdhms_to_dt(date_string), fast.ymdhms_to_dt(date_string))
+            assert_same(dateutils.ymdhms_to_dt(date_string, PST), fast.ymdhms_to_dt(date_string, PST))
+        for fmt in [AWS_DATE_TIME_UTC, AWS_DATE_TIME_JST, "%Y-%m-%dT%H:%M:%S.123Z"]:
+            date_string = dt.strftime(fmt)
+            assert_same(dateutils.aws_to_dt(date_string), fast.aws_to_dt(date_string))
+
+
+def test_datetime_functions():
+    for dt in dts:
+        for fmt in FORMATS + ["%a %b %Z %z"]:
+            assert_same(dateutils.dt_to_string(dt, fmt), fast.dt_to_string(dt, fmt))
+        if dt.tzinfo in (JST, UTC):
+            assert_same(dateutils.convert_tz_utc_jst(dt), fast.convert_tz_utc_jst(dt))
+        for n in [0, 1, -400, 10000]:
+            assert_same(dateutils.add_days(dt, n), fast.add_days(dt, n))
+            assert_same(dateutils.add_hours(dt, n), fast.add_hours(dt, n))
+        assert_same(dateutils.weekday_index(dt), fast.weekday_index(dt))
+        assert_same(dateutils.weekday_name_en(dt), fast.weekday_name_en(dt))
+        assert_same(dateutils.weekday_name_jp(dt), fast.weekday_name_jp(dt))
+
+
+def test_unix_time_functions():
+    for dt in dts:
+        assert_same(dateutils.dt_to_unix_time(dt), fast.dt_to_unix_time(dt))
+        for unit in dateutils.UNIX_TIME_UNITS:
+            epoch = dateutils.dt_to_epoch(dt, unit)
+            assert_same(epoch, fast.dt_to_epoch(dt, unit))
+            for tz in [JST, UTC, PST]:
+                assert_same(dateutils.epoch_to_dt(epoch, unit, tz), fast.epoch_to_dt(epoch, unit, tz))
+    for ut in [0, 1652585696, -1.5, 1652585696.789]:
+        for tz in [JST, UTC]:
+            assert_same(dateutils.unix_time_to_dt(ut, tz), fast.unix_time_to_dt(ut, tz))
+
+
+def test_now():
+    assert fast.get_utc_now().tzinfo is UTC
+    assert fast.get_jts_now().tzinfo is JST
+    assert abs(fast.get_utc_now() - dateutils.get_utc_now()) < timedelta(seconds=1)
@@ -1,6 +1,19 @@
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 
-from libs.dateutils import JST, UTC, get_jts_now, get_utc_now
+from pytest import raises
+
+from libs.dateutils import (
+    JST,
+    UTC,
+    CoarseClock,
+    DatetimeParseError,
+    disable_coarse_clock,
+    enable_coarse_clock,
+    get_jts_now,
+    get_unix_time_ns,
+    get_utc_now,
+)
 
 
 def test_get_utc_now():
@@ -13,3 +26,64 @@ def test_get_jst_now():
     assert get_jts_now() is not None
     assert isinstance(get_jts_now(), datetime)
     assert get_jts_now().tzinfo is JST
+
+
+def test_coarse_clock():
+    clock = CoarseClock(resolution_ns=10_000_000_000)
+    assert clock.time_ns() % 10_000_000_000 == 0
+    assert abs(clock.time_ns() - time.time_ns()) <= 10_000_000_000
+    assert clock.now(UTC) is clock.now(UTC)
+    assert clock.now(JST).tzinfo is JST
+    assert clock.now(JST) == clock.now(UTC)
+
+
+def test_coarse_clock_same_offset():
+    # 同じ offset の timezone は == になるが、別のキャッシュエントリになる
+    clock = CoarseClock(resolution_ns=10_000_000_000)
+    kst = timezone(timedelta(hours=9), "KST")
+    assert clock.now(JST).tzinfo is JST
+    assert clock.now(kst).tzinfo is kst
+    assert clock.now(kst).tzname() == "KST" and clock.now(JST).tzname() == "JST"
+    assert clock.now(kst) is clock.now(kst)
+
+
+def test_coarse_clock_advances():
+    clock = CoarseClock(resolution_ns=1_000_000)
+    first = clock.time_ns()
+    time.sleep(0.01)
+    assert clock.time_ns() > first
+
+
+def test_enable_coarse_clock():
+    try:
+        enable_coarse_clock(resolution_ms=10_000)
+        assert get_utc_now() is get_utc_now()
+        assert get_utc_now().tzinfo is UTC
+        assert get_jts_now().tzinfo is JST
+        assert get_unix_time_ns() % 10_000_000_000 == 0
+    finally:
+        disable_coarse_clock()
+    assert get_utc_now() is not get_utc_now()
+
+
+def test_coarse_clock_invalid_args():
+    with raises(DatetimeParseError):
+        CoarseClock(resolution_ns=0)
+    with raises(DatetimeParseError):
+        CoarseClock(resync_ns=None)
+    for kwargs in [
+        {"resolution_ms": None},
+        {"resolution_ms": "1"},
+        {"resolution_ms": True},
+        {"resolution_ms": 0},
+        {"resolution_ms": -1},
+        {"resolution_ms": float("nan")},
+        {"resolution_ms": float("inf")},
+        {"resolution_ms": 0.0000001},
+        {"resync_ms": None},
+        {"resync_ms": 0},
+    ]:
+        name = next(iter(kwargs))
+        with raises(DatetimeParseError, match=name):
+            enable_coarse_clock(**kwargs)
+    assert get_utc_now() is not get_utc_now()
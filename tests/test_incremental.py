@@ -0,0 +1,114 @@
+import random
+from array import array
+from datetime import datetime, timedelta
+
+from pytest import raises
+
+from libs import datearray, incremental
+from libs.datearray import datetime_to_epoch
+from libs.dateutils import (
+    AWS_DATE_TIME_JST,
+    AWS_DATE_TIME_UTC,
+    HYPHEN_YMD,
+    HYPHEN_YMD_HMS,
+    JST,
+    UTC,
+    YMDHMS,
+    DatetimeParseError,
+    string_to_datetime,
+)
+from libs.incremental import IncrementalParser
+
+rng = random.Random(20)
+start = datetime(2022, 12, 31, 23, 58, tzinfo=JST)
+ordered = [start + timedelta(microseconds=rng.randrange(10**6) * 400) * i // 1000 for i in range(1000)]
+shuffled = rng.sample(ordered, len(ordered))
+dirty = [
+    "2022-05-15 12:34:56",
+    "2022-05-15 12:34:60",
+    "2022-05-15 12:35:61",
+    "2022-05-15 24:00:00",
+    "2022-05-15 12:60:00",
+    "2022-05-15 12:34:5x",
+    "2022-5-15 12:34:56",
+    "2022-05-15  12:34:56",
+    "2022-05-15 2:34:56",
+    "2022-02-29 12:34:56",
+    "2022-05-15 12:34",
+    "",
+    None,
+    20220515,
+]
+
+
+def outcome(parse, value):
+    try:
+        return parse(value)
+    except DatetimeParseError as e:
+        return str(e)
+
+
+def check(fmt, tz, values):
+    parser = IncrementalParser(fmt, tz)
+    for value in values:
+        result = outcome(parser.to_datetime, value)
+        assert result == outcome(lambda v: string_to_datetime(v, fmt, tz), value), value
+        if isinstance(result, datetime):
+            assert result.tzinfo is tz
+
+
+def test_matches_string_to_datetime():
+    for fmt in [HYPHEN_YMD_HMS, YMDHMS, AWS_DATE_TIME_UTC, AWS_DATE_TIME_JST, HYPHEN_YMD, "%b %d %Y %H:%M:%S"]:
+        for tz in [JST, UTC]:
+            strings = [dt.strftime(fmt) for dt in ordered]
+            check(fmt, tz, strings)
+            check(fmt, tz, [dt.strftime(fmt) for dt in shuffled])
+            check(fmt, tz, [value for pair in zip(strings, dirty * 100) for value in pair])
+
+
+def test_variable_fraction():
+    values = [
+        "2022-05-15T12:34:56.7Z",
+        "2022-05-15T12:34:56.78Z",
+        "2022-05-15T12:34:57.123456Z",
+        "2022-05-15T12:34:57Z",
+    ]
+    check(AWS_DATE_TIME_UTC, UTC, values + values[::-1])
+
+
+def test_prefix_reuse():
+    parser = IncrementalParser(HYPHEN_YMD_HMS, JST)
+    assert parser._day[0] == len("2022-05-15 ") and parser._minute[0] == len("2022-05-15 12:34:")
+    assert IncrementalParser("%H:%M:%S %Y-%m-%d")._day is None
+    assert IncrementalParser("%d/%b/%Y:%H:%M:%S")._day is None
+    parser.to_epoch("2022-05-15 12:34:56")
+    # 同じ分・同じ日の文字列は末尾だけを解析する
+    parser._format = None
+    assert parser.to_epoch("2022-05-15 12:34:58") == datetime_to_epoch(datetime(2022, 5, 15, 12, 34, 58, tzinfo=JST))
+    assert parser.to_epoch("2022-05-15 13:00:00") == datetime_to_epoch(datetime(2022, 5, 15, 13, tzinfo=JST))
+    assert parser._minute_key == "2022-05-15 13:00:"
+
+
+def _epochs():
+    strings = [dt.strftime(HYPHEN_YMD_HMS) for dt in ordered]
+    parser = IncrementalParser(HYPHEN_YMD_HMS, JST)
+    expected = [datetime_to_epoch(string_to_datetime(value, HYPHEN_YMD_HMS, JST)) for value in strings]
+    assert list(parser.to_epochs(strings)) == expected
+    return parser.to_epochs(strings[:3])
+
+
+def test_to_epochs():
+    assert _epochs().dtype == datearray.np.int64
+
+
+def test_to_epochs_without_numpy(monkeypatch):
+    monkeypatch.setattr(incremental, "np", None)
+    assert isinstance(_epochs(), array)
+
+
+def test_invalid():
+    for args in [(None,), (HYPHEN_YMD, None), (1,), (HYPHEN_YMD, "JST")]:
+        with raises(DatetimeParseError):
+            IncrementalParser(*args)
+    with raises(DatetimeParseError):
+        IncrementalParser(HYPHEN_YMD).to_epochs(None)
@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime
+
+from pytest import fixture, raises
+
+from libs import dateutils, instrument
+from libs.dateformat import FORMAT_MISMATCH, INVALID_TYPE, MISSING_ARGUMENT, OUT_OF_RANGE, UNCONVERTED_DATA
+from libs.dateutils import HYPHEN_YMD, JST, YMD, DatetimeParseError
+
+
+@fixture
+def enabled():
+    instrument.reset_stats()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset_stats()
+
+
+def test_disabled_by_default():
+    assert not instrument.is_enabled()
+    assert dateutils.string_to_datetime.__module__ == "libs.dateutils"
+    assert not hasattr(dateutils.string_to_datetime, "__wrapped__")
+
+
+def test_calls_and_latency(enabled):
+    dateutils.string_to_datetime("1970-01-01", HYPHEN_YMD)
+    dateutils.string_to_datetime(date_string="19700101", format_string=YMD)
+    dateutils.ymd_to_dt("19700101")
+    stats = instrument.get_stats()
+    assert stats["calls"]["string_to_datetime"] == 3
+    assert stats["calls"]["ymd_to_dt"] == 1
+    assert stats["latency"][f"string_to_datetime[{YMD}]"]["count"] == 2
+    assert stats["latency"][f"string_to_datetime[{HYPHEN_YMD}]"]["count"] == 1
+    assert sum(stats["latency"]["ymd_to_dt"]["histogram"].values()) == 1
+
+
+def test_errors_by_cause(enabled):
+    for date_string in ["abc", "1970010199", None, "19701301"]:
+        with raises(DatetimeParseError):
+            dateutils.string_to_datetime(date_string, YMD)
+    with raises(DatetimeParseError):
+        dateutils.add_days(datetime(1970, 1, 1, tzinfo=JST), 1.5)
+    stats = instrument.get_stats()
+    assert stats["errors"]["string_to_datetime"] == {
+        "format_mismatch": 1,
+        "unconverted_data": 2,
+        "missing_argument": 1,
+    }
+    assert stats["errors"]["add_days"] == {"invalid_type": 1}
+
+
+def test_timezone_errors(enabled):
+    for dt in [datetime(1970, 1, 1), datetime(1970, 1, 1, tzinfo=dateutils.EST), "1970-01-01"]:
+        with raises(DatetimeParseError):
+            dateutils.convert_tz_utc_jst(dt)
+    with raises(DatetimeParseError):
+        dateutils.dt_to_epoch(datetime(1970, 1, 1), "ms")
+    stats = instrument.get_stats()
+    assert stats["errors"]["dt_to_epoch"] == {"invalid_timezone": 1}
+    assert stats["errors"]["convert_tz_utc_jst"] == {"invalid_timezone": 2, "invalid_type": 1}
+    assert instrument.error_cause("dt must be a datetime with timezone") == "invalid_timezone"
+
+
+def test_causes_match_try_parse():
+    # try_parse の失敗理由は instrument の原因名と同じ定数
+    causes = {cause for _, cause in instrument.ERROR_CAUSES}
+    reasons = {MISSING_ARGUMENT, INVALID_TYPE, FORMAT_MISMATCH, UNCONVERTED_DATA, OUT_OF_RANGE}
+    assert reasons <= causes
+
+
+def test_callers(enabled):
+    instrument.enable(track_callers=True)
+    dateutils.weekday_name_en(datetime(1970, 1, 1, tzinfo=JST))
+    callers = instrument.get_stats()["callers"]
+    assert callers["libs.dateutils.weekday_name_en -> weekday_index"] == 1
+    assert callers["tests.test_instrument.test_callers -> weekday_name_en"] == 1
+
+
+def test_disable_restores():
+    original = dateutils.string_to_datetime
+    instrument.enable(["string_to_datetime"])
+    assert dateutils.string_to_datetime is not original
+    instrument.disable()
+    assert dateutils.string_to_datetime is original
+    with raises(ValueError):
+        instrument.enable(["strptime"])
+
+
+def test_log_stats(enabled, caplog):
+    dateutils.get_utc_now()
+    with caplog.at_level(logging.INFO):
+        stats = instrument.log_stats(reset=True)
+    assert stats["calls"]["get_utc_now"] == 1
+    assert "dateutils stats" in caplog.text
+    assert instrument.get_stats()["calls"] == {}
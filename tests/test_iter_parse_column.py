@@ -0,0 +1,93 @@
+import io
+from datetime import datetime
+
+from pytest import raises
+
+from libs.dateutils import (
+    HYPHEN_YMD_HMS,
+    JSONL_FILE,
+    JST,
+    UTC,
+    YMD,
+    DatetimeParseError,
+    iter_parse_column,
+)
+
+CSV_TEXT: str = "id,created_at\n1,1970-01-01 00:00:00\n2,2022-05-15 12:34:56\n\n3,2000-02-29 23:59:59\n"
+JSONL_TEXT: str = (
+    '{"id": 1, "created_at": "1970-01-01 00:00:00"}\n'
+    '{"id": 2, "created_at": "2022-05-15 12:34:56"}\n'
+    "\n"
+    '{"id": 3, "created_at": "2000-02-29 23:59:59"}\n'
+)
+answer = [
+    datetime(1970, 1, 1, 0, 0, 0, tzinfo=JST),
+    datetime(2022, 5, 15, 12, 34, 56, tzinfo=JST),
+    datetime(2000, 2, 29, 23, 59, 59, tzinfo=JST),
+]
+
+
+def test_csv_path(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text(CSV_TEXT)
+    assert list(iter_parse_column(path, "created_at", HYPHEN_YMD_HMS)) == answer
+    assert list(iter_parse_column(str(path), 1, HYPHEN_YMD_HMS)) == answer
+
+
+def test_jsonl_path(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text(JSONL_TEXT)
+    assert list(iter_parse_column(path, "created_at", HYPHEN_YMD_HMS)) == answer
+
+
+def test_file_object():
+    assert list(iter_parse_column(io.StringIO(CSV_TEXT), "created_at", HYPHEN_YMD_HMS)) == answer
+    rows = iter_parse_column(io.StringIO(JSONL_TEXT), "created_at", HYPHEN_YMD_HMS, file_type=JSONL_FILE)
+    assert list(rows) == answer
+
+
+def test_tz():
+    rows = list(iter_parse_column(io.StringIO(CSV_TEXT), "created_at", HYPHEN_YMD_HMS, tz=UTC))
+    assert rows[0] == datetime(1970, 1, 1, 0, 0, 0, tzinfo=UTC)
+
+
+def test_batches():
+    batches = list(iter_parse_column(io.StringIO(CSV_TEXT), "created_at", HYPHEN_YMD_HMS, batch_size=2))
+    assert batches == [answer[:2], answer[2:]]
+
+
+def test_lazy():
+    rows = iter_parse_column(io.StringIO(CSV_TEXT + "4,invalid\n"), "created_at", HYPHEN_YMD_HMS)
+    assert next(rows) == answer[0]
+    with raises(DatetimeParseError):
+        list(rows)
+
+
+def test_invalid_value():
+    with raises(DatetimeParseError):
+        list(iter_parse_column(io.StringIO(CSV_TEXT), "created_at", YMD))
+    with raises(DatetimeParseError):
+        list(iter_parse_column(io.StringIO('{"id": 1}\n'), "created_at", YMD, file_type=JSONL_FILE))
+
+
+def test_invalid_jsonl_line():
+    for text, message in [
+        ('{"created_at": "1970-01-01 00:00:00"}\n{"id": \n', "line 2 is not valid JSON"),
+        ('\n["1970-01-01 00:00:00"]\n', "line 2 must be a JSON object"),
+    ]:
+        rows = iter_parse_column(io.StringIO(text), "created_at", HYPHEN_YMD_HMS, file_type=JSONL_FILE)
+        with raises(DatetimeParseError, match=message):
+            list(rows)
+
+
+def test_invalid_args():
+    with raises(DatetimeParseError):
+        list(iter_parse_column(io.StringIO(CSV_TEXT), "missing", HYPHEN_YMD_HMS))
+    with raises(DatetimeParseError):
+        iter_parse_column(None, "created_at", HYPHEN_YMD_HMS)
+    with raises(DatetimeParseError):
+        iter_parse_column(io.StringIO(CSV_TEXT), None, HYPHEN_YMD_HMS)
+    with raises(DatetimeParseError):
+        iter_parse_column(io.StringIO(CSV_TEXT), "created_at", HYPHEN_YMD_HMS, batch_size=0)
+    with raises(DatetimeParseError):
+        iter_parse_column(io.StringIO(CSV_TEXT), "created_at", HYPHEN_YMD_HMS, file_type="xml")
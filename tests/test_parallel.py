@@ -0,0 +1,89 @@
+from array import array
+
+from pytest import raises
+
+from libs import datearray, parallel
+from libs.datearray import strings_to_epochs
+from libs.dateutils import HYPHEN_YMD_HMS, UTC, YMDHMS, DatetimeParseError
+from libs.parallel import parse_file_parallel, split_ranges
+
+values = [f"2022-05-{day:02d} {hour:02d}:34:56" for day in range(1, 29) for hour in range(24)]
+
+
+def _write(tmp_path, lines, newline="\n"):
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(newline.join(lines).encode() + newline.encode())
+    return path
+
+
+def test_split_ranges(tmp_path):
+    path = _write(tmp_path, values)
+    data = path.read_bytes()
+    for parts in [1, 2, 3, 7, 100, 10000]:
+        ranges = split_ranges(path, parts)
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(data)
+        for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+            assert stop == start
+            assert data[stop - 1 : stop] == b"\n"
+
+
+def test_split_ranges_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert split_ranges(path, 4) == []
+
+
+def test_parse_file_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_BYTES", 0)
+    path = _write(tmp_path, values, newline="\r\n")
+    answer = list(strings_to_epochs(values, HYPHEN_YMD_HMS))
+    assert list(parse_file_parallel(path, HYPHEN_YMD_HMS, workers=3)) == answer
+    assert list(parse_file_parallel(path, HYPHEN_YMD_HMS, workers=1)) == answer
+
+
+def test_parse_file_parallel_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, "np", None)
+    monkeypatch.setattr(datearray, "np", None)
+    path = _write(tmp_path, values)
+    result = parse_file_parallel(path, HYPHEN_YMD_HMS, tz=UTC)
+    assert isinstance(result, array)
+    assert list(result) == list(strings_to_epochs(values, HYPHEN_YMD_HMS, UTC))
+
+
+def test_invalid_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_BYTES", 0)
+    path = _write(tmp_path, values[:10] + ["invalid"] + values[10:])
+    with raises(DatetimeParseError):
+        parse_file_parallel(path, HYPHEN_YMD_HMS, workers=2)
+
+
+def test_undecodable_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_BYTES", 0)
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes("\n".join(values[:10]).encode() + b"\n2022-05-01 \xff0:34:56\n" + "\n".join(values).encode())
+    for workers in [1, 2]:
+        with raises(DatetimeParseError):
+            parse_file_parallel(path, HYPHEN_YMD_HMS, workers=workers)
+
+
+def test_chunks(tmp_path, monkeypatch):
+    # 塊の境界が行の途中・空行・ファイル末尾 (改行なし) に来ても同じ結果になる
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(b"\r\n" + "\r\n\n".join(values[:50]).encode())
+    answer = list(strings_to_epochs(values[:50], HYPHEN_YMD_HMS))
+    for chunk in [1, 7, 20, 1024 * 1024]:
+        monkeypatch.setattr(parallel, "CHUNK_BYTES", chunk)
+        assert list(parse_file_parallel(path, HYPHEN_YMD_HMS)) == answer
+
+
+def test_invalid_args(tmp_path):
+    path = _write(tmp_path, values)
+    with raises(DatetimeParseError):
+        parse_file_parallel(None, YMDHMS)
+    with raises(DatetimeParseError):
+        parse_file_parallel(path, None)
+    with raises(DatetimeParseError):
+        parse_file_parallel(path, YMDHMS, workers=0)
+    with raises(DatetimeParseError):
+        parse_file_parallel(tmp_path / "missing.txt", YMDHMS)
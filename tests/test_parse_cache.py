@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone
+
+from pytest import fixture, raises
+
+from libs import dateutils
+from libs.dateutils import (
+    HYPHEN_YMD_HMS,
+    JST,
+    UTC,
+    DatetimeParseError,
+    aws_to_dt,
+    disable_parse_cache,
+    enable_parse_cache,
+    parse_cache_clear,
+    parse_cache_info,
+    string_to_datetime,
+    ymd_to_dt,
+    ymdhms_to_dt,
+)
+
+
+@fixture
+def cache():
+    enable_parse_cache(maxsize=4)
+    yield
+    disable_parse_cache()
+
+
+def test_disabled_by_default():
+    assert parse_cache_info() is None
+    assert string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS) is not string_to_datetime(
+        "2022-05-15 12:34:56", HYPHEN_YMD_HMS
+    )
+
+
+def test_same_object(cache):
+    first = string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS)
+    assert string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS) is first
+    assert ymdhms_to_dt("2022-05-15 12:34:56") is first
+    assert string_to_datetime("2022-05-15 12:34:56", HYPHEN_YMD_HMS, UTC) is not first
+    assert ymd_to_dt("20220515") is ymd_to_dt("20220515")
+    assert aws_to_dt("2022-05-15T12:34:56.789Z") is aws_to_dt("2022-05-15T12:34:56.789Z")
+    info = parse_cache_info()
+    assert (info["hits"], info["misses"], info["currsize"], info["maxsize"]) == (4, 4, 4, 4)
+    assert info["hit_rate"] == 0.5
+
+
+def test_key_includes_tz_name(cache):
+    other = timezone(timedelta(hours=9), "KST")
+    assert string_to_datetime("20220515", "%Y%m%d", JST).tzname() == "JST"
+    assert string_to_datetime("20220515", "%Y%m%d", other).tzname() == "KST"
+
+
+def test_lru_and_clear(cache):
+    for day in range(1, 7):
+        string_to_datetime(f"2022-05-{day:02d} 00:00:00", HYPHEN_YMD_HMS)
+    assert parse_cache_info()["currsize"] == 4
+    parse_cache_clear()
+    assert parse_cache_info() == {"hits": 0, "misses": 0, "maxsize": 4, "currsize": 0, "hit_rate": 0.0}
+
+
+def test_errors_not_cached(cache):
+    for _ in range(2):
+        with raises(DatetimeParseError):
+            string_to_datetime("2022-05-15", HYPHEN_YMD_HMS)
+        with raises(DatetimeParseError):
+            string_to_datetime(None, HYPHEN_YMD_HMS)
+    assert parse_cache_info()["currsize"] == 0
+
+
+def test_threads(cache):
+    enable_parse_cache(maxsize=64)
+    values = [f"2022-05-15 12:34:{second:02d}" for second in range(50)] * 200
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda value: string_to_datetime(value, HYPHEN_YMD_HMS), values))
+    assert results == [string_to_datetime(value, HYPHEN_YMD_HMS) for value in values]
+    assert parse_cache_info()["hit_rate"] > 0.9
+
+
+def test_invalid_maxsize():
+    for maxsize in [0, -1, None, 1.5, True]:
+        with raises(DatetimeParseError):
+            enable_parse_cache(maxsize)
+    assert dateutils._parse_cache is None
@@ -0,0 +1,77 @@
+import sys
+from datetime import datetime, timedelta, timezone
+
+from pytest import mark, raises
+
+from libs import dateutils_fast
+from libs.dateutils import JST, UTC, DatetimeParseError, aws_to_dt, rfc3339_to_dt
+from libs.rfc3339 import offset_timezone, parse_rfc3339
+
+IST = timezone(timedelta(hours=5, minutes=30))
+VALID = {
+    "2022-05-15T12:34:56Z": datetime(2022, 5, 15, 12, 34, 56, tzinfo=UTC),
+    "2022-05-15t12:34:56z": datetime(2022, 5, 15, 12, 34, 56, tzinfo=UTC),
+    "2022-05-15 12:34:56.789+09:00": datetime(2022, 5, 15, 12, 34, 56, 789000, tzinfo=JST),
+    "2022-05-15T12:34:56,5-0800": datetime(2022, 5, 15, 12, 34, 56, 500000, tzinfo=timezone(timedelta(hours=-8))),
+    "2022-05-15T12:34+05:30": datetime(2022, 5, 15, 12, 34, tzinfo=IST),
+    "20220515T123456.123456789+09": datetime(2022, 5, 15, 12, 34, 56, 123456, tzinfo=JST),
+    "20220515T1234Z": datetime(2022, 5, 15, 12, 34, tzinfo=UTC),
+    "2022-05-15T12:34:56.123456-00:00": datetime(2022, 5, 15, 12, 34, 56, 123456, tzinfo=UTC),
+}
+INVALID = [
+    "2022-05-15T12:34:56",
+    "2022-05-15T12:34:56.Z",
+    "2022-05-15T12:34:56.1234567890Z",
+    "2022-05-15T12:34.5Z",
+    "2022-05-15T12:34:56+9",
+    "2022-05-15T12:34:56+09:0",
+    "2022-05-15T12:34:56+0900Z",
+    "2022-05-15T12:34:56+24:00",
+    "2022-05-15T12:34:56+０９",
+    "2022-13-15T12:34:56Z",
+    "2022-02-30T12:34:56Z",
+    "2022-05-15T24:00:00Z",
+    "2022-05-15X12:34:56Z",
+    "２０２２-05-15T12:34:56Z",
+    "2022-05-15",
+]
+
+
+def test_valid():
+    for date_string, expected in VALID.items():
+        for parse in [parse_rfc3339, rfc3339_to_dt, aws_to_dt, dateutils_fast.aws_to_dt]:
+            dt = parse(date_string)
+            assert dt == expected and dt.utcoffset() == expected.utcoffset(), date_string
+
+
+def test_timezone():
+    assert aws_to_dt("2022-05-15T12:34:56.789Z").tzinfo is UTC
+    assert aws_to_dt("2022-05-15T12:34:56+09").tzinfo is JST
+    assert aws_to_dt("2022-05-15T12:34:56+0900").tzinfo is JST
+    # 同じオフセットは同じ timezone オブジェクトになる
+    first = rfc3339_to_dt("2022-05-15T12:34:56+05:30").tzinfo
+    assert rfc3339_to_dt("2022-05-15T12:34:56+0530").tzinfo is first is offset_timezone(19800)
+
+
+def test_invalid():
+    for date_string in INVALID:
+        with raises(ValueError):
+            parse_rfc3339(date_string)
+        with raises(DatetimeParseError):
+            rfc3339_to_dt(date_string)
+    with raises(DatetimeParseError, match="no UTC offset"):
+        aws_to_dt("2022-05-15T12:34:56.789")
+    with raises(DatetimeParseError, match="out of range"):
+        aws_to_dt("2022-05-15T12:34:56+09:60")
+    for value, message in [(None, "require"), (1, "string"), ("", "empty")]:
+        with raises(DatetimeParseError, match=message):
+            rfc3339_to_dt(value)
+    with raises(TypeError):
+        parse_rfc3339(None)
+
+
+@mark.skipif(sys.version_info < (3, 11), reason="fromisoformat accepts RFC 3339 from Python 3.11")
+def test_fromisoformat():
+    for date_string in VALID:
+        if "," not in date_string and len(date_string.split(".")[-1]) < 12:
+            assert parse_rfc3339(date_string) == datetime.fromisoformat(date_string), date_string
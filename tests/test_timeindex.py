@@ -0,0 +1,108 @@
+import random
+from array import array
+from datetime import datetime
+
+from pytest import raises
+
+from libs import datearray, timeindex
+from libs.datearray import TimestampArray
+from libs.dateutils import HYPHEN_YMD_HMS, JST, UTC, DatetimeParseError
+from libs.timeindex import TimeIndex, merge_asof
+
+rng = random.Random(25)
+LEFT = [rng.randrange(0, 1000) for _ in range(300)]
+RIGHT = [rng.randrange(100, 900, 7) for _ in range(60)] + [500, 500, 500]
+
+
+def _expected(left, right, direction, tolerance, exact):
+    # 全探索による参照実装 (backward は同時刻の最後、forward は最初)
+    result = []
+    for value in left:
+        before = [i for i, r in enumerate(right) if r < value or (exact and r == value)]
+        after = [i for i, r in enumerate(right) if r > value or (exact and r == value)]
+        candidates = []
+        if before and direction != "forward":
+            candidates.append((value - right[before[-1]], 0, before[-1]))
+        if after and direction != "backward":
+            candidates.append((right[after[0]] - value, 1, after[0]))
+        match = min(candidates) if candidates else None
+        result.append(-1 if match is None or (tolerance is not None and match[0] > tolerance) else match[2])
+    return result
+
+
+def _check_merge():
+    left, right = TimeIndex(LEFT, UTC), TimeIndex(RIGHT, UTC)
+    sorted_left, sorted_right = sorted(LEFT), sorted(RIGHT)
+    for direction in ["backward", "forward", "nearest"]:
+        for tolerance in [None, 0, 15]:
+            for exact in [True, False]:
+                positions = merge_asof(left, right, direction, tolerance, exact)
+                expected = _expected(sorted_left, sorted_right, direction, tolerance, exact)
+                assert list(positions) == expected, (direction, tolerance, exact)
+    assert list(merge_asof(left, TimeIndex([], UTC))) == [-1] * len(LEFT)
+    assert list(merge_asof(TimeIndex([], UTC), right)) == []
+    rows = right.rows(merge_asof(left, right))
+    for value, row in zip(sorted_left, rows):
+        assert row == -1 or RIGHT[row] == max(r for r in RIGHT if r <= value)
+
+
+def test_merge_asof():
+    _check_merge()
+
+
+def test_merge_asof_without_numpy(monkeypatch):
+    monkeypatch.setattr(timeindex, "np", None)
+    monkeypatch.setattr(datearray, "np", None)
+    _check_merge()
+    assert isinstance(TimeIndex(LEFT).rows([0, -1]), array)
+
+
+def test_sorted():
+    index = TimeIndex((epoch for epoch in [30, 10, 20, 10]), UTC)
+    assert list(index.epochs) == [10, 10, 20, 30]
+    assert list(index.order) == [1, 3, 2, 0]
+    already = array("q", [1, 2, 3])
+    assert TimeIndex(already).epochs is already and TimeIndex(already).order is None
+    assert TimeIndex(TimestampArray([5], UTC)).tz is UTC and TimeIndex([5]).tz is JST
+
+
+def test_range():
+    dts = [datetime(2022, 5, 15, hour, tzinfo=JST) for hour in [9, 3, 12, 18, 0]]
+    index = TimeIndex.from_datetimes(dts, UTC)
+    assert index.tz is UTC and index[0] == datetime(2022, 5, 15, 0, tzinfo=JST)
+    # 境界は tz-aware なら何の timezone でもよい: [03:00 JST, 03:00 UTC = 12:00 JST)
+    part = index.between(datetime(2022, 5, 15, 3, tzinfo=JST), datetime(2022, 5, 15, 3, tzinfo=UTC))
+    assert list(part) == [datetime(2022, 5, 15, hour, tzinfo=JST) for hour in [3, 9]]
+    assert [dts[row] for row in part.order] == list(part)
+    assert index.range_positions(end=datetime(2022, 5, 15, 0, tzinfo=JST)) == (0, 0)
+    assert len(index.between()) == 5 and len(index.between(index.epochs[-1] + 1)) == 0
+    assert list(index[1:3].order) == [1, 0]
+    strings = TimeIndex.from_strings(["2022-05-15 12:00:00", "2022-05-15 09:00:00"], HYPHEN_YMD_HMS)
+    assert list(strings.order) == [1, 0] and strings.timestamps.dt_to_string(HYPHEN_YMD_HMS)[0] == (
+        "2022-05-15 09:00:00"
+    )
+
+
+def test_lookup():
+    index = TimeIndex([10, 20, 20, 40], UTC)
+    assert [index.asof(value) for value in [5, 10, 20, 39, 99]] == [-1, 0, 2, 2, 3]
+    assert index.asof(20, allow_exact_matches=False) == 0
+    assert [index.nearest(value) for value in [0, 14, 15, 16, 20, 30, 31, 99]] == [0, 0, 0, 1, 2, 2, 3, 3]
+    assert index.asof(datetime(1970, 1, 1, 9, tzinfo=JST)) == -1
+    assert TimeIndex([]).nearest(0) == -1
+
+
+def test_invalid():
+    index = TimeIndex([1, 2])
+    for value in [None, datetime(2022, 5, 15), "2022-05-15", 1.5]:
+        with raises(DatetimeParseError):
+            index.asof(value)
+    with raises(DatetimeParseError):
+        TimeIndex(None)
+    with raises(DatetimeParseError):
+        TimeIndex([1], "JST")
+    with raises(DatetimeParseError):
+        index[::2]
+    for args in [(index, None), (index, [1]), (index, index, "both"), (index, index, "backward", -1)]:
+        with raises(DatetimeParseError):
+            merge_asof(*args)
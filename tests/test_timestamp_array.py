@@ -0,0 +1,101 @@
+from array import array
+from datetime import datetime
+
+from pytest import raises
+
+from libs import datearray
+from libs.datearray import TimestampArray
+from libs.dateutils import (
+    AWS_DATE_TIME_UTC,
+    EST,
+    HYPHEN_YMD_HMS,
+    JST,
+    UTC,
+    DatetimeParseError,
+    add_days,
+    add_hours,
+    convert_tz_utc_jst,
+    dt_to_string,
+    weekday_index,
+)
+
+dts = [
+    datetime(1970, 1, 1, 0, 0, 0, tzinfo=JST),
+    datetime(2022, 5, 15, 12, 34, 56, 789000, tzinfo=JST),
+    datetime(2000, 2, 29, 23, 59, 59, tzinfo=JST),
+    datetime(1969, 12, 31, 23, 59, 59, 1, tzinfo=JST),
+]
+
+
+def test_from_datetimes():
+    ts = TimestampArray.from_datetimes(dts)
+    assert len(ts) == len(dts)
+    assert ts.tz is JST
+    assert isinstance(ts.epochs, array)
+    assert ts.epochs[0] == -9 * 3600 * 1_000_000
+    assert list(ts) == dts
+
+
+def test_from_strings():
+    values = ["1970-01-01 00:00:00", "2022-05-15 12:34:56"]
+    ts = TimestampArray.from_strings(values, HYPHEN_YMD_HMS, UTC)
+    assert list(ts) == [datetime(1970, 1, 1, tzinfo=UTC), datetime(2022, 5, 15, 12, 34, 56, tzinfo=UTC)]
+
+
+def test_getitem():
+    ts = TimestampArray.from_datetimes(dts)
+    assert ts[1] == dts[1]
+    assert ts[-1] == dts[-1]
+    assert ts[1].tzinfo is JST
+    assert isinstance(ts[1:3], TimestampArray)
+    assert list(ts[1:3]) == dts[1:3]
+    assert list(ts[::-1]) == dts[::-1]
+
+
+def test_add_days_hours():
+    ts = TimestampArray.from_datetimes(dts)
+    assert list(ts.add_days(3)) == [add_days(dt, 3) for dt in dts]
+    assert list(ts.add_hours(-30)) == [add_hours(dt, -30) for dt in dts]
+
+
+def test_add_days_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    ts = TimestampArray.from_datetimes(dts)
+    assert list(ts.add_days(-1)) == [add_days(dt, -1) for dt in dts]
+
+
+def test_convert_tz_utc_jst():
+    ts = TimestampArray.from_datetimes(dts)
+    converted = ts.convert_tz_utc_jst()
+    assert converted.tz is UTC
+    assert [dt.tzinfo for dt in converted] == [UTC] * len(dts)
+    assert list(converted) == [convert_tz_utc_jst(dt) for dt in dts]
+    assert converted.convert_tz_utc_jst() == ts
+    with raises(DatetimeParseError):
+        TimestampArray(ts.epochs, EST).convert_tz_utc_jst()
+
+
+def test_dt_to_string():
+    ts = TimestampArray.from_datetimes(dts + [datetime(999, 1, 1, tzinfo=JST)])
+    for fmt in [HYPHEN_YMD_HMS, AWS_DATE_TIME_UTC, "%Y{%m}%%", "%a %d %b %Y %z"]:
+        assert ts.dt_to_string(fmt) == [dt_to_string(dt, fmt) for dt in ts]
+
+
+def test_weekday_index():
+    ts = TimestampArray.from_datetimes(dts)
+    assert list(ts.weekday_index()) == [weekday_index(dt) for dt in dts]
+    assert list(ts.convert_tz_utc_jst().weekday_index()) == [weekday_index(convert_tz_utc_jst(dt)) for dt in dts]
+
+
+def test_invalid_args():
+    with raises(DatetimeParseError):
+        TimestampArray([0], tz=None)
+    with raises(DatetimeParseError):
+        TimestampArray.from_datetimes([datetime(1970, 1, 1)])
+    ts = TimestampArray.from_datetimes(dts)
+    with raises(DatetimeParseError):
+        ts.add_days(None)
+    with raises(DatetimeParseError):
+        ts.add_hours(1.5)
+    with raises(DatetimeParseError):
+        ts.dt_to_string(None)
@@ -0,0 +1,105 @@
+import pickle
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from pytest import raises
+
+from libs.datearray import TimestampArray, datetime_to_epoch
+from libs.dateutils import JST, PST, UTC, DatetimeParseError
+from libs.timezones import convert_tz, convert_tz_array, load_zone, utcoffsets
+
+KEYS = ["America/New_York", "Europe/London", "Australia/Sydney", "Asia/Tokyo", "America/Sao_Paulo", "Europe/Dublin"]
+
+# 1900 年から 2150 年まで 97 日 + 3 時間 17 分ごと
+instants = [datetime(1900, 1, 1, tzinfo=UTC) + timedelta(days=97 * i, minutes=197 * i) for i in range(940)]
+
+
+def test_matches_zoneinfo():
+    for key in KEYS:
+        zone, expected_zone = load_zone(key), ZoneInfo(key)
+        for dt in instants:
+            actual, expected = convert_tz(dt, zone), dt.astimezone(expected_zone)
+            assert actual.replace(tzinfo=None) == expected.replace(tzinfo=None), (key, dt)
+            assert actual.fold == expected.fold
+            assert actual.utcoffset() == expected.utcoffset()
+            assert actual.dst() == expected.dst()
+            assert actual.tzname() == expected.tzname()
+
+
+def test_dst_matches_zoneinfo():
+    # 二重夏時間 (London 1940 年代)、標準時ごと変わる夏時間 (Apia, Santiago, Moscow)
+    for key in ["Pacific/Apia", "Europe/London", "America/Santiago", "Europe/Moscow"]:
+        zone, expected_zone = load_zone(key), ZoneInfo(key)
+        for hours in range(0, 200 * 366 * 24, 53):
+            dt = datetime(1900, 1, 1, tzinfo=UTC) + timedelta(hours=hours)
+            actual, expected = convert_tz(dt, zone), dt.astimezone(expected_zone)
+            assert actual.dst() == expected.dst(), (key, dt)
+    apia = convert_tz(datetime(2012, 3, 2, 14, 26, 40, tzinfo=UTC), "Pacific/Apia")
+    assert apia.dst() == timedelta(hours=1)
+    assert apia.strftime("%Y-%m-%d %H:%M") == "2012-03-03 04:26" and apia.timetuple().tm_isdst == 1
+    london = convert_tz(datetime(1941, 6, 1, tzinfo=UTC), "Europe/London")
+    assert london.utcoffset() == timedelta(hours=2) and london.dst() == timedelta(hours=1)
+
+
+def test_gap_and_fold():
+    zone = load_zone("America/New_York")
+    # 2022-11-06 01:30 は 2 回ある
+    first = convert_tz(datetime(2022, 11, 6, 5, 30, tzinfo=UTC), zone)
+    second = convert_tz(datetime(2022, 11, 6, 6, 30, tzinfo=UTC), zone)
+    assert (first.hour, first.minute, first.fold, first.tzname()) == (1, 30, 0, "EDT")
+    assert (second.hour, second.minute, second.fold, second.tzname()) == (1, 30, 1, "EST")
+    assert convert_tz(first, UTC) == datetime(2022, 11, 6, 5, 30, tzinfo=UTC)
+    assert convert_tz(second, UTC) == datetime(2022, 11, 6, 6, 30, tzinfo=UTC)
+    # 2022-03-13 02:30 は存在しない
+    gap = datetime(2022, 3, 13, 2, 30, tzinfo=zone)
+    assert gap.utcoffset() == datetime(2022, 3, 13, 2, 30, tzinfo=ZoneInfo("America/New_York")).utcoffset()
+
+
+def test_constants_and_keys():
+    dt = datetime(2022, 5, 15, 12, tzinfo=UTC)
+    assert convert_tz(dt, JST) == dt
+    assert convert_tz(dt, JST).tzinfo is JST
+    assert convert_tz(dt, PST).hour == 4
+    assert convert_tz(dt, "Asia/Tokyo").hour == 21
+    assert convert_tz(dt, "Asia/Tokyo").tzinfo is load_zone("Asia/Tokyo")
+    assert pickle.loads(pickle.dumps(load_zone("Asia/Tokyo"))) is load_zone("Asia/Tokyo")
+
+
+def test_far_future():
+    zone = load_zone("America/New_York")
+    dt = datetime(2400, 7, 1, tzinfo=UTC)
+    assert convert_tz(dt, zone).utcoffset() == timedelta(hours=-4)
+    assert convert_tz(dt, zone).replace(tzinfo=None) == dt.astimezone(ZoneInfo("America/New_York")).replace(tzinfo=None)
+
+
+def test_bulk():
+    epochs = [datetime_to_epoch(dt) for dt in instants]
+    for key in KEYS:
+        expected = [
+            datetime_to_epoch(dt.astimezone(ZoneInfo(key)).replace(tzinfo=UTC)) for dt in instants
+        ]
+        assert list(convert_tz_array(epochs, key)) == expected
+        offsets = [int(dt.astimezone(ZoneInfo(key)).utcoffset().total_seconds() * 1_000_000) for dt in instants]
+        assert list(utcoffsets(epochs, key)) == offsets
+    expected = [epoch + 9 * 3600 * 1_000_000 for epoch in epochs[:3]]
+    assert list(convert_tz_array(TimestampArray(epochs[:3], UTC), JST)) == expected
+    assert len(convert_tz_array([], "Asia/Tokyo")) == 0
+
+
+def test_zoneinfo():
+    dt = datetime(2022, 7, 1, 12, tzinfo=UTC)
+    assert convert_tz(dt, ZoneInfo("America/New_York")).tzinfo == ZoneInfo("America/New_York")
+    assert convert_tz(dt, ZoneInfo("America/New_York")).hour == 8
+    epochs = [datetime_to_epoch(dt)]
+    assert list(utcoffsets(epochs, ZoneInfo("America/New_York"))) == [-4 * 3600 * 1_000_000]
+    assert list(convert_tz_array(epochs, ZoneInfo("Asia/Tokyo"))) == list(convert_tz_array(epochs, "Asia/Tokyo"))
+
+
+def test_invalid():
+    dt = datetime(2022, 5, 15, tzinfo=UTC)
+    for args in [(None, JST), ("2022", JST), (datetime(2022, 5, 15), JST), (dt, None), (dt, 9)]:
+        with raises(DatetimeParseError):
+            convert_tz(*args)
+    for key in ["Mars/Olympus", "../etc/passwd", "/usr/share/zoneinfo/UTC", ""]:
+        with raises(DatetimeParseError):
+            load_zone(key)
@@ -0,0 +1,74 @@
+from array import array
+
+from pytest import raises
+
+from libs import datearray
+from libs.datearray import NAT, try_parse, try_strings_to_epochs
+from libs.dateutils import HYPHEN_YMD, HYPHEN_YMD_HMS, UTC, YMD, DatetimeParseError, string_to_datetime
+from libs.instrument import error_cause
+
+dirty = [
+    "2022-05-15 12:34:56",
+    "2022-05-15",
+    "2022-02-29 00:00:00",
+    "2000-02-29 00:00:00",
+    "2022-05-15 12:34:60",
+    "2022-05-15 12:34:56x",
+    "0000-01-01 00:00:00",
+    "２０２２-05-15 12:34:56",
+    "",
+    None,
+    20220515,
+    "2022-5-1 1:2:3",
+]
+
+
+def expected(values, fmt, tz):
+    results, errors = [], {}
+    for value in values:
+        try:
+            results.append(string_to_datetime(value, fmt, tz))
+        except DatetimeParseError as e:
+            results.append(None)
+            errors[error_cause(str(e))] = errors.get(error_cause(str(e)), 0) + 1
+    return results, errors
+
+
+def test_matches_string_to_datetime():
+    for fmt in [HYPHEN_YMD_HMS, HYPHEN_YMD, YMD, "%b %d %Y %H:%M:%S"]:
+        for tz in [UTC, datearray.JST]:
+            results, errors = expected(dirty, fmt, tz)
+            result = try_parse(dirty, fmt, tz)
+            assert result.values == results
+            assert list(result.valid) == [value is not None for value in results]
+            assert result.errors == errors
+
+
+def test_epochs():
+    result = try_strings_to_epochs(dirty, HYPHEN_YMD_HMS, UTC)
+    results, errors = expected(dirty, HYPHEN_YMD_HMS, UTC)
+    assert list(result.values) == [NAT if dt is None else datearray.datetime_to_epoch(dt) for dt in results]
+    assert result.errors == errors == {
+        "format_mismatch": 2,
+        "out_of_range": 3,
+        "unconverted_data": 1,
+        "missing_argument": 1,
+        "invalid_type": 1,
+    }
+    assert str(result.values.view("datetime64[us]")[1]) == "NaT"
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    result = try_strings_to_epochs(dirty[:3], HYPHEN_YMD_HMS, UTC)
+    assert isinstance(result.values, array)
+    assert result.valid == array("b", [1, 0, 0])
+    assert try_parse([], YMD).valid == array("b")
+
+
+def test_invalid_args():
+    for args in [(None, YMD), (dirty, None), (dirty, YMD, None), (dirty, 1)]:
+        with raises(DatetimeParseError):
+            try_parse(*args)
+        with raises(DatetimeParseError):
+            try_strings_to_epochs(*args)
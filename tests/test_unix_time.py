@@ -0,0 +1,105 @@
+import os
+import time
+from array import array
+from datetime import datetime
+
+from pytest import fixture, importorskip, raises
+
+from libs import datearray
+from libs.datearray import TimestampArray
+from libs.dateutils import (
+    JST,
+    PST,
+    UTC,
+    DatetimeParseError,
+    dt_to_epoch,
+    dt_to_unix_time,
+    epoch_to_dt,
+    unix_time_to_dt,
+)
+
+dt: datetime = datetime(2022, 5, 15, 12, 34, 56, 789123, tzinfo=JST)
+seconds: int = 1652585696
+
+
+@fixture
+def host_tz():
+    original = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if original is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = original
+    time.tzset()
+
+
+def test_dt_to_unix_time():
+    assert dt_to_unix_time(dt) == seconds + 0.789123
+
+
+def test_unix_time_to_dt(host_tz):
+    assert unix_time_to_dt(0) == datetime(1970, 1, 1, 9, tzinfo=JST)
+    assert unix_time_to_dt(0, UTC) == datetime(1970, 1, 1, tzinfo=UTC)
+    assert unix_time_to_dt(0, UTC).hour == 0
+    assert unix_time_to_dt(seconds + 0.5, JST) == dt.replace(microsecond=500000)
+
+
+def test_dt_to_epoch():
+    assert dt_to_epoch(dt) == seconds
+    assert dt_to_epoch(dt, "ms") == seconds * 1000 + 789
+    assert dt_to_epoch(dt, "us") == seconds * 1_000_000 + 789123
+    assert dt_to_epoch(dt, "ns") == seconds * 1_000_000_000 + 789123000
+    assert dt_to_epoch(datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=UTC)) == -1
+
+
+def test_epoch_to_dt(host_tz):
+    assert epoch_to_dt(seconds) == dt.replace(microsecond=0)
+    assert epoch_to_dt(seconds * 1000 + 789, "ms") == dt.replace(microsecond=789000)
+    assert epoch_to_dt(seconds * 1_000_000 + 789123, "us", UTC) == dt
+    assert epoch_to_dt(seconds * 1_000_000_000 + 789123999, "ns") == dt
+    assert epoch_to_dt(0, tz=PST).tzinfo is PST
+
+
+def test_invalid_args():
+    with raises(DatetimeParseError):
+        dt_to_epoch(None)
+    with raises(DatetimeParseError):
+        dt_to_epoch(datetime(1970, 1, 1))
+    with raises(DatetimeParseError):
+        dt_to_epoch(dt, "min")
+    with raises(DatetimeParseError):
+        epoch_to_dt(1.5)
+    with raises(DatetimeParseError):
+        epoch_to_dt(0, tz=None)
+    with raises(DatetimeParseError):
+        epoch_to_dt(10**20)
+
+
+def test_bulk_round_trip():
+    dts = [dt, datetime(1969, 12, 31, 23, 59, 59, 999999, tzinfo=UTC)]
+    ts = TimestampArray.from_datetimes(dts)
+    for unit in ["s", "ms", "us", "ns"]:
+        unix_times = ts.to_unix_times(unit)
+        assert list(unix_times) == [dt_to_epoch(d, unit) for d in dts]
+        assert list(TimestampArray.from_unix_times(unix_times, unit)) == [epoch_to_dt(int(v), unit) for v in unix_times]
+
+
+def test_bulk_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    ts = TimestampArray.from_unix_times([0, seconds], "s", UTC)
+    assert list(ts) == [datetime(1970, 1, 1, tzinfo=UTC), dt.replace(microsecond=0)]
+    assert isinstance(ts.to_unix_times("ms"), array)
+    assert list(ts.to_unix_times("ms")) == [0, seconds * 1000]
+    with raises(DatetimeParseError):
+        ts.to_datetime64()
+
+
+def test_datetime64():
+    np = importorskip("numpy")
+    values = np.array(["1970-01-01T00:00:00", "2022-05-15T03:34:56.789123"], dtype="datetime64[us]")
+    ts = TimestampArray.from_datetime64(values, JST)
+    assert ts[1] == dt
+    assert (ts.to_datetime64() == values).all()
+    assert ts.to_unix_times("s").tolist() == [0, seconds]
@@ -0,0 +1,58 @@
+from array import array
+from datetime import datetime, timedelta
+
+from pytest import importorskip
+
+from libs import datearray
+from libs.datearray import TimestampArray, datetime_to_epoch, weekday_codes
+from libs.dateutils import (
+    JST,
+    PST,
+    UTC,
+    WEEKDAY_NAMES_EN,
+    WEEKDAY_NAMES_JP,
+    weekday_index,
+    weekday_name_en,
+    weekday_name_jp,
+)
+
+# 1969-12-29 (Monday) から 3 時間おき
+dts = [datetime(1969, 12, 29, tzinfo=UTC) + timedelta(hours=3 * i) for i in range(100)]
+epochs = [datetime_to_epoch(dt) for dt in dts]
+
+
+def test_weekday_name():
+    dt = datetime(2022, 5, 15, tzinfo=JST)
+    assert weekday_name_en(dt) == "Sunday"
+    assert weekday_name_jp(dt) == "日曜日"
+
+
+def test_weekday_codes_without_numpy(monkeypatch):
+    monkeypatch.setattr(datearray, "np", None)
+    for tz in [UTC, JST, PST]:
+        codes = weekday_codes(epochs, tz)
+        assert isinstance(codes, array)
+        assert list(codes) == [weekday_index(dt.astimezone(tz)) for dt in dts]
+
+
+def test_weekday_codes_numpy():
+    np = importorskip("numpy")
+    for tz in [UTC, JST, PST]:
+        codes = weekday_codes(np.array(epochs), tz)
+        assert codes.dtype == np.uint8
+        assert codes.tolist() == [weekday_index(dt.astimezone(tz)) for dt in dts]
+    assert weekday_codes(np.array(epochs).view("datetime64[us]"), UTC).tolist() == weekday_codes(epochs, UTC).tolist()
+
+
+def test_weekday_codes_timestamp_array():
+    ts = TimestampArray(epochs, JST)
+    assert list(weekday_codes(ts)) == [weekday_index(dt) for dt in ts]
+    # 明示した tz が TimestampArray の tz より優先される
+    assert list(weekday_codes(ts, UTC)) == [weekday_index(dt.astimezone(UTC)) for dt in ts]
+    assert list(weekday_codes(ts, UTC)) != list(weekday_codes(ts))
+
+
+def test_label_tables():
+    codes = weekday_codes(epochs, JST)
+    assert [WEEKDAY_NAMES_EN[code] for code in codes] == [weekday_name_en(dt.astimezone(JST)) for dt in dts]
+    assert [WEEKDAY_NAMES_JP[code] for code in codes] == [weekday_name_jp(dt.astimezone(JST)) for dt in dts]
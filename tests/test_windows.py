@@ -0,0 +1,118 @@
+import random
+from datetime import datetime, timedelta
+
+from pytest import raises
+
+from libs.datearray import datetime_to_epoch, epoch_to_datetime
+from libs.dateutils import JST, PST, UTC, YMDHMS, DatetimeParseError, dt_to_string
+from libs.windows import Window, WindowCounter, window_counts
+
+HOUR = 3600 * 1_000_000
+base = datetime_to_epoch(datetime(2022, 5, 15, tzinfo=JST))
+
+
+def brute_force(epochs, size, slide, lateness, tz):
+    """
+    an event is counted in each of its windows that the watermark has not closed yet
+    :return: (windows, dropped)
+    """
+    watermark, windows, dropped = None, {}, 0
+    for epoch in epochs:
+        start, counted = _floor(epoch, slide, tz), False
+        while start + size > epoch:
+            if watermark is None or start + size > watermark:
+                windows[start] = windows.get(start, 0) + 1
+                counted = True
+            start -= slide
+        dropped += not counted
+        watermark = epoch - lateness if watermark is None else max(watermark, epoch - lateness)
+    result = [
+        Window(epoch_to_datetime(start, tz), epoch_to_datetime(start + size, tz), count)
+        for start, count in sorted(windows.items())
+    ]
+    return result, dropped
+
+
+def _floor(epoch, size, tz):
+    offset = tz.utcoffset(None) // timedelta(microseconds=1)
+    return (epoch + offset) // size * size - offset
+
+
+def test_tumbling_in_order():
+    epochs = [base + i * 7 * 60 * 1_000_000 for i in range(100)]
+    windows = list(window_counts(epochs, "hour"))
+    assert windows == brute_force(epochs, HOUR, HOUR, 0, JST)[0]
+    assert windows[0] == Window(datetime(2022, 5, 15, tzinfo=JST), datetime(2022, 5, 15, 1, tzinfo=JST), 9)
+    assert sum(window.count for window in windows) == 100
+
+
+def test_sliding_out_of_order():
+    rng = random.Random(17)
+    epochs = [base + i * 60 * 1_000_000 + rng.randrange(-150, 30) * 60 * 1_000_000 for i in range(2000)]
+    total_dropped = 0
+    for size, slide, lateness in [(2 * HOUR, HOUR, 0), (HOUR, HOUR // 4, HOUR // 2), (3 * HOUR, 2 * HOUR, HOUR)]:
+        size_td, slide_td = timedelta(microseconds=size), timedelta(microseconds=slide)
+        counter = WindowCounter(size_td, slide_td, timedelta(microseconds=lateness))
+        windows = [window for epoch in epochs for window in counter.add(epoch)] + counter.flush()
+        expected, dropped = brute_force(epochs, size, slide, lateness, JST)
+        assert windows == expected
+        assert counter.dropped == dropped
+        total_dropped += dropped
+    assert total_dropped > 0
+
+
+def test_sparse_stream():
+    # 何日も間の空くイベントの塊: 空の窓は走査せずに飛ばす
+    rng = random.Random(29)
+    epochs = [base + day * 24 * HOUR + rng.randrange(0, 3 * HOUR) for day in range(0, 400, 37) for _ in range(50)]
+    for size, slide, lateness in [(HOUR, HOUR, 0), (3 * HOUR, 2 * HOUR, HOUR // 2), (HOUR, 60 * 1_000_000, HOUR)]:
+        counter = WindowCounter(*(timedelta(microseconds=value) for value in (size, slide, lateness)))
+        windows = [window for epoch in epochs for window in counter.add(epoch)] + counter.flush()
+        assert windows == brute_force(epochs, size, slide, lateness, JST)[0]
+        assert counter._panes == {} and counter._sum == 0
+
+
+def test_late_events_dropped():
+    counter = WindowCounter("hour", lateness=timedelta(minutes=10), tz=UTC)
+    assert counter.watermark is None
+    assert counter.add(datetime(2022, 5, 15, 0, 30, tzinfo=UTC)) == []
+    closed = counter.add(datetime(2022, 5, 15, 1, 15, tzinfo=UTC))
+    assert closed == [Window(datetime(2022, 5, 15, tzinfo=UTC), datetime(2022, 5, 15, 1, tzinfo=UTC), 1)]
+    assert counter.watermark == datetime(2022, 5, 15, 1, 5, tzinfo=UTC)
+    assert counter.add(datetime(2022, 5, 15, 0, 59, tzinfo=UTC)) == []
+    assert counter.dropped == 1
+    assert counter.add(datetime(2022, 5, 15, 1, 0, tzinfo=UTC)) == []
+    assert counter.flush() == [Window(datetime(2022, 5, 15, 1, tzinfo=UTC), datetime(2022, 5, 15, 2, tzinfo=UTC), 2)]
+
+
+def test_strings_and_alignment():
+    dts = [datetime(2022, 5, 9, tzinfo=PST) + timedelta(hours=5 * i) for i in range(100)]
+    windows = list(window_counts([dt_to_string(dt, YMDHMS) for dt in dts], "week", tz=PST, format_string=YMDHMS))
+    assert [window.start.weekday() for window in windows] == [0, 0, 0]
+    assert [window.start.hour for window in windows] == [0, 0, 0]
+    assert windows[0].start.tzinfo is PST
+    assert [window.count for window in windows] == [34, 34, 32]
+    strings = [dt_to_string(dt, "%Y-%m-%d %H:%M:%S") for dt in dts]
+    assert list(window_counts(strings, "week", tz=PST)) == windows
+    assert list(window_counts(dts, "day", tz=PST)) == list(window_counts(strings, "day", tz=PST))
+
+
+def test_invalid():
+    for kwargs in [
+        {"size": None},
+        {"size": "month"},
+        {"size": 3600},
+        {"size": "hour", "slide": timedelta(0)},
+        {"size": "hour", "slide": "day"},
+        {"size": "hour", "lateness": timedelta(-1)},
+        {"size": "hour", "tz": None},
+        {"size": "hour", "format_string": 1},
+    ]:
+        with raises(DatetimeParseError):
+            WindowCounter(**kwargs)
+    counter = WindowCounter("hour", format_string=YMDHMS)
+    for value in [None, 1.5, "2022-05-15", datetime(2022, 5, 15)]:
+        with raises(DatetimeParseError):
+            counter.add(value)
+    with raises(DatetimeParseError):
+        window_counts(None, "hour")